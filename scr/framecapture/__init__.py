@@ -1,4 +1,27 @@
-from .config import CaptureConfig
-from .pipeline import CapturePipeline
-from .ui import CaptureApp
-from .tutorial import TutorialViewer
+"""
+PyFrameCollector. Os nomes abaixo são importados sob demanda: `import
+framecapture.pipeline` (ou o modo headless) não carrega tkinter/Pillow.
+"""
+from importlib import import_module
+
+__all__ = ["CaptureConfig", "CapturePipeline", "CaptureApp", "TutorialViewer"]
+
+_LAZY = {
+    "CaptureConfig": ".config",
+    "CapturePipeline": ".pipeline",
+    "CaptureApp": ".ui",
+    "TutorialViewer": ".tutorial",
+}
+
+
+def __getattr__(name):
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
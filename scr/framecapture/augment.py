@@ -0,0 +1,366 @@
+# scr/framecapture/augment.py
+"""
+Aumento de dados offline para as pastas A..Z: gera `copies` variações de cada
+frame (espelhamento, brilho/contraste, rotação pequena, recorte) e grava em
+dst/<letra>/ com a mesma convenção de nomes do FrameStorage.
+
+    python -m framecapture.augment D:/dataset D:/dataset_aug --copies 4 --seed 7 --jobs 8
+    python -m framecapture.augment D:/dataset D:/dataset --copies 2 --size 224x224   # na própria pasta
+
+Os frames são lidos em lotes (batch por tarefa do pool de processos) e agrupados
+por tamanho. As transformações são sorteadas de forma determinística por (seed,
+caminho do arquivo, cópia), então o resultado não depende de --jobs/--batch nem
+de outros arquivos da pasta.
+
+O que é feito em lote (NumPy, uma conta para o grupo todo) são só os parâmetros:
+as matrizes afins e as LUTs de brilho/contraste. Os pixels continuam passando
+imagem a imagem pelo OpenCV: geometria (espelho + rotação + recorte +
+redimensionamento) é um único warpAffine por imagem, direto no array de saída,
+em vez de quatro passadas; brilho/contraste é um cv2.LUT por imagem, no lugar.
+O ganho sobre augment_reference vem dessas passadas a menos, não de
+vetorização dos pixels (um take() sobre o lote mediu ~8x mais lento que cv2.LUT).
+
+Arquivos de origem com o prefixo de saída (padrão "aug") são ignorados, para
+que rodar de novo na mesma pasta não aumente frames já aumentados.
+"""
+from __future__ import annotations
+import argparse
+import logging
+import os
+import string
+import sys
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+import cv2
+import numpy as np
+
+from .export import scan_letters
+from .storage import FrameStorage
+
+log = logging.getLogger(__name__)
+
+BATCH = 32           # frames por tarefa do pool
+
+
+@dataclass(frozen=True)
+class AugmentParams:
+    """Faixas das transformações sorteadas (uniformes)."""
+    flip_prob: float = 0.5           # espelhamento horizontal (troca a mão dominante)
+    max_rotation_deg: float = 10.0   # rotação em [-max, +max]
+    min_crop: float = 0.85           # lado do recorte em [min_crop, 1] do lado original
+    max_brightness: float = 0.15     # deslocamento em [-max, +max] * 255
+    max_contrast: float = 0.20       # ganho em [1 - max, 1 + max]
+
+
+@dataclass
+class Draws:
+    """Valores sorteados para um lote (um elemento por imagem)."""
+    flip: np.ndarray       # bool
+    angle: np.ndarray      # graus
+    crop: np.ndarray       # fração do lado
+    shift_x: np.ndarray    # posição do recorte na folga, [0, 1]
+    shift_y: np.ndarray
+    alpha: np.ndarray      # contraste
+    beta: np.ndarray       # brilho (níveis de cinza)
+
+
+def frame_key(rel: str) -> int:
+    """Identidade estável do arquivo para o sorteio (não muda se outros arquivos entrarem)."""
+    return zlib.crc32(rel.encode("utf-8"))
+
+
+def draw_params(keys: List[int], copy: int, seed: int, p: AugmentParams) -> Draws:
+    """Um gerador por (seed, arquivo, cópia): mesmo resultado em qualquer lote/processo."""
+    u = np.empty((len(keys), 7), dtype=np.float64)
+    for i, key in enumerate(keys):
+        u[i] = np.random.default_rng((seed, key, copy)).random(7)
+    return Draws(
+        flip=u[:, 0] < p.flip_prob,
+        angle=(u[:, 1] * 2 - 1) * p.max_rotation_deg,
+        crop=p.min_crop + u[:, 2] * (1 - p.min_crop),
+        shift_x=u[:, 3],
+        shift_y=u[:, 4],
+        alpha=1 + (u[:, 5] * 2 - 1) * p.max_contrast,
+        beta=(u[:, 6] * 2 - 1) * p.max_brightness * 255,
+    )
+
+
+def affine_matrices(d: Draws, src_size: Tuple[int, int], out_size: Tuple[int, int]) -> np.ndarray:
+    """
+    Matrizes N x 2 x 3 (origem -> destino) que espelham, giram em torno do centro
+    do recorte e levam o recorte para out_size = (largura, altura).
+    """
+    w, h = src_size
+    ow, oh = out_size
+    n = len(d.crop)
+    cw, ch = d.crop * w, d.crop * h
+    # centro do recorte dentro da folga deixada pelo recorte
+    cx = cw / 2 + d.shift_x * (w - cw)
+    cy = ch / 2 + d.shift_y * (h - ch)
+    sx, sy = ow / cw, oh / ch
+    t = np.radians(d.angle)
+    cos, sin = np.cos(t), np.sin(t)
+    f = np.where(d.flip, -1.0, 1.0)
+    a = np.empty((n, 2, 2))
+    # diag(sx, sy) @ R(t) @ diag(f, 1)
+    a[:, 0, 0] = sx * cos * f
+    a[:, 0, 1] = -sx * sin
+    a[:, 1, 0] = sy * sin * f
+    a[:, 1, 1] = sy * cos
+    m = np.empty((n, 2, 3))
+    m[:, :, :2] = a
+    # coordenadas contínuas (borda do pixel em 0) -> pixel: centro do pixel i em i + 0.5
+    m[:, :, 2] = np.array([ow / 2, oh / 2]) - 0.5 - np.einsum("nij,nj->ni", a, np.stack([cx, cy], axis=1) - 0.5)
+    return m
+
+
+def adjust_levels(batch: np.ndarray, alpha: np.ndarray, beta: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+    """
+    out = clip(batch * alpha + beta) por imagem. As LUTs (256 níveis) do lote
+    saem de uma só conta em NumPy; a aplicação é um cv2.LUT por imagem (um
+    take() único sobre o lote empilhado mediu ~8x mais lento).
+    """
+    if out is None:
+        out = np.empty_like(batch)
+    levels = np.arange(256, dtype=np.float32)
+    luts = np.clip(levels[None, :] * alpha[:, None] + beta[:, None] + 0.5, 0, 255).astype(np.uint8)
+    for i in range(len(batch)):
+        cv2.LUT(batch[i], luts[i], dst=out[i])
+    return out
+
+
+def augment_batch(
+    batch: Sequence[np.ndarray],
+    keys: List[int],
+    copy: int,
+    seed: int,
+    params: AugmentParams = AugmentParams(),
+    out_size: Optional[Tuple[int, int]] = None,
+) -> np.ndarray:
+    """
+    batch: N imagens H x W x C uint8 do mesmo tamanho (array N x H x W x C ou
+    lista; a lista não é empilhada). Devolve N x oh x ow x C com a variação
+    `copy` de cada imagem: parâmetros calculados para o lote, um warpAffine e um
+    cv2.LUT por imagem.
+    """
+    n = len(batch)
+    h, w = batch[0].shape[:2]
+    ow, oh = out_size or (w, h)
+    d = draw_params(keys, copy, seed, params)
+    mats = affine_matrices(d, (w, h), (ow, oh))
+    out = np.empty((n, oh, ow) + batch[0].shape[2:], dtype=np.uint8)
+    for i in range(n):
+        cv2.warpAffine(batch[i], mats[i], (ow, oh), dst=out[i], flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REFLECT_101)
+    return adjust_levels(out, d.alpha, d.beta, out=out)
+
+
+def augment_reference(
+    img: np.ndarray,
+    key: int,
+    copy: int,
+    seed: int,
+    params: AugmentParams = AugmentParams(),
+    out_size: Optional[Tuple[int, int]] = None,
+) -> np.ndarray:
+    """
+    Uma imagem por vez (referência do benchmark): mesmo sorteio, mesma matriz
+    afim e mesma LUT de augment_batch, calculados e aplicados imagem a imagem.
+    A saída é idêntica à do lote.
+    """
+    h, w = img.shape[:2]
+    ow, oh = out_size or (w, h)
+    d = draw_params([key], copy, seed, params)
+    mat = affine_matrices(d, (w, h), (ow, oh))[0]
+    out = cv2.warpAffine(img, mat, (ow, oh), flags=cv2.INTER_LINEAR, borderMode=cv2.BORDER_REFLECT_101)
+    return adjust_levels(out[None], d.alpha, d.beta)[0]
+
+
+@dataclass
+class AugmentJob:
+    src_root: str
+    dst_root: str
+    letter: str
+    rels: List[str]
+    counter_start: int     # contador do FrameStorage antes do primeiro frame do lote
+    copies: int
+    seed: int
+    params: AugmentParams
+    out_size: Optional[Tuple[int, int]]
+    prefix: str
+    image_ext: str
+    session_id: str
+    manifest: bool = False
+
+
+def _augment_job(job: AugmentJob) -> Dict:
+    """Processo filho: lê o lote, gera as cópias e grava na ordem (arquivo, cópia)."""
+    cv2.setNumThreads(1)
+    t0 = time.perf_counter()
+    imgs = [cv2.imread(os.path.join(job.src_root, rel), cv2.IMREAD_COLOR) for rel in job.rels]
+    t_read = time.perf_counter() - t0
+    # empilha por tamanho (capturas da mesma câmera caem todas no mesmo grupo)
+    groups: Dict[Tuple[int, ...], List[int]] = {}
+    for i, img in enumerate(imgs):
+        if img is not None:
+            groups.setdefault(img.shape, []).append(i)
+    results: List[List[Optional[np.ndarray]]] = [[None] * job.copies for _ in imgs]
+    t1 = time.perf_counter()
+    for idx in groups.values():
+        group = [imgs[i] for i in idx]  # sem np.stack: warpAffine lê cada imagem onde está
+        keys = [frame_key(job.rels[i]) for i in idx]
+        for c in range(job.copies):
+            out = augment_batch(group, keys, c, job.seed, job.params, job.out_size)
+            for j, i in enumerate(idx):
+                results[i][c] = out[j]
+    t_aug = time.perf_counter() - t1
+
+    t2 = time.perf_counter()
+    storage = FrameStorage(
+        Path(job.dst_root) / job.letter, job.image_ext, job.prefix, manifest=job.manifest, session_id=job.session_id
+    )
+    saved = 0
+    try:
+        for i, copies in enumerate(results):
+            if copies[0] is None:
+                continue
+            for c, img in enumerate(copies):
+                # numeração fixa por posição no lote, mesmo se algum arquivo falhar
+                storage.counter = job.counter_start + i * job.copies + c
+                storage.save(img)
+                saved += 1
+    finally:
+        storage.close()
+    return {
+        "letter": job.letter,
+        "read": len(job.rels),
+        "failed": [rel for rel, img in zip(job.rels, imgs) if img is None],
+        "saved": saved,
+        "read_s": t_read,
+        "augment_s": t_aug,
+        "write_s": time.perf_counter() - t2,
+    }
+
+
+def augment_dataset(
+    src_root: Path,
+    dst_root: Path,
+    copies: int = 4,
+    seed: int = 0,
+    params: AugmentParams = AugmentParams(),
+    out_size: Optional[Tuple[int, int]] = None,
+    letters: str = string.ascii_uppercase,
+    prefix: str = "aug",
+    image_ext: str = "jpg",
+    batch: int = BATCH,
+    jobs: int = 0,
+    manifest: bool = False,
+) -> Dict:
+    """
+    Gera `copies` variações de cada frame de src_root/<letra> em dst_root/<letra>
+    (manifest=True registra as cópias em dst_root/<letra>/manifest.sqlite).
+    Devolve um resumo com frames lidos/gravados, tempos por etapa e imagens/s.
+    """
+    src_root, dst_root = Path(src_root), Path(dst_root)
+    session_id = "augment_" + datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    skip = f"{prefix}_"
+    by_letter: Dict[str, List[str]] = {}
+    for f in scan_letters(src_root, letters):
+        if not f.rel.rsplit("/", 1)[1].startswith(skip):
+            by_letter.setdefault(f.letter, []).append(f.rel)
+
+    work: List[AugmentJob] = []
+    for letter, rels in by_letter.items():
+        for s in range(0, len(rels), batch):
+            work.append(AugmentJob(
+                str(src_root), str(dst_root), letter, rels[s:s + batch], s * copies, copies, seed,
+                params, out_size, prefix, image_ext, session_id, manifest,
+            ))
+
+    t0 = time.perf_counter()
+    totals = {"read": 0, "saved": 0, "read_s": 0.0, "augment_s": 0.0, "write_s": 0.0}
+    failed: List[str] = []
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(work) or 1))
+    if jobs == 1:
+        results = map(_augment_job, work)
+    else:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        results = executor.map(_augment_job, work)
+    try:
+        for r in results:
+            for k in totals:
+                totals[k] += r[k]
+            failed.extend(r["failed"])
+    finally:
+        if jobs > 1:
+            executor.shutdown()
+    for rel in failed:
+        log.warning("Falha ao decodificar %s", rel)
+
+    elapsed = time.perf_counter() - t0
+    return {
+        **totals,
+        "failed": len(failed),
+        "letters": len(by_letter),
+        "copies": copies,
+        "seed": seed,
+        "params": asdict(params),
+        "jobs": jobs,
+        "seconds": elapsed,
+        "images_per_s": totals["saved"] / elapsed if elapsed > 0 else 0.0,
+        # só a etapa de transformação, somada entre processos
+        "augment_images_per_s": totals["saved"] / totals["augment_s"] if totals["augment_s"] > 0 else 0.0,
+    }
+
+
+def _parse_size(spec: str) -> Tuple[int, int]:
+    w, h = spec.lower().split("x")
+    return int(w), int(h)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m framecapture.augment", description="Aumento de dados das pastas A..Z.")
+    ap.add_argument("src", type=Path, help="diretório pai das pastas A..Z")
+    ap.add_argument("dst", type=Path, help="diretório pai das pastas A..Z aumentadas (pode ser o mesmo)")
+    ap.add_argument("-c", "--copies", type=int, default=4, help="variações por frame")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--size", type=_parse_size, metavar="WxH", help="tamanho de saída (padrão: o da origem)")
+    ap.add_argument("--letters", default=string.ascii_uppercase, help="ex.: ABC")
+    ap.add_argument("--prefix", default="aug", help="prefixo dos arquivos gerados")
+    ap.add_argument("--no-flip", action="store_true", help="não espelha (mantém a mão dominante)")
+    ap.add_argument("--rotation", type=float, default=AugmentParams.max_rotation_deg, help="rotação máxima (graus)")
+    ap.add_argument("--min-crop", type=float, default=AugmentParams.min_crop, help="menor recorte (fração do lado)")
+    ap.add_argument("--brightness", type=float, default=AugmentParams.max_brightness)
+    ap.add_argument("--contrast", type=float, default=AugmentParams.max_contrast)
+    ap.add_argument("-b", "--batch", type=int, default=BATCH, help="frames por tarefa")
+    ap.add_argument("-j", "--jobs", type=int, default=0, help="processos (0 = nº de CPUs)")
+    ap.add_argument("--manifest", action="store_true", help="registra as cópias em <letra>/manifest.sqlite")
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
+    params = AugmentParams(
+        flip_prob=0.0 if args.no_flip else AugmentParams.flip_prob,
+        max_rotation_deg=args.rotation,
+        min_crop=args.min_crop,
+        max_brightness=args.brightness,
+        max_contrast=args.contrast,
+    )
+    r = augment_dataset(
+        args.src, args.dst, args.copies, args.seed, params, args.size,
+        letters=args.letters.upper(), prefix=args.prefix, batch=args.batch, jobs=args.jobs,
+        manifest=args.manifest,
+    )
+    log.info(
+        "%d frames lidos, %d gerados em %d pasta(s) | falhas %d | %.1fs (%.0f imagens/s; transformação %.0f imagens/s)",
+        r["read"], r["saved"], r["letters"], r["failed"], r["seconds"], r["images_per_s"], r["augment_images_per_s"],
+    )
+    log.info("Tempo somado: leitura %.1fs, transformação %.1fs, gravação %.1fs", r["read_s"], r["augment_s"], r["write_s"])
+    return 1 if r["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
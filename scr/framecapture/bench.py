@@ -0,0 +1,514 @@
+# scr/framecapture/bench.py
+"""
+Benchmarks do pipeline sem câmera (fonte sintética).
+
+    python -m framecapture.bench --resolutions 640x480,1920x1080 --out bench.json
+    python -m framecapture.bench --baseline bench.json     # compara; sai com 1 se regredir
+
+A suíte roda --repeat vezes (padrão 3) e o resultado guarda a mediana de cada
+métrica (e o mínimo/máximo em "spread"). Uma regressão em relação ao baseline
+precisa passar da tolerância relativa e de um piso absoluto por tipo de
+métrica (0.25 ms nos tempos) na mediana e se repetir em todas as execuções.
+
+Cenários por resolução:
+  storage  - encode (cv2.imencode) e escrita em disco separados, por frame
+  pipeline - CapturePipeline completo: taxa de gravação alcançada x save_fps,
+             latência de leitura/gravação, jitter do intervalo entre gravações
+  guide    - custo por frame do overlay do PreCaptureGuide
+  augment  - imagens/s do aumento de dados em lote x uma imagem por vez (em memória)
+Sem depender da resolução:
+  sampler  - TimeSampler (intervalo desde o último salvo, relógio na hora da
+             chamada) x ScheduledSampler (agenda pelo timestamp de captura) em
+             timestamps sintéticos com jitter, latência de loop e uma parada
+Cada cenário também mede CPU (s e %) e RSS atual ao fim do cenário (psutil ou
+/proc/self/statm). Sem nenhum dos dois, grava só peak_rss_mb (pico do processo
+inteiro, não comparado com o baseline). Além disso mede o tempo de
+import do pacote, do pipeline (modo headless) e da GUI.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+import cv2
+import numpy as np
+
+from .augment import AugmentParams, augment_batch, augment_reference
+from .config import CaptureConfig
+from .pipeline import CapturePipeline, ScheduledSampler, TimeSampler
+from .precapture import PreCaptureGuide
+from .video import SyntheticMJPEGSource, SyntheticSource
+
+try:
+    import resource  # indisponível no Windows
+except ImportError:
+    resource = None
+
+try:
+    import psutil  # opcional: RSS atual mais preciso
+except ImportError:
+    psutil = None
+
+
+def percentiles_ms(samples: List[float]) -> Dict[str, float]:
+    """Resumo (em ms) de uma lista de durações em segundos."""
+    if not samples:
+        return {}
+    ms = np.asarray(samples, dtype=np.float64) * 1000.0
+    return {
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p90_ms": float(np.percentile(ms, 90)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+    }
+
+
+def _rss_mb() -> Optional[float]:
+    """RSS atual do processo (psutil ou /proc/self/statm); None se não houver como medir."""
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Pico de RSS desde o início do processo (não é por cenário)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+class ResourceProbe:
+    """Mede CPU do processo e RSS durante um bloco `with`."""
+    def __enter__(self):
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        self.result = {
+            "wall_s": wall,
+            "cpu_s": cpu,
+            "cpu_pct": 100.0 * cpu / wall if wall > 0 else 0.0,
+        }
+        rss = _rss_mb()
+        if rss is not None:
+            self.result["rss_mb"] = rss
+        else:
+            # sem RSS atual: só o pico do processo, que não é comparado entre cenários/baselines
+            peak = _peak_rss_mb()
+            if peak is not None:
+                self.result["peak_rss_mb"] = peak
+
+
+def bench_storage(width: int, height: int, frames: int, out_dir: Path, ext: str = "jpg") -> Dict:
+    src = SyntheticSource(width, height, realtime=False)
+    encode, write = [], []
+    out_dir.mkdir(parents=True, exist_ok=True)
+    with ResourceProbe() as probe:
+        for i in range(frames):
+            _, frame = src.read()
+            t0 = time.perf_counter()
+            ok, buf = cv2.imencode(f".{ext}", frame)
+            t1 = time.perf_counter()
+            with open(out_dir / f"bench_{i:06d}.{ext}", "wb") as f:
+                f.write(buf.tobytes())
+            t2 = time.perf_counter()
+            encode.append(t1 - t0)
+            write.append(t2 - t1)
+    return {
+        "frames": frames,
+        "encode": percentiles_ms(encode),
+        "write": percentiles_ms(write),
+        "bytes_per_frame": float(buf.size),
+        "resources": probe.result,
+    }
+
+
+def bench_pipeline(
+    width: int,
+    height: int,
+    source_fps: float,
+    save_fps: float,
+    duration: float,
+    out_parent: Path,
+    storage_workers: int = 0,
+    threaded: bool = False,
+    roi_crop: bool = False,
+    mjpeg: bool = False,
+    frame_pool: bool = False,
+) -> Dict:
+    cfg = CaptureConfig(
+        output_parent=out_parent,
+        output_dir_name="B",
+        save_fps=save_fps,
+        preview=False,
+        max_duration_seconds=duration,
+        pre_countdown_seconds=0,
+        storage_workers=storage_workers,
+        threaded_capture=threaded,
+        roi_crop=roi_crop,
+        passthrough=mjpeg,
+        frame_pool_size=-1 if frame_pool else 0,
+    )
+    source_cls = SyntheticMJPEGSource if mjpeg else SyntheticSource
+    source = source_cls(width, height, fps=source_fps, realtime=True)
+    pipeline = CapturePipeline(cfg, source=source)
+
+    read_lat: List[float] = []
+    save_lat: List[float] = []
+    save_times: List[float] = []
+
+    read_packet = source.read_packet
+    def timed_read():
+        t0 = time.perf_counter()
+        pkt = read_packet()
+        read_lat.append(time.perf_counter() - t0)
+        return pkt
+    source.read_packet = timed_read
+
+    save = pipeline.storage.save
+    save_encoded = pipeline.storage.save_encoded
+    def timed(fn):
+        def wrapper(frame, *args, **kwargs):
+            t0 = time.perf_counter()
+            save_times.append(t0)
+            res = fn(frame, *args, **kwargs)
+            save_lat.append(time.perf_counter() - t0)
+            return res
+        return wrapper
+    pipeline.storage.save = timed(save)
+    pipeline.storage.save_encoded = timed(save_encoded)
+
+    with ResourceProbe() as probe:
+        pipeline.start()
+        pipeline.wait()
+
+    intervals = np.diff(save_times) if len(save_times) > 1 else np.zeros(0)
+    target = 1.0 / save_fps if save_fps > 0 else 0.0
+    st = pipeline.storage.stats
+    return {
+        "source_fps": source_fps,
+        "save_fps_target": save_fps,
+        "save_rate_fps": (len(save_times) - 1) / (save_times[-1] - save_times[0]) if len(save_times) > 1 else 0.0,
+        "frames_read": len(read_lat),
+        "frames_saved": st.written,
+        "frames_dropped": st.dropped,
+        "pool_exhausted": pipeline.pool.stats.exhausted if pipeline.pool is not None else 0,
+        "read": percentiles_ms(read_lat),
+        "save": percentiles_ms(save_lat),
+        "jitter": {
+            "std_ms": float(intervals.std() * 1000.0) if intervals.size else 0.0,
+            "mean_abs_err_ms": float(np.abs(intervals - target).mean() * 1000.0) if intervals.size else 0.0,
+        },
+        "resources": probe.result,
+    }
+
+
+def bench_guide(width: int, height: int, frames: int) -> Dict:
+    """
+    Overlay com cache (draw) x desenho direto a cada frame (draw_direct).
+    A montagem dos sprites (prepare, uma vez por tamanho de frame antes da
+    contagem) é medida à parte em build_ms; draw só mede a mesclagem.
+    """
+    src = SyntheticSource(width, height, realtime=False)
+    guide = PreCaptureGuide()
+    _, base = src.read()
+    frame = base.copy()
+    t0 = time.perf_counter()
+    guide.prepare(width, height)
+    out: Dict[str, Dict] = {"frames": frames, "build_ms": (time.perf_counter() - t0) * 1000.0}
+    for name, draw in (("draw", guide.draw), ("draw_direct", guide.draw_direct)):
+        lat = []
+        with ResourceProbe() as probe:
+            for i in range(frames):
+                np.copyto(frame, base)
+                t0 = time.perf_counter()
+                draw(frame, 5 - (i * 5) // frames)
+                lat.append(time.perf_counter() - t0)
+        out[name] = percentiles_ms(lat)
+        out[f"{name}_resources"] = probe.result
+    return out
+
+
+def bench_augment(width: int, height: int, frames: int, copies: int = 2, out_size=(224, 224)) -> Dict:
+    """
+    augment_batch (parâmetros em lote, warp + LUT por imagem) x augment_reference
+    (tudo uma imagem por vez), sem disco. As duas saídas são comparadas antes de
+    medir: só há comparação de velocidade se o resultado for o mesmo.
+    """
+    src = SyntheticSource(width, height, realtime=False)
+    batch = np.stack([src.read()[1] for _ in range(frames)])
+    keys = list(range(frames))
+    params = AugmentParams()
+    for c in range(copies):
+        ref = np.stack([augment_reference(img, k, c, 0, params, out_size) for img, k in zip(batch, keys)])
+        if not np.array_equal(augment_batch(batch, keys, c, 0, params, out_size), ref):
+            raise AssertionError(f"augment_batch difere de augment_reference (cópia {c})")
+    out: Dict[str, Dict] = {"frames": frames, "copies": copies, "outputs_equal": True}
+    runs = {
+        "batch": lambda c: augment_batch(batch, keys, c, 0, params, out_size),
+        "reference": lambda c: [augment_reference(img, k, c, 0, params, out_size) for img, k in zip(batch, keys)],
+    }
+    for name, fn in runs.items():
+        with ResourceProbe() as probe:
+            t0 = time.perf_counter()
+            for c in range(copies):
+                fn(c)
+            elapsed = time.perf_counter() - t0
+        out[name] = {"images_per_s": frames * copies / elapsed}
+        out[f"{name}_resources"] = probe.result
+    return out
+
+
+def bench_sampler(
+    source_fps: float = 30.0,
+    save_fps: float = 5.0,
+    duration: float = 5.0,
+    jitter_s: float = 0.003,
+    loop_latency_s: float = 0.010,
+    stall: tuple = (2.0, 0.4),
+    seed: int = 0,
+) -> Dict:
+    """
+    Simulação determinística: frames a source_fps com jitter uniforme, latência do
+    loop exponencial (média loop_latency_s) entre captura e decisão e uma parada
+    (início, duração) sem frames. O TimeSampler decide pelo relógio na hora da
+    chamada (como o pipeline antigo); o ScheduledSampler pelo timestamp de captura.
+    Devolve None (com aviso) se a parada não couber dentro da duração.
+    """
+    if stall and not (0 < stall[0] and stall[0] + stall[1] < duration):
+        print(f"[AVISO] Parada {stall[0]:.2f}s + {stall[1]:.2f}s não cabe em {duration:.2f}s; cenário ignorado.")
+        return None
+    rng = np.random.default_rng(seed)
+    ts = np.arange(0.0, duration, 1.0 / source_fps) + rng.uniform(-jitter_s, jitter_s, int(np.ceil(duration * source_fps)))
+    ts = np.sort(ts[(ts >= 0) & (ts < duration)])
+    if stall:
+        ts = ts[(ts < stall[0]) | (ts >= stall[0] + stall[1])]
+    # o loop é sequencial: uma decisão não acontece antes da anterior
+    calls = np.maximum.accumulate(ts + rng.exponential(loop_latency_s, len(ts)))
+    out: Dict[str, Dict] = {"expected": int(round(duration * save_fps))}
+    if stall:
+        out["stall"] = {"start_s": stall[0], "length_s": stall[1]}
+
+    interval = TimeSampler(save_fps)
+    picked = np.array([t for t, c in zip(ts, calls) if interval.should_save(float(c))])
+    targets = ts[0] + np.arange(len(picked)) / save_fps
+    gaps = np.diff(picked) * 1000.0
+    out["interval"] = {
+        "picked": len(picked),
+        # erro em relação à agenda ideal (o k-ésimo salvo deveria estar em t0 + k / fps)
+        "error_mean_ms": float(np.abs(picked - targets).mean() * 1000.0) if len(picked) else 0.0,
+        "interval_std_ms": float(gaps.std()) if gaps.size else 0.0,
+    }
+
+    scheduled = ScheduledSampler(save_fps)
+    for t in ts:
+        scheduled.offer(float(t))
+    scheduled.flush(before=ts[0] + duration)
+    rep = scheduled.report()
+    out["scheduled"] = {k: rep[k] for k in ("picked", "missed", "error_mean_ms", "error_max_ms", "interval_std_ms")}
+    return out
+
+
+IMPORT_TARGETS = {"package": "framecapture", "pipeline": "framecapture.pipeline", "gui": "framecapture.ui"}
+
+
+def bench_import(runs: int = 3) -> Dict:
+    """Tempo de import (processo Python novo a cada execução) dos principais pontos de entrada."""
+    root = Path(__file__).resolve().parent.parent
+    out = {}
+    for key, module in IMPORT_TARGETS.items():
+        code = f"import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+        samples = []
+        for _ in range(runs):
+            proc = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True)
+            if proc.returncode != 0:
+                break
+            samples.append(float(proc.stdout.strip().splitlines()[-1]))
+        if samples:
+            out[key] = percentiles_ms(samples)
+    return out
+
+
+def sampler_stall(duration: float) -> tuple:
+    """Parada de 0.4s começando em 40% da sessão (2.0s em 5s); a duração ainda precisa comportá-la."""
+    return (0.4 * duration, 0.4)
+
+
+def run_suite(args) -> Dict:
+    results: Dict[str, Dict] = {}
+    with tempfile.TemporaryDirectory(prefix="framecapture_bench_") as tmp:
+        tmp = Path(tmp)
+        for res in args.resolutions.split(","):
+            w, h = (int(v) for v in res.lower().split("x"))
+            print(f"[INFO] Benchmark {w}x{h}...")
+            results[f"{w}x{h}"] = {
+                "storage": bench_storage(w, h, args.frames, tmp / f"storage_{w}x{h}"),
+                "pipeline": bench_pipeline(
+                    w, h, args.source_fps, args.save_fps, args.duration, tmp / f"pipeline_{w}x{h}",
+                    storage_workers=args.storage_workers, threaded=args.threaded, roi_crop=args.roi, mjpeg=args.mjpeg,
+                    frame_pool=args.pool,
+                ),
+                "guide": bench_guide(w, h, args.frames),
+                "augment": bench_augment(w, h, args.frames),
+            }
+    results["sampler"] = {"steady": bench_sampler(args.source_fps, args.save_fps, args.duration, stall=())}
+    stalled = bench_sampler(args.source_fps, args.save_fps, args.duration, stall=sampler_stall(args.duration))
+    if stalled is not None:
+        results["sampler"]["stall"] = stalled
+    results["import"] = bench_import()
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "opencv": cv2.__version__,
+            "platform": platform.platform(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+
+
+# diferenças absolutas menores que isso são ruído de execução, mesmo acima da tolerância
+MIN_ABS_DELTA_MS = 0.25
+MIN_ABS_DELTA = {"cpu_pct": 5.0, "rss_mb": 5.0, "frames_dropped": 1.0}
+
+
+def median_results(runs: List[Dict]) -> Dict:
+    """Mediana, métrica a métrica, de várias execuções de run_suite (mesma estrutura)."""
+    first = runs[0]
+    out: Dict = {}
+    for key, value in first.items():
+        values = [r[key] for r in runs if key in r]
+        if isinstance(value, dict):
+            out[key] = median_results([v for v in values if isinstance(v, dict)])
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            out[key] = float(np.median([v for v in values if isinstance(v, (int, float))]))
+        else:
+            out[key] = value
+    return out
+
+
+def spread(runs: List[Dict]) -> Dict[str, List[float]]:
+    """[mínimo, máximo] de cada métrica entre as execuções (chaves achatadas)."""
+    flat = [_flatten(r) for r in runs]
+    return {k: [min(f[k] for f in flat if k in f), max(f[k] for f in flat if k in f)] for k in flat[0]}
+
+
+def _min_delta(key: str) -> float:
+    leaf = key.rsplit(".", 1)[-1]
+    if leaf.endswith("_ms"):
+        return MIN_ABS_DELTA_MS
+    return MIN_ABS_DELTA.get(leaf, 0.0)
+
+
+def _flatten(d: Dict, prefix: str = "") -> Dict[str, float]:
+    out = {}
+    for k, v in d.items():
+        key = f"{prefix}.{k}" if prefix else k
+        if isinstance(v, dict):
+            out.update(_flatten(v, key))
+        elif isinstance(v, (int, float)) and not isinstance(v, bool):
+            out[key] = float(v)
+    return out
+
+
+def _direction(key: str) -> Optional[str]:
+    """'higher' / 'lower' é melhor; None = métrica não comparada."""
+    leaf = key.rsplit(".", 1)[-1]
+    if leaf in ("save_rate_fps", "images_per_s", "picked"):
+        return "higher"
+    # p99/max são ruidosos demais em execuções curtas para servir de alarme
+    if leaf in ("mean_ms", "p50_ms", "p90_ms", "std_ms", "cpu_pct", "rss_mb", "frames_dropped"):
+        return "lower"
+    return None
+
+
+def compare(current: Dict, baseline: Dict, tolerance: float = 0.10) -> List[Dict]:
+    """
+    Métricas que pioraram mais que tolerance (fração) e mais que o piso absoluto
+    (_min_delta) em relação ao baseline. Use resultados com mediana de várias
+    execuções (--repeat): percentis de uma execução só variam mais que 10%.
+    Com current["spread"] a piora também precisa se repetir em todas as
+    execuções (até a melhor delas é pior que o baseline).
+    """
+    cur = _flatten(current["results"])
+    base = _flatten(baseline["results"])
+    rng = current.get("spread", {})
+    regressions = []
+    for key, old in base.items():
+        direction = _direction(key)
+        if direction is None or key not in cur:
+            continue
+        new = cur[key]
+        best = rng.get(key, [new, new])
+        if direction == "lower":
+            worse = new > old * (1 + tolerance) and new - old > _min_delta(key) and best[0] > old
+        else:
+            worse = new < old * (1 - tolerance) and best[1] < old
+        if worse:
+            regressions.append({"metric": key, "baseline": old, "current": new, "better": direction})
+    return regressions
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m framecapture.bench", description="Benchmarks do pipeline sem câmera.")
+    ap.add_argument("--resolutions", default="640x480,1280x720,1920x1080", help="lista WxH separada por vírgula")
+    ap.add_argument("--source-fps", type=float, default=30.0)
+    ap.add_argument("--save-fps", type=float, default=5.0)
+    ap.add_argument("--duration", type=float, default=5.0, help="duração da sessão do cenário pipeline (s)")
+    ap.add_argument("--frames", type=int, default=60, help="frames dos cenários storage/guide")
+    ap.add_argument("--storage-workers", type=int, default=0)
+    ap.add_argument("--threaded", action="store_true", help="usa ThreadedVideoSource no cenário pipeline")
+    ap.add_argument("--roi", action="store_true", help="salva só o recorte da mão no cenário pipeline")
+    ap.add_argument("--mjpeg", action="store_true", help="fonte MJPEG em passthrough no cenário pipeline")
+    ap.add_argument("--pool", action="store_true", help="FramePool (buffers reutilizados) no cenário pipeline")
+    ap.add_argument("--out", type=Path, help="grava o resultado JSON neste arquivo")
+    ap.add_argument("--baseline", type=Path, help="JSON de referência para comparação")
+    ap.add_argument("--tolerance", type=float, default=0.10, help="piora tolerada (fração, padrão 0.10)")
+    ap.add_argument("--repeat", type=int, default=3, help="execuções da suíte; o resultado é a mediana de cada métrica")
+    args = ap.parse_args(argv)
+
+    runs = []
+    for i in range(max(1, args.repeat)):
+        if args.repeat > 1:
+            print(f"[INFO] Execução {i + 1}/{args.repeat}")
+        runs.append(run_suite(args))
+    result = runs[0]
+    result["meta"]["repeat"] = len(runs)
+    result["results"] = median_results([r["results"] for r in runs])
+    result["spread"] = spread([r["results"] for r in runs])
+    text = json.dumps(result, indent=2, default=str)
+    if args.out:
+        args.out.write_text(text, encoding="utf-8")
+        print(f"[INFO] Resultado gravado em {args.out}")
+    else:
+        print(text)
+
+    if args.baseline:
+        regressions = compare(result, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+        for r in regressions:
+            print(f"[REGRESSAO] {r['metric']}: {r['baseline']:.3f} -> {r['current']:.3f} ({r['better']} é melhor)")
+        if regressions:
+            return 1
+        print("[INFO] Sem regressões em relação ao baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+# scr/framecapture/bufferpool.py
+from __future__ import annotations
+from collections import deque
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional, Tuple
+import logging
+import threading
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class PoolStats:
+    size: int = 0            # buffers do pool (pré-alocados + crescimento)
+    acquired: int = 0        # empréstimos atendidos pelo pool
+    grown: int = 0           # buffers acrescentados sob demanda (pool sem buffer livre)
+    exhausted: int = 0       # pedidos sem buffer livre no limite (atendidos com alocação avulsa)
+    reshaped: int = 0        # realocações por mudança de resolução
+    peak_in_use: int = 0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+class FramePool:
+    """
+    Pool fixo de buffers de frame pré-alocados. As fontes leem direto num buffer
+    emprestado (cap.read(image=buf)) e quem precisa guardar o frame além da
+    iteração atual (fila de gravação, ring da leitura em thread) chama retain();
+    cada acquire()/retain() é desfeito por um release(). O buffer volta ao pool
+    quando a contagem chega a zero.
+
+    Os `size` buffers iniciais são alocados no primeiro acquire() com a forma do
+    frame. Sem buffer livre o pool cresce um buffer por vez até max_size (padrão
+    = size, pool fixo); no limite, acquire() devolve um array avulso (fora do
+    pool) e conta em stats.exhausted: a captura não trava, mas o pool está
+    pequeno demais. Assim o pool pode começar com os frames realmente em uso e
+    só crescer quando a fila de gravação de fato acumular.
+
+    retain()/release() também aceitam views de um buffer do pool (ex.: o recorte
+    de ROI sem redimensionar) e contam a referência no buffer de origem.
+    """
+    def __init__(self, size: int, dtype=np.uint8, max_size: Optional[int] = None):
+        self.dtype = np.dtype(dtype)
+        self.initial_size = max(1, int(size))
+        self.max_size = max(self.initial_size, int(max_size or 0))
+        self.stats = PoolStats(size=self.initial_size)
+        self.shape: Optional[Tuple[int, ...]] = None
+        self._free: deque[np.ndarray] = deque()
+        self._refs: Dict[int, int] = {}        # id(buffer) -> referências (só buffers do pool)
+        self._owned: Dict[int, np.ndarray] = {}
+        self._lock = threading.Lock()
+
+    def _allocate(self, shape: Tuple[int, ...]):
+        self.shape = shape
+        self._owned = {}
+        self._free.clear()
+        self.stats.size = self.initial_size
+        for _ in range(self.initial_size):
+            self._add_buffer()
+
+    def _add_buffer(self) -> np.ndarray:
+        buf = np.empty(self.shape, dtype=self.dtype)
+        self._owned[id(buf)] = buf
+        self._free.append(buf)
+        return buf
+
+    def acquire(self, shape: Tuple[int, ...]) -> np.ndarray:
+        shape = tuple(shape)
+        with self._lock:
+            if shape != self.shape:
+                if self._refs:
+                    # resolução mudou com buffers emprestados: avulso até eles voltarem
+                    self.stats.exhausted += 1
+                    return np.empty(shape, dtype=self.dtype)
+                if self.shape is not None:
+                    self.stats.reshaped += 1
+                self._allocate(shape)
+            if not self._free and self.stats.size < self.max_size:
+                self._add_buffer()
+                self.stats.size += 1
+                self.stats.grown += 1
+            if not self._free:
+                self.stats.exhausted += 1
+                if self.stats.exhausted == 1:
+                    log.warning("Pool de frames esgotado (%d buffers); usando alocação avulsa.", self.stats.size)
+                return np.empty(shape, dtype=self.dtype)
+            # LIFO: reusa o buffer mais recente; os que nunca são pedidos nem chegam a ocupar RAM
+            buf = self._free.pop()
+            self._refs[id(buf)] = 1
+            self.stats.acquired += 1
+            self.stats.peak_in_use = max(self.stats.peak_in_use, len(self._refs))
+            return buf
+
+    def owns(self, buf) -> bool:
+        return buf is not None and self._owned.get(id(buf)) is buf
+
+    def owner(self, buf) -> Optional[np.ndarray]:
+        """Buffer do pool que contém buf (o próprio buf ou a origem de uma view); None se avulso."""
+        while buf is not None:
+            if self.owns(buf):
+                return buf
+            buf = getattr(buf, "base", None)
+        return None
+
+    def retain(self, buf: np.ndarray):
+        with self._lock:
+            buf = self.owner(buf)
+            if buf is not None and id(buf) in self._refs:
+                self._refs[id(buf)] += 1
+
+    def release(self, buf: np.ndarray):
+        with self._lock:
+            buf = self.owner(buf)
+            if buf is None:
+                return  # avulso ou de uma forma anterior: o GC cuida
+            key = id(buf)
+            n = self._refs.get(key, 0) - 1
+            if n > 0:
+                self._refs[key] = n
+            elif n == 0:
+                del self._refs[key]
+                self._free.append(buf)
+
+    @property
+    def in_use(self) -> int:
+        return len(self._refs)
@@ -0,0 +1,198 @@
+# scr/framecapture/cli.py
+"""
+Modo headless: roda sessões de captura roteirizadas sem Tk.
+
+    python main.py --output D:/dataset --letters A,B,C --sessions 3
+    python -m framecapture --output /data --letters ABC --no-preview --countdown 3
+    python -m framecapture --output /data --letters A --cameras 0,1   # multicâmera (<letra>/camN/)
+
+Sem preview nenhuma janela do OpenCV é criada; a contagem regressiva (se houver)
+é mostrada no console.
+"""
+from __future__ import annotations
+import argparse
+import logging
+import string
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+from .config import CaptureConfig
+from .multicam import MultiCapturePipeline
+from .pipeline import CapturePipeline
+from .service import CaptureService, open_camera
+
+log = logging.getLogger(__name__)
+
+
+def parse_letters(spec: str) -> List[str]:
+    """'A,B,C', 'ABC' ou 'A-E' -> ['A', 'B', 'C', ...]."""
+    letters: List[str] = []
+    for part in spec.upper().replace(" ", "").split(","):
+        if len(part) == 3 and part[1] == "-" and part[0].isalpha() and part[2].isalpha():
+            letters.extend(string.ascii_uppercase[string.ascii_uppercase.index(part[0]):string.ascii_uppercase.index(part[2]) + 1])
+        else:
+            letters.extend(c for c in part if c in string.ascii_uppercase)
+    if not letters:
+        raise argparse.ArgumentTypeError(f"nenhuma letra válida em {spec!r}")
+    return letters
+
+
+def _parse_size(spec: str):
+    w, h = spec.lower().split("x")
+    return int(w), int(h)
+
+
+def _parse_indices(spec: str):
+    """'0,1' -> (0, 1)."""
+    try:
+        indices = tuple(int(p) for p in spec.replace(" ", "").split(",") if p)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"índices inválidos em {spec!r}")
+    if not indices:
+        raise argparse.ArgumentTypeError(f"nenhum índice em {spec!r}")
+    return indices
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="framecapture", description="Captura de frames sem interface gráfica.")
+    ap.add_argument("-o", "--output", type=Path, required=True, help="diretório pai das pastas A..Z")
+    ap.add_argument("-l", "--letters", type=parse_letters, default=["A"], help="ex.: A,B,C | ABC | A-E")
+    ap.add_argument("-n", "--sessions", type=int, default=1, help="sessões por letra")
+    ap.add_argument("-d", "--duration", type=float, default=5.0, help="duração de cada gravação (s)")
+    ap.add_argument("--fps", type=float, default=5.0, help="frames salvos por segundo")
+    ap.add_argument("--camera", type=int, default=0, help="índice da câmera")
+    ap.add_argument("--cameras", type=_parse_indices, metavar="I,J,...",
+                    help="multicâmera: grava as câmeras em sincronia em <letra>/camN/ (sem serviço/gatilho)")
+    ap.add_argument("--fourcc", default="", help="formato pedido à câmera, ex.: MJPG")
+    ap.add_argument("--resolution", type=_parse_size, metavar="WxH", help="resolução pedida à câmera")
+    ap.add_argument("--camera-fps", type=float, default=0.0, help="fps pedido à câmera")
+    ap.add_argument("--passthrough", action="store_true", help="MJPEG: grava os bytes da câmera sem recodificar")
+    ap.add_argument("--countdown", type=float, default=5.0, help="contagem antes de cada gravação (s); com --trigger presence, espera máxima")
+    ap.add_argument("--trigger", choices=("countdown", "presence"), default="countdown",
+                    help="presence: começa a gravar quando a mão aparece no círculo")
+    ap.add_argument("--sampler", choices=("interval", "scheduled"), default="interval",
+                    help="interval: intervalo desde o último salvo; scheduled: agenda fixa pelo timestamp de captura")
+    ap.add_argument("--pause", type=float, default=0.0, help="pausa entre sessões (s)")
+    ap.add_argument("--no-preview", action="store_true", help="não abre janela do OpenCV")
+    ap.add_argument("--preview-process", action="store_true", help="janela do preview em outro processo (memória compartilhada)")
+    ap.add_argument("--storage-workers", type=int, default=2)
+    ap.add_argument("--backend", choices=("files", "shards"), default="files")
+    ap.add_argument("--roi", action="store_true", help="salva só o recorte da mão")
+    ap.add_argument("--manifest", action="store_true", help="registra cada frame em <letra>/manifest.sqlite")
+    ap.add_argument("--no-frame-pool", action="store_true", help="aloca um array novo por frame")
+    ap.add_argument("--synthetic", type=_parse_size, metavar="WxH", help="usa fonte sintética (teste sem câmera)")
+    ap.add_argument("-v", "--verbose", action="store_true", help="log de cada frame salvo")
+    return ap
+
+
+def _console_countdown(seconds: float):
+    end = time.monotonic() + seconds
+    while True:
+        remaining = end - time.monotonic()
+        if remaining <= 0:
+            break
+        print(f"\r  gravando em {remaining:4.1f}s ", end="", flush=True)
+        time.sleep(min(0.1, remaining))
+    print("\r  GO!              ", flush=True)
+
+
+def run_session(args, letter: str, service: CaptureService):
+    """Uma sessão: CapturePipeline (câmera do serviço) ou, com --cameras, MultiCapturePipeline."""
+    preview = not args.no_preview
+    presence = args.trigger == "presence"
+    cfg = CaptureConfig(
+        output_parent=args.output,
+        output_dir_name=letter,
+        save_fps=args.fps,
+        sampler=args.sampler,
+        camera_index=args.camera,
+        camera_fourcc=args.fourcc or ("MJPG" if args.passthrough else ""),
+        camera_width=args.resolution[0] if args.resolution else 0,
+        camera_height=args.resolution[1] if args.resolution else 0,
+        camera_fps=args.camera_fps,
+        passthrough=args.passthrough,
+        preview=preview,
+        preview_process=args.preview_process,
+        max_duration_seconds=args.duration,
+        pre_countdown_seconds=args.countdown if preview or presence else 0.0,
+        trigger_mode=args.trigger,
+        storage_workers=args.storage_workers,
+        storage_backend=args.backend,
+        threaded_capture=True,
+        roi_crop=args.roi,
+        write_manifest=args.manifest,
+        frame_pool_size=0 if args.no_frame_pool else -1,
+        camera_indices=args.cameras or (),
+    )
+    if args.cameras:
+        return run_multicam_session(args, cfg)
+    pipeline = CapturePipeline(cfg, service=service)
+    if not preview and not presence and args.countdown > 0:
+        _console_countdown(args.countdown)
+    pipeline.start()
+    try:
+        pipeline.wait()
+    except KeyboardInterrupt:
+        pipeline.stop()
+        raise
+    return pipeline
+
+
+def run_multicam_session(args, cfg: CaptureConfig) -> MultiCapturePipeline:
+    sources = None
+    if args.synthetic:
+        from .video import SyntheticSource  # só para testes
+        sources = [SyntheticSource(*args.synthetic, fps=30.0) for _ in cfg.camera_indices]
+    pipeline = MultiCapturePipeline(cfg, cfg.camera_indices, sources=sources)
+    if not cfg.preview and cfg.pre_countdown_seconds <= 0 and args.countdown > 0:
+        _console_countdown(args.countdown)
+    pipeline.start()
+    try:
+        pipeline.wait()
+    except KeyboardInterrupt:
+        pipeline.stop()
+        raise
+    return pipeline
+
+
+def main(argv=None) -> int:
+    ap = build_parser()
+    args = ap.parse_args(argv)
+    if args.cameras and args.trigger == "presence":
+        ap.error("--cameras não suporta --trigger presence")
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="[%(levelname)s] %(message)s")
+
+    opener = open_camera
+    if args.synthetic:
+        from .video import SyntheticMJPEGSource, SyntheticSource  # só para testes
+        source_cls = SyntheticMJPEGSource if args.passthrough else SyntheticSource
+        opener = lambda cfg: source_cls(*args.synthetic, fps=30.0)
+    # a câmera fica aberta entre as sessões (sem reabrir/reajustar exposição a cada uma)
+    service = CaptureService(idle_timeout=None, opener=opener)
+
+    total = len(args.letters) * args.sessions
+    done = 0
+    try:
+        for letter in args.letters:
+            for i in range(args.sessions):
+                done += 1
+                log.info("Sessão %d/%d — letra %s (%d/%d)", done, total, letter, i + 1, args.sessions)
+                pipeline = run_session(args, letter, service)
+                if isinstance(pipeline, MultiCapturePipeline):
+                    log.info("Resumo: %s", pipeline.skew_report())
+                else:
+                    log.info("Resumo (%s): %s", pipeline.end_reason, pipeline.metrics.summary())
+                if args.pause > 0 and done < total:
+                    time.sleep(args.pause)
+    except KeyboardInterrupt:
+        log.warning("Interrompido pelo usuário.")
+        return 130
+    finally:
+        service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
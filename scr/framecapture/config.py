@@ -7,15 +7,52 @@ class CaptureConfig:
     output_dir_name: str               # uma letra A..Z
     filename_prefix: str = "frame"
     save_fps: float = 5.0              # <- NOVO: salva ~5 imagens por segundo (tempo-baseado)
+    sampler: str = "interval"          # interval (intervalo desde o último salvo) | scheduled (agenda fixa pelo timestamp de captura)
     camera_index: int = 0
+    camera_fourcc: str = ""            # ex.: "MJPG" (vazio = padrão do driver)
+    camera_width: int = 0              # resolução pedida à câmera (0 = padrão do driver)
+    camera_height: int = 0
+    camera_fps: float = 0.0            # fps pedido à câmera (0 = padrão do driver)
+    camera_buffer_size: int = 0        # CAP_PROP_BUFFERSIZE do driver (0 = padrão)
+    passthrough: bool = False          # MJPEG: grava os bytes da câmera sem decodificar/recodificar
     image_ext: str = "jpg"
     preview: bool = True
+    preview_process: bool = False      # janela do preview em outro processo (a captura nunca espera a renderização; opcional)
+    preview_max_fps: float = 15.0      # taxa máxima do preview (independente da captura)
+    preview_max_width: int = 960       # largura máxima exibida (o processo de preview reduz)
     max_duration_seconds: float = 5.0  # cada sessão dura no máximo 5s
+    pre_countdown_seconds: float = 5.0  # guia de posicionamento antes de gravar (0 = sem guia)
+    trigger_mode: str = "countdown"    # countdown | presence (grava quando a mão aparece no círculo;
+                                       # pre_countdown_seconds vira a espera máxima, 0 = sem limite)
+    storage_workers: int = 0           # >0 ativa write-behind (threads de encode/escrita)
+    storage_queue_size: int = 32       # tamanho máximo da fila do write-behind
+    storage_backpressure: str = "block"  # block | drop-oldest | drop-newest
+    threaded_capture: bool = False     # thread dedicada lendo a câmera (frame mais recente)
+    capture_buffer_size: int = 1       # frames mantidos pela thread de leitura
+    frame_pool_size: int = 0           # buffers de frame pré-alocados reutilizados (0 = desligado, -1 = automático)
+    storage_backend: str = "files"     # files (um arquivo por frame) | shards (shards append-only)
+    camera_indices: tuple[int, ...] = ()  # multicâmera: índices gravados em sincronia (vazio = só camera_index)
+    max_skew_seconds: float = 0.05     # multicâmera: descarta conjuntos com diferença de captura maior
+    write_metrics: bool = True         # grava metrics_<pasta>_<sessão>.json ao lado da pasta de saída
+    write_manifest: bool = False       # registra cada frame em <pasta>/manifest.sqlite (backend files; opcional)
+    quality_min_sharpness: float = 0.0  # filtro de qualidade: nitidez mínima (0 = desligado)
+    quality_max_hash_distance: int = -1  # filtro de qualidade: descarta quase duplicados até N bits (-1 = desligado)
+    quality_history: int = 8           # filtro de qualidade: frames aceitos usados na comparação
+    guide_radius_frac: float = 0.22    # raio do círculo do guia (fração do menor lado)
+    roi_crop: bool = False             # salva só a região do círculo do guia
+    roi_pad_frac: float = 0.0          # margem extra em volta do círculo (0.25 = 25%)
+    roi_output_size: tuple[int, int] | None = (224, 224)  # (largura, altura) do recorte salvo; None = tamanho nativo
 
-    def get_output_dir(self) -> Path:
+    def get_letter(self) -> str:
         letter = (self.output_dir_name or "A").strip().upper()
         if len(letter) != 1 or not letter.isalpha():
             letter = "A"
-        base = self.output_parent / letter
+        return letter
+
+    def get_shards_dir(self) -> Path:
+        return self.output_parent / "shards"
+
+    def get_output_dir(self) -> Path:
+        base = self.output_parent / self.get_letter()
         base.mkdir(parents=True, exist_ok=True)
         return base
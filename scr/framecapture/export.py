@@ -0,0 +1,324 @@
+# scr/framecapture/export.py
+"""
+Exporta as pastas A..Z (layout de CaptureConfig.get_output_dir) para um dataset
+de arrays pronto para treino, decodificado uma única vez:
+
+  dst/images.u8      uint8 cru, N x H x W x C (np.memmap)
+  dst/labels.u8      uint8 cru, N (0 = A ... 25 = Z)
+  dst/index.jsonl    uma linha por linha do array: caminho relativo, letra, câmera, mtime, tamanho
+  dst/manifest.json  forma, ordem de canais, N (gravado por último = ponto de commit)
+
+    python -m framecapture.export D:/dataset D:/dataset_224 --size 224x224 --jobs 8
+    python -m framecapture.export D:/dataset D:/dataset_224          # de novo: só o que é novo
+
+Frames da captura multicâmera (<letra>/cam<N>/) entram como os demais, com o
+número da câmera em index.jsonl ("camera"; null para frames direto na pasta).
+
+Reexecuções são incrementais: frames já exportados (mesmo caminho, mtime e
+tamanho) são pulados; arquivos alterados ou que falharam antes são
+reprocessados na mesma linha. Decodificação e resize rodam num pool de
+processos, cada um escrevendo direto no memmap. Arquivos removidos da origem
+continuam no dataset.
+
+Leitura sem cópia:
+
+    ds = ArrayDataset("D:/dataset_224")
+    x, y = ds.images, ds.labels        # memmaps somente leitura
+"""
+from __future__ import annotations
+import argparse
+import json
+import logging
+import os
+import re
+import string
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+import cv2
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+IMAGE_EXTENSIONS = (".jpg", ".jpeg", ".png", ".bmp")
+IMAGES_FILE = "images.u8"
+LABELS_FILE = "labels.u8"
+INDEX_FILE = "index.jsonl"
+MANIFEST_FILE = "manifest.json"
+FORMAT_VERSION = 1
+CHUNK = 64  # frames por tarefa do pool
+CAMERA_DIR = re.compile(r"cam(\d+)")  # subpastas do MultiCapturePipeline
+
+
+@dataclass
+class SourceFrame:
+    rel: str          # caminho relativo à origem, com "/"
+    letter: str
+    mtime_ns: int
+    size: int
+    camera: Optional[int] = None  # N de <letra>/cam<N>/ (captura multicâmera)
+
+
+def _scan_images(folder: str, rel: str, letter: str, camera: Optional[int], out: List[SourceFrame]) -> List[Tuple[int, str]]:
+    """Imagens de folder em ordem de nome; devolve as subpastas cam<N> encontradas."""
+    try:
+        entries = sorted(os.scandir(folder), key=lambda e: e.name)
+    except OSError:
+        return []
+    cams = []
+    for e in entries:
+        if os.path.splitext(e.name)[1].lower() in IMAGE_EXTENSIONS and e.is_file():
+            st = e.stat()
+            out.append(SourceFrame(f"{rel}/{e.name}", letter, st.st_mtime_ns, st.st_size, camera))
+        elif camera is None and e.is_dir():
+            m = CAMERA_DIR.fullmatch(e.name)
+            if m:
+                cams.append((int(m.group(1)), e.name))
+    return cams
+
+
+def scan_letters(src_root: Path, letters: str = string.ascii_uppercase) -> List[SourceFrame]:
+    """
+    Uma listagem por pasta de letra e por subpasta cam<N> dela; ordem estável
+    (letra, frames da pasta, câmeras em ordem numérica, nome).
+    """
+    out: List[SourceFrame] = []
+    for letter in letters:
+        folder = os.path.join(src_root, letter)
+        for cam, name in sorted(_scan_images(folder, letter, letter, None, out)):
+            _scan_images(os.path.join(folder, name), f"{letter}/{name}", letter, cam, out)
+    return out
+
+
+def _read_index(dst: Path) -> List[dict]:
+    path = dst / INDEX_FILE
+    if not path.exists():
+        return []
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _write_atomic(path: Path, text: str):
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _open_arrays(dst: Path, n: int, shape: Tuple[int, int, int], mode: str = "r+"):
+    """Memmaps de imagens/rótulos com n linhas (cresce os arquivos se preciso)."""
+    h, w, c = shape
+    for name, row_bytes in ((IMAGES_FILE, h * w * c), (LABELS_FILE, 1)):
+        if mode == "r":
+            break
+        path = dst / name
+        with open(path, "ab") as f:
+            if f.tell() < n * row_bytes:
+                f.truncate(n * row_bytes)
+    if n == 0:
+        return np.zeros((0, h, w, c), np.uint8), np.zeros(0, np.uint8)
+    images = np.memmap(dst / IMAGES_FILE, dtype=np.uint8, mode=mode, shape=(n, h, w, c))
+    labels = np.memmap(dst / LABELS_FILE, dtype=np.uint8, mode=mode, shape=(n,))
+    return images, labels
+
+
+def _decode_chunk(job) -> List[int]:
+    """
+    Processo filho: decodifica, redimensiona e escreve as linhas no memmap.
+    Devolve as linhas que falharam.
+    """
+    src_root, dst, n, shape, rgb, rows = job
+    cv2.setNumThreads(1)
+    h, w, c = shape
+    images, _ = _open_arrays(Path(dst), n, shape)
+    flag_full = cv2.IMREAD_GRAYSCALE if c == 1 else cv2.IMREAD_COLOR
+    reduced = {2: cv2.IMREAD_REDUCED_COLOR_2, 4: cv2.IMREAD_REDUCED_COLOR_4, 8: cv2.IMREAD_REDUCED_COLOR_8}
+    if c == 1:
+        reduced = {2: cv2.IMREAD_REDUCED_GRAYSCALE_2, 4: cv2.IMREAD_REDUCED_GRAYSCALE_4, 8: cv2.IMREAD_REDUCED_GRAYSCALE_8}
+    factor = 1   # capturas da mesma câmera têm o mesmo tamanho: reaproveita o fator
+    failed = []
+    for row, rel in rows:
+        path = os.path.join(src_root, rel)
+        img = cv2.imread(path, reduced[factor] if factor > 1 else flag_full)
+        if img is not None and factor > 1 and (img.shape[0] < h or img.shape[1] < w):
+            img = cv2.imread(path, flag_full)  # tamanho diferente: decodifica inteiro
+        if img is None:
+            failed.append(row)
+            continue
+        if factor == 1:
+            # JPEG decodifica direto em 1/2, 1/4 ou 1/8 se ainda couber no alvo
+            while factor < 8 and img.shape[0] // (factor * 2) >= h and img.shape[1] // (factor * 2) >= w:
+                factor *= 2
+        out = cv2.resize(img, (w, h), interpolation=cv2.INTER_AREA)
+        if c == 3 and rgb:
+            cv2.cvtColor(out, cv2.COLOR_BGR2RGB, dst=out)
+        images[row] = out.reshape(h, w, c)
+    images.flush()
+    del images
+    return failed
+
+
+def export_dataset(
+    src_root: Path,
+    dst: Path,
+    size: Tuple[int, int] = (224, 224),
+    gray: bool = False,
+    rgb: bool = True,
+    jobs: int = 0,
+) -> Dict:
+    """
+    Exporta/atualiza dst a partir de src_root. size = (largura, altura).
+    Devolve um resumo (novos, atualizados, falhas, total, tempo).
+    """
+    src_root, dst = Path(src_root), Path(dst)
+    dst.mkdir(parents=True, exist_ok=True)
+    w, h = size
+    shape = (h, w, 1 if gray else 3)
+    order = "gray" if gray else ("rgb" if rgb else "bgr")
+
+    manifest_path = dst / MANIFEST_FILE
+    index = []
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if tuple(manifest["shape"]) != shape or manifest["channel_order"] != order:
+            raise ValueError(
+                f"{dst} já tem um dataset {manifest['shape']} ({manifest['channel_order']}); "
+                f"use outro destino para {list(shape)} ({order})"
+            )
+        # linhas além de count são restos de uma execução interrompida
+        index = _read_index(dst)[: manifest["count"]]
+
+    t0 = time.perf_counter()
+    by_rel = {e["rel"]: e for e in index}
+    todo: List[Tuple[int, str]] = []
+    added = updated = 0
+    for f in scan_letters(src_root):
+        entry = by_rel.get(f.rel)
+        if entry is None:
+            entry = {
+                "row": len(index), "rel": f.rel, "letter": f.letter, "camera": f.camera,
+                "mtime_ns": f.mtime_ns, "size": f.size, "ok": False,
+            }
+            index.append(entry)
+            by_rel[f.rel] = entry
+            added += 1
+        elif entry["ok"] and entry["mtime_ns"] == f.mtime_ns and entry["size"] == f.size:
+            continue
+        else:
+            entry.update(mtime_ns=f.mtime_ns, size=f.size)
+            updated += 1
+        todo.append((entry["row"], f.rel))
+
+    n = len(index)
+    images, labels = _open_arrays(dst, n, shape)
+    for row, _ in todo:
+        labels[row] = ord(index[row]["letter"]) - ord("A")
+    if n:
+        labels.flush()
+    del images, labels
+
+    failed: List[int] = []
+    if todo:
+        chunks = [
+            (str(src_root), str(dst), n, shape, rgb, todo[i:i + CHUNK])
+            for i in range(0, len(todo), CHUNK)
+        ]
+        jobs = max(1, min(jobs or os.cpu_count() or 1, len(chunks)))
+        if jobs == 1:
+            for c in chunks:
+                failed.extend(_decode_chunk(c))
+        else:
+            with ProcessPoolExecutor(max_workers=jobs) as pool:
+                for rows in pool.map(_decode_chunk, chunks):
+                    failed.extend(rows)
+    bad = set(failed)
+    for row, _ in todo:
+        index[row]["ok"] = row not in bad
+    for row in sorted(bad):
+        log.warning("Falha ao decodificar %s", index[row]["rel"])
+
+    # índice e manifesto por último: uma execução interrompida não altera count
+    _write_atomic(dst / INDEX_FILE, "".join(json.dumps(e) + "\n" for e in index))
+    _write_atomic(manifest_path, json.dumps({
+        "version": FORMAT_VERSION,
+        "count": n,
+        "shape": list(shape),
+        "dtype": "uint8",
+        "channel_order": order,
+        "letters": string.ascii_uppercase,
+        "source": str(src_root),
+        "updated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }, indent=2))
+
+    elapsed = time.perf_counter() - t0
+    return {
+        "total": n,
+        "added": added,
+        "updated": updated,
+        "failed": len(bad),
+        "processed": len(todo),
+        "seconds": elapsed,
+        "frames_per_s": len(todo) / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+class ArrayDataset:
+    """
+    Acesso mmap (sem cópia) a um dataset exportado.
+    images: N x H x W x C uint8, labels: N uint8 (0 = A). valid marca as linhas
+    decodificadas com sucesso.
+    """
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.manifest = json.loads((self.root / MANIFEST_FILE).read_text(encoding="utf-8"))
+        n, shape = self.manifest["count"], tuple(self.manifest["shape"])
+        self.images, self.labels = _open_arrays(self.root, n, shape, mode="r")
+        self.index = _read_index(self.root)[:n]
+        self.valid = np.fromiter((e["ok"] for e in self.index), dtype=bool, count=len(self.index))
+
+    @property
+    def letters(self) -> str:
+        return self.manifest["letters"]
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def __getitem__(self, i: int):
+        return self.images[i], int(self.labels[i])
+
+    def letter(self, i: int) -> str:
+        return self.letters[self.labels[i]]
+
+
+def _parse_size(spec: str) -> Tuple[int, int]:
+    w, h = spec.lower().split("x")
+    return int(w), int(h)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m framecapture.export", description="Exporta pastas A..Z para arrays (memmap).")
+    ap.add_argument("src", type=Path, help="diretório pai das pastas A..Z")
+    ap.add_argument("dst", type=Path, help="diretório do dataset exportado")
+    ap.add_argument("--size", type=_parse_size, default=(224, 224), metavar="WxH")
+    ap.add_argument("--gray", action="store_true", help="um canal (tons de cinza)")
+    ap.add_argument("--bgr", action="store_true", help="mantém a ordem BGR do OpenCV (padrão: RGB)")
+    ap.add_argument("-j", "--jobs", type=int, default=0, help="processos (0 = nº de CPUs)")
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
+
+    try:
+        r = export_dataset(args.src, args.dst, args.size, gray=args.gray, rgb=not args.bgr, jobs=args.jobs)
+    except ValueError as e:
+        log.error("%s", e)
+        return 2
+    log.info(
+        "%d frames no dataset | novos %d, atualizados %d, falhas %d | %.1fs (%.0f frames/s)",
+        r["total"], r["added"], r["updated"], r["failed"], r["seconds"], r["frames_per_s"],
+    )
+    return 1 if r["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
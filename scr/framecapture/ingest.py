@@ -0,0 +1,336 @@
+# scr/framecapture/ingest.py
+"""
+Ingestão offline: extrai frames de vídeos já gravados (ex.: celular) pelo mesmo
+caminho da captura ao vivo (TimeSampler -> recorte/qualidade -> FrameStorage),
+gravando no layout de pastas A..Z.
+
+    python -m framecapture.ingest videos/ -o D:/dataset --fps 5 --jobs 4
+    python -m framecapture.ingest clip.mp4 -o /data --letter B --mode seek
+
+A letra vem de --letter ou é deduzida do caminho: pasta com uma letra
+(videos/B/clip.mp4) ou nome começando por letra + separador (B_clip.mp4).
+
+O tempo usado pelo TimeSampler é o timestamp do frame no vídeo, não o relógio.
+Modos:
+  grab - percorre o vídeo com grab() e só decodifica (retrieve) os frames amostrados
+  seek - pula direto para cada instante amostrado (CAP_PROP_POS_MSEC); compensa
+         quando save_fps é bem menor que o fps do vídeo e o contêiner tem índice
+Vários arquivos são distribuídos num pool de processos. O relatório mostra,
+para os dois modos, segundos de vídeo processados por segundo de CPU
+(video_speed_per_core); frames/s por núcleo (frames percorridos / tempo de CPU)
+só existe no modo grab, já que no seek o decodificador percorre internamente
+os frames entre o keyframe e o instante pedido e só as buscas são contadas.
+
+Nomes dos arquivos: {prefixo}_{vídeo}_{hash do caminho}_{ms do frame no vídeo},
+em vez do {prefixo}_{data/hora}_{contador} do FrameStorage. Mesmo prefixo (e o
+resto do nome não é interpretado por ninguém), mas determinístico: reprocessar o
+mesmo vídeo sobrescreve os frames em vez de duplicá-los. O hash do caminho
+absoluto separa vídeos de mesmo nome vindos de pastas diferentes (ex.:
+IMG_0001.MOV de dois celulares), inclusive entre execuções.
+"""
+from __future__ import annotations
+import argparse
+import hashlib
+import json
+import logging
+import os
+import string
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+import cv2
+
+from .config import CaptureConfig
+from .pipeline import TimeSampler
+from .quality import QualityGate
+from .roi import RoiCropper
+from .storage import FrameStorage
+
+log = logging.getLogger(__name__)
+
+VIDEO_EXTENSIONS = (".mp4", ".mov", ".m4v", ".avi", ".mkv", ".webm", ".3gp")
+MODES = ("grab", "seek")
+
+
+@dataclass
+class IngestResult:
+    """Resultado de um arquivo (serializável entre processos)."""
+    path: str
+    letter: str
+    frames_read: int = 0      # frames percorridos (modo grab)
+    seeks: int = 0            # buscas feitas (modo seek)
+    frames_decoded: int = 0   # frames entregues decodificados
+    frames_saved: int = 0
+    frames_rejected: int = 0  # descartados pelo filtro de qualidade
+    duration_s: float = 0.0   # duração do vídeo
+    wall_s: float = 0.0
+    cpu_s: float = 0.0
+    error: str = ""
+
+    @property
+    def fps_per_core(self) -> float:
+        """Frames percorridos por segundo de CPU (só faz sentido no modo grab)."""
+        return self.frames_read / self.cpu_s if self.cpu_s > 0 else 0.0
+
+    @property
+    def video_speed_per_core(self) -> float:
+        """Segundos de vídeo por segundo de CPU (comparável entre grab e seek)."""
+        return self.duration_s / self.cpu_s if self.cpu_s > 0 else 0.0
+
+
+def letter_for(path: Path) -> Optional[str]:
+    """Deduz a letra pelo nome da pasta (B/) ou do arquivo (B_clip.mp4, B-01.mov)."""
+    parent = path.parent.name.strip().upper()
+    if len(parent) == 1 and parent in string.ascii_uppercase:
+        return parent
+    stem = path.stem.upper()
+    if stem and stem[0] in string.ascii_uppercase and (len(stem) == 1 or not stem[1].isalpha()):
+        return stem[0]
+    return None
+
+
+def find_videos(inputs: Iterable[Path]) -> List[Path]:
+    """Arquivos passados diretamente + vídeos encontrados (recursivamente) nas pastas."""
+    out: List[Path] = []
+    for p in inputs:
+        p = Path(p)
+        if p.is_dir():
+            out.extend(sorted(f for f in p.rglob("*") if f.is_file() and f.suffix.lower() in VIDEO_EXTENSIONS))
+        elif p.is_file():
+            out.append(p)
+        else:
+            log.warning("Ignorando %s (não encontrado)", p)
+    return out
+
+
+def _source_id(path: Path) -> str:
+    """Identificador curto e estável do vídeo (hash do caminho absoluto)."""
+    return hashlib.sha1(str(Path(path).resolve()).encode("utf-8")).hexdigest()[:8]
+
+
+def _frame_names(videos: List[Path]) -> Dict[Path, str]:
+    """Base do nome dos frames por vídeo: stem + id do caminho (não colide entre execuções)."""
+    return {v: f"{v.stem.replace(' ', '_')}_{_source_id(v)}" for v in videos}
+
+
+def _timestamp(cap, index: int, fps: float) -> float:
+    """Instante do frame atual (s); usa o índice quando o backend não informa."""
+    msec = cap.get(cv2.CAP_PROP_POS_MSEC)
+    if msec > 0 or index == 0:
+        return msec / 1000.0
+    return index / fps
+
+
+def ingest_file(path: Path, cfg: CaptureConfig, stem: str, mode: str = "grab") -> IngestResult:
+    """Extrai os frames amostrados de um vídeo para cfg.output_parent/<letra>."""
+    if mode not in MODES:
+        raise ValueError(f"Modo inválido: {mode!r} (use {', '.join(MODES)})")
+    res = IngestResult(str(path), cfg.get_letter())
+    wall0, cpu0 = time.perf_counter(), time.process_time()
+
+    cap = cv2.VideoCapture(str(path))
+    if not cap.isOpened():
+        res.error = "vídeo indisponível"
+        return res
+    fps = cap.get(cv2.CAP_PROP_FPS)
+    fps = float(fps) if fps and fps > 0 else 30.0
+    total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+
+    storage = FrameStorage(
+        cfg.get_output_dir(), cfg.image_ext, cfg.filename_prefix,
+        workers=cfg.storage_workers, queue_size=cfg.storage_queue_size,
+        manifest=cfg.write_manifest, session_id=f"ingest_{stem}",
+    )
+    sampler = TimeSampler(cfg.save_fps)
+    quality = QualityGate(cfg.quality_min_sharpness, cfg.quality_max_hash_distance, cfg.quality_history)
+    if not quality.enabled:
+        quality = None
+    cropper = None
+    if cfg.roi_crop:
+        in_flight = cfg.storage_queue_size + cfg.storage_workers if cfg.storage_workers > 0 else 0
+        cropper = RoiCropper(cfg.roi_output_size, cfg.guide_radius_frac, cfg.roi_pad_frac, buffers=in_flight + 1)
+
+    def keep(frame, t: float, seq: int):
+        res.frames_decoded += 1
+        if cropper is not None:
+            frame = cropper(frame)
+        if quality is not None and not quality.check(frame).accepted:
+            res.frames_rejected += 1
+            return
+        # nome determinístico: reprocessar o mesmo vídeo sobrescreve em vez de duplicar
+        storage.save(frame, name=f"{cfg.filename_prefix}_{stem}_{int(round(t * 1000)):08d}", timestamp=t, seq=seq)
+        res.frames_saved += 1
+
+    t = 0.0
+    try:
+        if mode == "grab":
+            index = 0
+            while cap.grab():
+                t = _timestamp(cap, index, fps)
+                index += 1
+                if sampler.should_save(t):
+                    ok, frame = cap.retrieve()
+                    if ok:
+                        keep(frame, t, index - 1)
+            res.frames_read = index
+        else:
+            step = sampler.interval or 1.0 / fps
+            end = total / fps if total > 0 else float("inf")
+            while t < end:
+                cap.set(cv2.CAP_PROP_POS_MSEC, t * 1000.0)
+                ok, frame = cap.read()
+                if not ok:
+                    break
+                res.seeks += 1
+                keep(frame, t, res.seeks - 1)
+                t += step
+        res.duration_s = total / fps if total > 0 else t
+    except Exception as e:
+        res.error = str(e)
+    finally:
+        cap.release()
+        storage.close()
+    res.wall_s = time.perf_counter() - wall0
+    res.cpu_s = time.process_time() - cpu0
+    return res
+
+
+def _ingest_job(job: Tuple[str, dict, str, str]) -> dict:
+    """Ponto de entrada no processo filho (argumentos/retorno serializáveis)."""
+    path, cfg_kwargs, stem, mode = job
+    cv2.setNumThreads(1)  # um núcleo por arquivo: o paralelismo vem do pool
+    cfg = CaptureConfig(**cfg_kwargs)
+    return asdict(ingest_file(Path(path), cfg, stem, mode))
+
+
+def ingest(
+    videos: List[Path],
+    cfg_kwargs: dict,
+    letter: Optional[str] = None,
+    mode: str = "grab",
+    jobs: int = 0,
+) -> Dict:
+    """
+    Processa vários vídeos (jobs processos; 0 = nº de CPUs, 1 = no próprio processo).
+    cfg_kwargs: campos de CaptureConfig (sem output_dir_name, que vem da letra).
+    """
+    names = _frame_names(videos)
+    work = []
+    results: List[dict] = []
+    for v in videos:
+        L = (letter or letter_for(v) or "").upper()
+        if not L:
+            log.warning("Sem letra para %s (use --letter ou pastas A..Z); ignorado.", v)
+            results.append(asdict(IngestResult(str(v), "", error="letra desconhecida")))
+            continue
+        work.append((str(v), dict(cfg_kwargs, output_dir_name=L), names[v], mode))
+
+    jobs = jobs or os.cpu_count() or 1
+    jobs = max(1, min(jobs, len(work) or 1))
+    wall0 = time.perf_counter()
+    if jobs == 1:
+        for job in work:
+            results.append(_ingest_job(job))
+            _log_result(results[-1])
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(_ingest_job, job) for job in work]
+            for fut in as_completed(futures):
+                results.append(fut.result())
+                _log_result(results[-1])
+    wall = time.perf_counter() - wall0
+
+    read = sum(r["frames_read"] for r in results)
+    video = sum(r["duration_s"] for r in results)
+    cpu = sum(r["cpu_s"] for r in results)
+    report = {
+        "files": len(results),
+        "failed": sum(1 for r in results if r["error"]),
+        "jobs": jobs,
+        "mode": mode,
+        "frames_read": read,
+        "seeks": sum(r["seeks"] for r in results),
+        "frames_decoded": sum(r["frames_decoded"] for r in results),
+        "frames_saved": sum(r["frames_saved"] for r in results),
+        "frames_rejected": sum(r["frames_rejected"] for r in results),
+        "video_s": video,
+        "wall_s": wall,
+        "cpu_s": cpu,
+        "video_speed": video / wall if wall > 0 else 0.0,
+        "video_speed_per_core": video / cpu if cpu > 0 else 0.0,
+        "results": sorted(results, key=lambda r: r["path"]),
+    }
+    if mode == "grab":
+        report["fps_total"] = read / wall if wall > 0 else 0.0
+        report["fps_per_core"] = read / cpu if cpu > 0 else 0.0
+    return report
+
+
+def _log_result(r: dict):
+    if r["error"]:
+        log.error("%s: %s", r["path"], r["error"])
+        return
+    speed = r["duration_s"] / r["cpu_s"] if r["cpu_s"] > 0 else 0.0
+    if r["seeks"]:
+        walked = f"{r['seeks']} buscas"
+    else:
+        fps = r["frames_read"] / r["cpu_s"] if r["cpu_s"] > 0 else 0.0
+        walked = f"{r['frames_read']} frames, {fps:.0f} frames/s por núcleo"
+    log.info(
+        "%s -> %s: %d frames salvos (%s; %.1fs de vídeo, %.1fx tempo real por núcleo)",
+        Path(r["path"]).name, r["letter"], r["frames_saved"], walked, r["duration_s"], speed,
+    )
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m framecapture.ingest", description="Extrai frames de vídeos gravados.")
+    ap.add_argument("inputs", type=Path, nargs="+", help="arquivos de vídeo e/ou pastas")
+    ap.add_argument("-o", "--output", type=Path, required=True, help="diretório pai das pastas A..Z")
+    ap.add_argument("-l", "--letter", help="letra de todos os vídeos (padrão: deduzida do caminho)")
+    ap.add_argument("--fps", type=float, default=5.0, help="frames salvos por segundo de vídeo")
+    ap.add_argument("--mode", choices=MODES, default="grab")
+    ap.add_argument("-j", "--jobs", type=int, default=0, help="processos (0 = nº de CPUs)")
+    ap.add_argument("--ext", default="jpg", help="formato das imagens")
+    ap.add_argument("--storage-workers", type=int, default=0, help="threads de escrita por processo")
+    ap.add_argument("--roi", action="store_true", help="salva só o recorte da mão")
+    ap.add_argument("--manifest", action="store_true", help="registra cada frame em <letra>/manifest.sqlite")
+    ap.add_argument("--min-sharpness", type=float, default=0.0)
+    ap.add_argument("--max-hash-distance", type=int, default=-1)
+    ap.add_argument("--report", type=Path, help="grava o relatório JSON neste arquivo")
+    ap.add_argument("-v", "--verbose", action="store_true")
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.INFO, format="[%(levelname)s] %(message)s")
+
+    videos = find_videos(args.inputs)
+    if not videos:
+        log.error("Nenhum vídeo encontrado.")
+        return 1
+    cfg_kwargs = dict(
+        output_parent=args.output,
+        save_fps=args.fps,
+        image_ext=args.ext,
+        storage_workers=args.storage_workers,
+        roi_crop=args.roi,
+        write_manifest=args.manifest,
+        quality_min_sharpness=args.min_sharpness,
+        quality_max_hash_distance=args.max_hash_distance,
+    )
+    report = ingest(videos, cfg_kwargs, letter=args.letter, mode=args.mode, jobs=args.jobs)
+    log.info(
+        "%d arquivos (%d falhas): %d frames salvos | %.1fx tempo real no total, %.1fx por núcleo (%d processos)",
+        report["files"], report["failed"], report["frames_saved"],
+        report["video_speed"], report["video_speed_per_core"], report["jobs"],
+    )
+    if args.mode == "grab":
+        log.info("Modo grab: %.0f frames/s no total, %.0f frames/s por núcleo", report["fps_total"], report["fps_per_core"])
+    if args.report:
+        args.report.write_text(json.dumps(report, indent=2, default=str), encoding="utf-8")
+        log.info("Relatório: %s", args.report)
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,186 @@
+# scr/framecapture/manifest.py
+"""
+Manifesto por pasta: um SQLite (modo WAL) em <pasta>/manifest.sqlite com uma
+linha por frame gravado pelo FrameStorage. Permite consultar o conteúdo de uma
+pasta sem listar nem abrir as imagens:
+
+    python -m framecapture.manifest counts D:/dataset          # frames por letra
+    python -m framecapture.manifest session D:/dataset/A 20250101_120000_000000
+
+As linhas são acumuladas em memória e gravadas em lote (batch_size linhas ou
+flush_seconds), então uma queda perde no máximo o último lote do manifesto
+(as imagens continuam no disco). Vários processos podem escrever na mesma pasta.
+
+É opcional (CaptureConfig.write_manifest, --manifest no CLI/ingest/augment,
+caixa no app): sem ele as pastas só têm as imagens, como antes.
+"""
+from __future__ import annotations
+import argparse
+import sqlite3
+import string
+import sys
+import threading
+import time
+from dataclasses import astuple, dataclass
+from pathlib import Path
+from typing import Dict, List
+
+MANIFEST_NAME = "manifest.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS frames (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id  TEXT    NOT NULL,
+    name        TEXT    NOT NULL UNIQUE,  -- arquivo na pasta; regravar o mesmo nome substitui a linha
+    captured_at REAL    NOT NULL,  -- relógio monotônico da captura (comparável dentro da sessão)
+    wall_time   REAL    NOT NULL,  -- time.time() da gravação (ordena entre sessões)
+    seq         INTEGER NOT NULL,
+    width       INTEGER NOT NULL,
+    height      INTEGER NOT NULL,
+    channels    INTEGER NOT NULL,
+    bytes       INTEGER NOT NULL,
+    sha1        TEXT    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS frames_session ON frames(session_id);
+CREATE INDEX IF NOT EXISTS frames_sha1 ON frames(sha1);
+"""
+
+
+@dataclass
+class ManifestRecord:
+    session_id: str
+    name: str
+    captured_at: float
+    wall_time: float
+    seq: int
+    width: int
+    height: int
+    channels: int
+    bytes: int
+    sha1: str
+
+
+def _connect(path: Path) -> sqlite3.Connection:
+    conn = sqlite3.connect(str(path), timeout=30.0, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+class FrameManifest:
+    """Escritor do manifesto de uma pasta (thread-safe; usado pelos workers do FrameStorage)."""
+    def __init__(self, folder: Path, batch_size: int = 64, flush_seconds: float = 1.0):
+        self.path = Path(folder) / MANIFEST_NAME
+        self.batch_size = max(1, int(batch_size))
+        self.flush_seconds = float(flush_seconds)
+        self._conn = _connect(self.path)
+        self._pending: List[tuple] = []
+        self._last_commit = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, record: ManifestRecord):
+        with self._lock:
+            self._pending.append(astuple(record))
+            if len(self._pending) >= self.batch_size or time.monotonic() - self._last_commit >= self.flush_seconds:
+                self._commit()
+
+    def _commit(self):
+        if self._pending:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO frames (session_id, name, captured_at, wall_time, seq, width, height, channels, bytes, sha1)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    self._pending,
+                )
+            self._pending.clear()
+        self._last_commit = time.monotonic()
+
+    def flush(self):
+        with self._lock:
+            self._commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is None:
+                return
+            self._commit()
+            self._conn.close()
+            self._conn = None
+
+
+def _query(folder: Path, sql: str, params=()) -> list:
+    path = Path(folder) / MANIFEST_NAME
+    if not path.exists():
+        return []
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True, timeout=30.0)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def count(folder: Path) -> int:
+    rows = _query(folder, "SELECT COUNT(*) FROM frames")
+    return rows[0][0] if rows else 0
+
+
+def counts_per_letter(parent: Path) -> Dict[str, int]:
+    """Frames por letra (pastas parent/A..Z, incluindo subpastas camN da multicâmera)."""
+    out: Dict[str, int] = {}
+    for letter in string.ascii_uppercase:
+        folder = Path(parent) / letter
+        if not folder.is_dir():
+            continue
+        n = count(folder) + sum(count(sub) for sub in folder.glob("cam*") if sub.is_dir())
+        if n:
+            out[letter] = n
+    return out
+
+
+def sessions(folder: Path) -> List[tuple]:
+    """(session_id, frames, primeira gravação, última gravação), da mais antiga à mais nova."""
+    return _query(
+        folder,
+        "SELECT session_id, COUNT(*), MIN(wall_time), MAX(wall_time) FROM frames GROUP BY session_id ORDER BY MIN(wall_time)",
+    )
+
+
+def session_frames(folder: Path, session_id: str) -> List[ManifestRecord]:
+    rows = _query(
+        folder,
+        "SELECT session_id, name, captured_at, wall_time, seq, width, height, channels, bytes, sha1"
+        " FROM frames WHERE session_id = ? ORDER BY seq, id",
+        (session_id,),
+    )
+    return [ManifestRecord(*r) for r in rows]
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(prog="python -m framecapture.manifest", description="Consulta os manifestos das pastas de frames.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    c = sub.add_parser("counts", help="frames por letra")
+    c.add_argument("parent", type=Path, help="diretório pai das pastas A..Z")
+    s = sub.add_parser("sessions", help="sessões gravadas numa pasta")
+    s.add_argument("folder", type=Path)
+    f = sub.add_parser("session", help="frames de uma sessão")
+    f.add_argument("folder", type=Path)
+    f.add_argument("session_id")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "counts":
+        counts = counts_per_letter(args.parent)
+        for letter, n in counts.items():
+            print(f"{letter}: {n}")
+        print(f"total: {sum(counts.values())}")
+    elif args.cmd == "sessions":
+        for sid, n, first, last in sessions(args.folder):
+            print(f"{sid}: {n} frames ({time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(first))}, {last - first:.1f}s)")
+    elif args.cmd == "session":
+        for r in session_frames(args.folder, args.session_id):
+            print(f"{r.seq:6d} {r.captured_at:.3f} {r.name} {r.width}x{r.height}x{r.channels} {r.bytes}B {r.sha1}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,128 @@
+# scr/framecapture/metrics.py
+from __future__ import annotations
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, Optional
+import json
+import threading
+import time
+
+
+class Histogram:
+    """
+    Histograma de durações (segundos) com buckets em escala log (4 por oitava,
+    de 1 µs a ~16 s). add() custa uma busca binária; percentis são aproximados
+    pelo centro geométrico do bucket (erro < 10%).
+    """
+    BOUNDS = [1e-6 * 2 ** (i / 4) for i in range(4 * 24)]
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def add(self, value: float):
+        self.counts[bisect_left(self.BOUNDS, value)] += 1
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def percentile(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+        rank = q / 100.0 * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if c and seen >= rank:
+                if i == 0 or i >= len(self.BOUNDS):
+                    return self.min if i == 0 else self.max
+                # centro geométrico do bucket, limitado ao intervalo observado
+                mid = (self.BOUNDS[i - 1] * self.BOUNDS[i]) ** 0.5
+                return min(max(mid, self.min), self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, float]:
+        if self.count == 0:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "mean_ms": self.total / self.count * 1000.0,
+            "min_ms": self.min * 1000.0,
+            "p50_ms": self.percentile(50) * 1000.0,
+            "p90_ms": self.percentile(90) * 1000.0,
+            "p99_ms": self.percentile(99) * 1000.0,
+            "max_ms": self.max * 1000.0,
+        }
+
+
+class SessionMetrics:
+    """
+    Contadores e histogramas de tempo por estágio de uma sessão de captura.
+    Thread-safe (os workers de gravação registram de outras threads).
+
+        t0 = time.perf_counter()
+        ...
+        metrics.observe("read", time.perf_counter() - t0)
+        metrics.incr("frames_read")
+    """
+    def __init__(self, session_id: str = ""):
+        self.session_id = session_id
+        self.started_at = time.time()
+        self.counters: Dict[str, int] = {}
+        self.stages: Dict[str, Histogram] = {}
+        self.info: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def incr(self, name: str, n: int = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            hist = self.stages.get(stage)
+            if hist is None:
+                hist = self.stages[stage] = Histogram()
+            hist.add(seconds)
+
+    def get(self, name: str) -> int:
+        return self.counters.get(name, 0)
+
+    def p50_ms(self, stage: str) -> Optional[float]:
+        hist = self.stages.get(stage)
+        return hist.percentile(50) * 1000.0 if hist and hist.count else None
+
+    def summary(self) -> str:
+        """Resumo curto para a barra de status."""
+        with self._lock:
+            parts = [
+                f"lidos {self.get('frames_read')}",
+                f"gravados {self.get('frames_written')}",
+                f"descartados {self.get('frames_dropped')}",
+            ]
+            for stage, label in (("read", "leitura"), ("save", "gravação")):
+                p50 = self.p50_ms(stage)
+                if p50 is not None:
+                    parts.append(f"{label} p50 {p50:.1f} ms")
+        return " • ".join(parts)
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                "session_id": self.session_id,
+                "started_at": self.started_at,
+                "duration_s": time.time() - self.started_at,
+                "counters": dict(self.counters),
+                "stages": {k: h.to_dict() for k, h in self.stages.items()},
+                "info": dict(self.info),
+            }
+
+    def write_json(self, path: Path) -> Path:
+        path = Path(path)
+        path.write_text(json.dumps(self.to_dict(), indent=2, default=str), encoding="utf-8")
+        return path
@@ -0,0 +1,328 @@
+# scr/framecapture/multicam.py
+from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence
+import logging
+import threading
+import time
+import cv2
+import numpy as np
+
+from .config import CaptureConfig
+from .metrics import SessionMetrics
+from .pipeline import ScheduledSampler, TimeSampler
+from .precapture import PreCaptureGuide
+from .preview import open_preview
+from .service import open_camera
+from .storage import FrameStorage
+from .video import FrameSource
+
+log = logging.getLogger(__name__)
+
+DRAIN_GRABS = 5  # grabs descartados após a pré-gravação (esvazia o buffer do driver das outras câmeras)
+
+
+class SkewStats:
+    """Diferença entre o primeiro e o último grab de cada conjunto de frames."""
+    def __init__(self):
+        self.samples: List[float] = []
+        self.rejected = 0
+
+    def add(self, skew: float):
+        self.samples.append(skew)
+
+    def report(self) -> Dict[str, float]:
+        if not self.samples:
+            return {"sets": 0, "rejected": self.rejected}
+        ms = np.asarray(self.samples) * 1000.0
+        return {
+            "sets": len(ms),
+            "rejected": self.rejected,
+            "mean_ms": float(ms.mean()),
+            "p50_ms": float(np.percentile(ms, 50)),
+            "p95_ms": float(np.percentile(ms, 95)),
+            "max_ms": float(ms.max()),
+        }
+
+
+class MultiCapturePipeline:
+    """
+    Grava a mesma sessão em várias câmeras. A cada ciclo todas as câmeras fazem
+    grab() em paralelo (só captura, sem decodificar) e depois retrieve(); assim o
+    instante de captura fica o mais próximo possível entre elas. Os conjuntos
+    escolhidos pelo sampler (cfg.sampler, dirigido pelo instante de captura do
+    conjunto) são gravados em <letra>/cam<N>/ com o mesmo nome de arquivo (frame
+    id comum) e esse instante no manifesto.
+
+    Cada câmera é aberta com o formato de cfg (FOURCC, resolução, fps), como na
+    captura com uma câmera, mas sempre decodificando (retrieve() entrega pixels).
+    Com cfg.write_metrics o resumo do skew vai para metrics_<pasta>_<sessão>.json.
+
+    end_reason diz por que a sessão terminou, como no CapturePipeline (duration,
+    esc, closed, stopped, read_failure, cancelled, camera_error, error); câmeras,
+    gravação e threads são liberadas mesmo se a captura levantar uma exceção.
+    """
+    def __init__(
+        self,
+        cfg: CaptureConfig,
+        camera_indices: Optional[Sequence[int]] = None,
+        sources: Optional[Sequence[FrameSource]] = None,
+    ):
+        self.cfg = cfg
+        if sources is not None:
+            self.camera_indices = list(camera_indices) if camera_indices else list(range(len(sources)))
+        else:
+            self.camera_indices = list(camera_indices or cfg.camera_indices or (cfg.camera_index,))
+        self.out_dir = cfg.get_output_dir()
+        self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        self.storages = {
+            idx: FrameStorage(
+                self.out_dir / f"cam{idx}",
+                cfg.image_ext,
+                cfg.filename_prefix,
+                workers=cfg.storage_workers,
+                queue_size=cfg.storage_queue_size,
+                backpressure=cfg.storage_backpressure,
+                manifest=cfg.write_manifest,
+                session_id=self.session_id,
+            )
+            for idx in self.camera_indices
+        }
+        self.sources: List[FrameSource] = list(sources or [])
+        if cfg.sampler == "interval":
+            self.sampler: TimeSampler | ScheduledSampler = TimeSampler(cfg.save_fps)
+        else:
+            self.sampler = ScheduledSampler(cfg.save_fps)
+        self.skew = SkewStats()
+        self.metrics = SessionMetrics(self.session_id)
+        self.metrics_path = None
+        self.frame_id = 0
+        self._unconfirmed: List[str] = []   # conjuntos enfileirados com drop-*: contados após a escrita
+        self.end_reason: Optional[str] = None
+        self._pool: ThreadPoolExecutor | None = None
+        self._running = False
+        self._thread: threading.Thread | None = None
+        self._display = None
+
+    # ---- captura sincronizada ----
+    def _grab_one(self, src: FrameSource):
+        ok = src.grab()
+        return ok, time.monotonic()
+
+    def _grab_set(self) -> Optional[tuple[List[np.ndarray], float, float]]:
+        """
+        Um ciclo grab-then-retrieve em todas as câmeras; devolve (frames, skew,
+        instante de captura do conjunto = meio do intervalo dos grabs).
+        """
+        grabs = list(self._pool.map(self._grab_one, self.sources))
+        if not all(ok for ok, _ in grabs):
+            return None
+        stamps = [t for _, t in grabs]
+        frames = []
+        for ok, frame in self._pool.map(lambda s: s.retrieve(), self.sources):
+            if not ok or frame is None:
+                return None
+            frames.append(frame)
+        return frames, max(stamps) - min(stamps), (max(stamps) + min(stamps)) / 2.0
+
+    def _open_sources(self) -> bool:
+        if self.sources:
+            return True
+        try:
+            for idx in self.camera_indices:
+                src = open_camera(replace(self.cfg, camera_index=idx, passthrough=False))
+                log.info("Câmera %d negociada: %s", idx, src.negotiated)
+                self.metrics.info[f"camera_{idx}"] = src.negotiated
+                self.sources.append(src)
+        except Exception as e:
+            log.error("%s", e)
+            return False
+        return True
+
+    def _mosaic(self, frames: List[np.ndarray], height: int = 360) -> np.ndarray:
+        tiles = []
+        for f in frames:
+            h, w = f.shape[:2]
+            tiles.append(cv2.resize(f, (max(1, int(w * height / h)), height), interpolation=cv2.INTER_AREA))
+        return cv2.hconcat(tiles)
+
+    def _loop(self):
+        # qualquer erro na thread de captura ainda fecha câmeras, gravação e o executor
+        self._display = None
+        try:
+            self._record()
+        except Exception:
+            log.exception("Erro na captura multicâmera; encerrando a sessão.")
+            self.end_reason = "error"
+        finally:
+            self._running = False
+            self._cleanup(self._display)
+
+    def _record(self):
+        if not self._open_sources():
+            self.end_reason = "camera_error"
+            return
+        self._pool = ThreadPoolExecutor(max_workers=len(self.sources), thread_name_prefix="MultiGrab")
+
+        # janela só com preview ou contagem na tela (como no CapturePipeline)
+        display = None
+        if self.cfg.preview or self.cfg.pre_countdown_seconds > 0:
+            display = self._display = open_preview(
+                "Captura multicâmera (ESC para parar)", self.cfg.preview_process, self.cfg.preview_max_fps, self.cfg.preview_max_width
+            )
+        log.info("Pasta: %s | Câmeras: %s", self.out_dir, self.camera_indices)
+        if self.cfg.pre_countdown_seconds > 0:
+            guide = PreCaptureGuide(countdown_seconds=self.cfg.pre_countdown_seconds)
+            if not guide.run_on(self.sources[0], display, should_stop=lambda: not self._running):
+                self.end_reason = "stopped" if guide.stopped else "cancelled"
+                if not guide.stopped:
+                    log.info("Pré-gravação cancelada.")
+                return
+            for _ in range(DRAIN_GRABS):
+                self._grab_set()
+
+        log.info("Iniciando gravação...")
+        start = time.monotonic()
+        scheduled = isinstance(self.sampler, ScheduledSampler)
+        first_ts: Optional[float] = None
+        while self._running:
+            if self.cfg.max_duration_seconds > 0 and (time.monotonic() - start) >= self.cfg.max_duration_seconds:
+                log.info("Tempo máximo atingido (%.1fs). Encerrando captura.", self.cfg.max_duration_seconds)
+                self.end_reason = "duration"
+                break
+
+            grabbed = self._grab_set()
+            if grabbed is None:
+                log.warning("Falha ao ler frame de uma das câmeras.")
+                self.end_reason = "read_failure"
+                break
+            frames, skew, ts = grabbed
+            self.skew.add(skew)
+            self.metrics.incr("sets_read")
+
+            if self.cfg.preview:
+                if display.wants_frame():
+                    display.show(self._mosaic(frames))
+                event = display.poll()
+                if event:  # ESC / janela fechada
+                    self.end_reason = event
+                    break
+
+            # agenda pelo instante de captura do conjunto (não pelo relógio do loop)
+            if scheduled:
+                if first_ts is None:
+                    first_ts = ts
+                if self.cfg.max_duration_seconds > 0 and ts - first_ts >= self.cfg.max_duration_seconds:
+                    log.info("Tempo máximo atingido (%.1fs). Encerrando captura.", self.cfg.max_duration_seconds)
+                    self.end_reason = "duration"
+                    break
+                picks = [s.item for s in self.sampler.offer(ts, grabbed)]
+            else:
+                picks = [grabbed] if self.sampler.should_save(ts) else []
+            for chosen in picks:
+                self._save_set(*chosen)
+
+        if scheduled:
+            end = first_ts + self.cfg.max_duration_seconds if first_ts is not None and self.cfg.max_duration_seconds > 0 else None
+            for s in self.sampler.flush(before=end):
+                self._save_set(*s.item)
+            self.metrics.info["sampling"] = self.sampler.report()
+        if self.end_reason is None:
+            self.end_reason = "stopped"
+
+    def _save_set(self, frames: List[np.ndarray], skew: float, ts: float):
+        """Grava um conjunto escolhido pelo sampler (descarta se o skew passar do limite)."""
+        if self.cfg.max_skew_seconds > 0 and skew > self.cfg.max_skew_seconds:
+            self.skew.rejected += 1
+            log.warning("Conjunto descartado: diferença entre câmeras de %.1f ms.", skew * 1000)
+            return
+        self.frame_id += 1
+        name = f"{self.cfg.filename_prefix}_{datetime.now():%Y%m%d_%H%M%S_%f}_{self.frame_id:06d}"
+        paths = [
+            self.storages[idx].save(frame, name=name, timestamp=ts, seq=self.frame_id)
+            for idx, frame in zip(self.camera_indices, frames)
+        ]
+        if all(p is not None for p in paths):
+            self.metrics.incr("sets_saved")
+        else:
+            self._unconfirmed.append(name)
+        log.debug("SAVE %s x%d (skew %.1f ms)", name, len(frames), skew * 1000)
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout=2.0)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Espera a sessão terminar; devolve True se terminou dentro do timeout."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return not (self._thread is not None and self._thread.is_alive())
+
+    def skew_report(self) -> Dict[str, float]:
+        return self.skew.report()
+
+    def _cleanup(self, display=None):
+        """Fecha executor, câmeras, gravação e janela; cada passo roda mesmo se um anterior falhar."""
+        try:
+            try:
+                if self._pool is not None:
+                    self._pool.shutdown(wait=True)
+                    self._pool = None
+            finally:
+                try:
+                    for src in self.sources:
+                        src.release()
+                finally:
+                    for storage in self.storages.values():
+                        storage.close()
+                    self._count_confirmed_sets()
+        finally:
+            if display is not None:
+                display.close()
+        rep = self.skew.report()
+        if rep["sets"]:
+            log.info(
+                "Skew entre câmeras: média=%.1f ms p95=%.1f ms máx=%.1f ms | conjuntos=%d descartados=%d",
+                rep["mean_ms"], rep["p95_ms"], rep["max_ms"], rep["sets"], rep["rejected"],
+            )
+        self.metrics.info["end_reason"] = self.end_reason
+        self._write_metrics(rep)
+        log.info("Captura finalizada (%s).", self.end_reason)
+
+    def _count_confirmed_sets(self):
+        """Com drop-*, um conjunto só conta como salvo se o arquivo de cada câmera foi escrito."""
+        saved = sum(
+            all((st.base_dir / f"{name}.{st.image_ext}").exists() for st in self.storages.values())
+            for name in self._unconfirmed
+        )
+        self._unconfirmed.clear()
+        if saved:
+            self.metrics.incr("sets_saved", saved)
+
+    def _write_metrics(self, skew: Dict[str, float]):
+        self.metrics.info["skew"] = skew
+        if not self.cfg.write_metrics:
+            return
+        self.metrics.info.update(
+            letter=self.cfg.get_letter(),
+            out_dir=str(self.out_dir),
+            cameras=self.camera_indices,
+            save_fps=self.cfg.save_fps,
+            storage={f"cam{idx}": st.stats.as_dict() for idx, st in self.storages.items()},
+        )
+        path = self.out_dir.parent / f"metrics_{self.out_dir.name}_{self.session_id}.json"
+        try:
+            self.metrics_path = self.metrics.write_json(path)
+            log.info("Métricas: %s", path)
+        except OSError as e:
+            log.warning("Não foi possível gravar as métricas: %s", e)
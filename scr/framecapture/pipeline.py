@@ -1,97 +1,477 @@
 # scr/framecapture/pipeline.py
-import cv2
+from dataclasses import dataclass, replace
+from datetime import datetime
+from typing import Any, Callable, List
+import logging
+import math
 import threading
 import time
+import numpy as np
+from .bufferpool import FramePool
 from .config import CaptureConfig
+from .metrics import SessionMetrics
 from .storage import FrameStorage
-from .video import VideoSource
-from .precapture import PreCaptureGuide
+from .shards import ShardStorage
+from .service import CameraLease, CaptureService, open_camera
+from .video import FrameSource, ThreadedVideoSource
+from .precapture import PreCaptureGuide, PresenceDetector
+from .preview import PreviewProcess, open_preview
+from .quality import QualityGate
+from .roi import RoiCropper
 
+log = logging.getLogger(__name__)
 
-PRE_COUNTDOWN_SECONDS = 5.0  # contagem antes de iniciar a gravação
+PREVIEW_TITLE = "Captura (ESC para parar)"
 
 
 class TimeSampler:
-    """Decide salvar por intervalo de tempo (1 / fps)."""
+    """
+    Decide salvar por intervalo de tempo (1 / fps).
+    now: instante do frame (ex.: timestamp dentro de um vídeo); padrão = relógio monotônico.
+    """
     def __init__(self, fps: float):
         self.interval = 1.0 / fps if fps and fps > 0 else 0.0
         self._last_save_t: float | None = None
 
-    def should_save(self) -> bool:
-        now = time.monotonic()
+    def should_save(self, now: float | None = None) -> bool:
+        if now is None:
+            now = time.monotonic()
         if self.interval <= 0.0:
             self._last_save_t = now
             return True
-        if self._last_save_t is None or (now - self._last_save_t) >= self.interval:
+        # tolerância: com timestamps de vídeo, 0.6 - 0.4 < 0.2 em ponto flutuante
+        if self._last_save_t is None or (now - self._last_save_t) >= self.interval - 1e-9:
             self._last_save_t = now
             return True
         return False
 
 
+@dataclass
+class Sample:
+    """Frame escolhido para um instante da agenda (slot)."""
+    item: Any
+    timestamp: float   # captura do frame
+    target: float      # instante alvo do slot
+    slot: int          # 0, 1, 2, ...
+
+    @property
+    def error(self) -> float:
+        return self.timestamp - self.target
+
+
+class ScheduledSampler:
+    """
+    Agenda fixa a partir do timestamp de captura do primeiro frame: alvos
+    t0 + k / fps. Cada frame concorre ao alvo mais próximo (slot) e, por slot,
+    fica o frame de timestamp mais perto do alvo. Um frame anterior ao alvo
+    espera o próximo frame (lookahead de um frame) para saber se ele está mais
+    perto; um frame no alvo ou depois dele é decidido na hora.
+
+    Atrasos do loop não empurram a agenda (só importa o timestamp de captura).
+    Depois de uma parada, os slots sem nenhum frame contam como perdidos e a
+    amostragem segue no próximo alvo: um frame nunca preenche mais de um slot,
+    então não há rajada para "recuperar" o atraso.
+
+    offer() devolve os Samples decididos (0, 1 ou, depois de uma parada, 2);
+    itens descartados (ou o pendente, se substituído) vão para on_discard.
+    flush() decide o pendente no fim da sessão. timestamp None = clock().
+    """
+    def __init__(
+        self,
+        fps: float,
+        on_discard: Callable[[Any], None] | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.interval = 1.0 / fps if fps and fps > 0 else 0.0
+        self.fps = fps
+        self.on_discard = on_discard
+        self.clock = clock
+        self.t0: float | None = None
+        self.frames = 0
+        self.missed = 0             # slots sem nenhum frame (paradas)
+        self._pending: Sample | None = None
+        self._last_slot = -1        # último slot decidido
+        self._errors: List[float] = []
+        self._picked: List[float] = []
+
+    @property
+    def pending(self) -> Sample | None:
+        return self._pending
+
+    def target(self, slot: int) -> float:
+        return self.t0 + slot * self.interval
+
+    def offer(self, timestamp: float | None = None, item: Any = None) -> List[Sample]:
+        if timestamp is None:
+            timestamp = self.clock()
+        self.frames += 1
+        if self.t0 is None:
+            self.t0 = timestamp
+        if self.interval <= 0.0:
+            return [self._commit(Sample(item, timestamp, timestamp, self._last_slot + 1))]
+        slot = int(math.floor((timestamp - self.t0) / self.interval + 0.5))
+        cand = Sample(item, timestamp, self.target(slot), slot)
+        if slot <= self._last_slot:
+            self._discard(cand)  # slot já decidido
+            return []
+        out: List[Sample] = []
+        p = self._pending
+        if p is not None:
+            if p.slot < slot:
+                out.append(self._commit(p))
+            elif abs(cand.error) < abs(p.error):
+                self._pending = None
+                self._discard(p)
+            else:
+                # já passou do alvo e se afastou: o pendente era o mais próximo
+                out.append(self._commit(p))
+                self._discard(cand)
+                return out
+        if cand.error >= 0:
+            out.append(self._commit(cand))
+        else:
+            self._pending = cand
+        return out
+
+    def flush(self, before: float | None = None) -> List[Sample]:
+        """Decide o frame pendente (fim da sessão); descarta se o alvo não for anterior a before."""
+        p = self._pending
+        if p is None:
+            return []
+        if before is not None and p.target >= before - 1e-9:
+            self._pending = None
+            self._discard(p)
+            return []
+        return [self._commit(p)]
+
+    def _commit(self, sample: Sample) -> Sample:
+        if sample is self._pending:
+            self._pending = None
+        self.missed += max(0, sample.slot - self._last_slot - 1)
+        self._last_slot = sample.slot
+        self._errors.append(sample.error)
+        self._picked.append(sample.timestamp)
+        return sample
+
+    def _discard(self, sample: Sample):
+        if self.on_discard is not None and sample.item is not None:
+            self.on_discard(sample.item)
+
+    def report(self) -> dict:
+        """Quantidade obtida x slots da agenda e erro de tempo (ms) dos frames escolhidos."""
+        err = np.abs(np.asarray(self._errors)) * 1000.0
+        gaps = np.diff(np.asarray(self._picked)) * 1000.0
+        return {
+            "target_fps": self.fps,
+            "frames": self.frames,
+            "slots": self._last_slot + 1,
+            "picked": len(self._picked),
+            "missed": self.missed,
+            "error_mean_ms": float(err.mean()) if err.size else 0.0,
+            "error_p95_ms": float(np.percentile(err, 95)) if err.size else 0.0,
+            "error_max_ms": float(err.max()) if err.size else 0.0,
+            "interval_mean_ms": float(gaps.mean()) if gaps.size else 0.0,
+            "interval_std_ms": float(gaps.std()) if gaps.size else 0.0,
+        }
+
+
 class CapturePipeline:
-    def __init__(self, cfg: CaptureConfig):
+    """
+    source: fonte já aberta (ex.: SyntheticSource em testes). Sem ela o pipeline
+    abre a câmera cfg.camera_index. A fonte é liberada no fim da sessão em ambos os casos.
+    service: CaptureService que empresta a câmera já aberta (e o pool de frames)
+    e guarda o contador de frames da pasta entre sessões; no fim a câmera volta
+    ao serviço em vez de ser fechada.
+
+    self.metrics acumula tempos por estágio (read, preview, sample, save, write) e
+    contadores da sessão; com cfg.write_metrics o JSON é gravado ao lado da pasta de saída.
+
+    Fim da sessão: self.finished (threading.Event) é sinalizado e on_finished(pipeline)
+    é chamado da thread de captura depois que tudo foi gravado; end_reason diz o motivo
+    (duration, esc, closed, stopped, read_failure, cancelled, camera_error, error) e state acompanha
+    a sessão (opening -> waiting -> recording -> finished).
+    """
+    def __init__(self, cfg: CaptureConfig, source: FrameSource | None = None, service: CaptureService | None = None):
         self.cfg = cfg
-        self.out_dir = cfg.get_output_dir()
-        self.storage = FrameStorage(self.out_dir, cfg.image_ext, cfg.filename_prefix)
-        self.video: VideoSource | None = None
-        self.sampler = TimeSampler(cfg.save_fps)
+        self.service = service if source is None else None
+        self.session_id = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        self.metrics = SessionMetrics(self.session_id)
+        self.pool: FramePool | None = None
+        if cfg.frame_pool_size:
+            # a leitura do serviço é sempre em thread
+            pool_cfg = replace(cfg, threaded_capture=True) if self.service is not None else cfg
+            if cfg.frame_pool_size > 0:
+                size = limit = cfg.frame_pool_size
+            else:
+                size, limit = self.auto_pool_size(pool_cfg), self.auto_pool_limit(pool_cfg)
+            if self.service is not None:
+                self.pool = self.service.frame_pool(size, limit)
+            else:
+                self.pool = FramePool(size, max_size=limit)
+        write_behind = dict(
+            pool=self.pool,
+            workers=cfg.storage_workers,
+            queue_size=cfg.storage_queue_size,
+            backpressure=cfg.storage_backpressure,
+            metrics=self.metrics,
+        )
+        if cfg.storage_backend == "shards":
+            self.out_dir = cfg.get_shards_dir()
+            self.storage = ShardStorage(self.out_dir, cfg.get_letter(), cfg.image_ext, **write_behind)
+        else:
+            self.out_dir = cfg.get_output_dir()
+            self.storage = FrameStorage(
+                self.out_dir, cfg.image_ext, cfg.filename_prefix,
+                manifest=cfg.write_manifest, session_id=self.session_id, **write_behind
+            )
+        if self.service is not None:
+            self.storage.counter = self.service.counter(self.out_dir, cfg.get_letter())
+        self.video: FrameSource | None = source
+        self.frames_skipped = 0
+        if cfg.sampler == "interval":
+            self.sampler: TimeSampler | ScheduledSampler = TimeSampler(cfg.save_fps)
+        else:
+            # segura o frame pendente (lookahead) e devolve ao pool quando outro o substitui
+            self.sampler = ScheduledSampler(cfg.save_fps, on_discard=lambda pkt: pkt.release())
+        self.quality: QualityGate | None = QualityGate(
+            cfg.quality_min_sharpness, cfg.quality_max_hash_distance, cfg.quality_history
+        )
+        if not self.quality.enabled:
+            self.quality = None
+        self.cropper: RoiCropper | None = None
+        if cfg.roi_crop:
+            # cada frame enfileirado segura um buffer até ser gravado
+            in_flight = cfg.storage_queue_size + cfg.storage_workers if cfg.storage_workers > 0 else 0
+            self.cropper = RoiCropper(
+                cfg.roi_output_size, cfg.guide_radius_frac, cfg.roi_pad_frac, buffers=in_flight + 1
+            )
+        # bytes da câmera vão direto para o disco se nada altera os pixels e o formato bate
+        self.passthrough_save = cfg.image_ext.lower() in ("jpg", "jpeg") and self.cropper is None
+        self.metrics_path = None
+        self.state = "idle"
+        self.end_reason: str | None = None
+        self.recording_started_at: float | None = None   # time.monotonic()
+        self.recording_ended_at: float | None = None
+        self.finished = threading.Event()
+        self.on_finished: Callable[["CapturePipeline"], None] | None = None
         self._running = False
         self._thread: threading.Thread | None = None
+        self._display = None
+
+    @staticmethod
+    def _writes_pooled_frames(cfg: CaptureConfig) -> bool:
+        # o recorte redimensionado sai do pool; o recorte sem redimensionar é uma view do buffer
+        return cfg.storage_workers > 0 and not (cfg.roi_crop and cfg.roi_output_size)
+
+    @classmethod
+    def auto_pool_size(cls, cfg: CaptureConfig) -> int:
+        """
+        Buffers pré-alocados: os frames em uso no fluxo normal (loop, pendente do
+        sampler, ring da leitura em thread e um frame sendo gravado por worker).
+        Rajadas que enchem a fila do write-behind fazem o pool crescer até auto_pool_limit().
+        """
+        n = 2                                      # frame do loop principal + pendente do sampler
+        if cfg.threaded_capture:
+            n += cfg.capture_buffer_size + 1       # ring + frame sendo lido pela thread
+        if cls._writes_pooled_frames(cfg):
+            n += cfg.storage_workers               # frames sendo codificados
+        return n
+
+    @classmethod
+    def auto_pool_limit(cls, cfg: CaptureConfig) -> int:
+        """Máximo de buffers que podem estar em uso ao mesmo tempo (fila do write-behind cheia)."""
+        n = cls.auto_pool_size(cfg)
+        if cls._writes_pooled_frames(cfg):
+            n += cfg.storage_queue_size
+        return n + 1                               # folga
 
     def _loop(self):
-        # 1) abre câmera
+        # qualquer erro na thread de captura ainda encerra a sessão: devolve a câmera,
+        # fecha a gravação e sinaliza self.finished
+        self._display = None
         try:
-            self.video = VideoSource(self.cfg.camera_index)
-        except Exception as e:
-            print(f"[ERRO] {e}")
+            self._record()
+        except Exception:
+            log.exception("Erro na captura; encerrando a sessão.")
+            self.end_reason = "error"
+        finally:
             self._running = False
-            return
+            if self.recording_started_at is not None and self.recording_ended_at is None:
+                self.recording_ended_at = time.monotonic()
+            self._cleanup(self._display)
 
-        # 2) cria janela (uma vez) e faz a PRÉ-GRAVAÇÃO na MESMA janela
-        window_name = "Captura (ESC para parar)"
-        cv2.namedWindow(window_name, cv2.WINDOW_NORMAL)
+    def _record(self):
+        m = self.metrics
+        self.state = "opening"
+        # 1) abre câmera
+        if self.video is None:
+            try:
+                if self.service is not None:
+                    self.video = self.service.lease(self.cfg, self.pool)
+                    m.info["camera_warm"] = self.video.warm
+                    m.info["camera_open_s"] = self.video.open_seconds
+                else:
+                    self.video = open_camera(self.cfg)
+                log.info("Câmera negociada: %s", self.video.negotiated)
+                self.metrics.info["camera"] = self.video.negotiated
+            except Exception as e:
+                log.error("%s", e)
+                self._running = False
+                self.end_reason = "camera_error"
+                return
+        if self.pool is not None and not isinstance(self.video, CameraLease):
+            inner = self.video.source if isinstance(self.video, ThreadedVideoSource) else self.video
+            inner.pool = self.pool
+        if self.cfg.threaded_capture and not isinstance(self.video, (ThreadedVideoSource, CameraLease)):
+            self.video = ThreadedVideoSource(self.video, buffer_size=self.cfg.capture_buffer_size)
 
-        print(f"[INFO] Pasta: {self.out_dir}")
-        print(f"[INFO] Taxa alvo: ~{self.cfg.save_fps:.1f} FPS | Duração máx: {self.cfg.max_duration_seconds:.1f}s")
-        print(f"[INFO] Mostrando guia de posicionamento ({PRE_COUNTDOWN_SECONDS:.0f}s)...")
+        # 2) abre o preview (uma vez) e faz a PRÉ-GRAVAÇÃO na MESMA janela
+        countdown = self.cfg.pre_countdown_seconds
+        presence = self.cfg.trigger_mode == "presence"
+        display = None
+        if self.cfg.preview or (countdown > 0 and not presence):
+            if self.service is not None and self.cfg.preview_process:
+                # processo de preview do serviço: sessões seguidas não pagam outro spawn + import do cv2
+                display = self._display = self.service.preview(PREVIEW_TITLE, self.cfg.preview_max_fps, self.cfg.preview_max_width)
+            else:
+                display = self._display = open_preview(
+                    PREVIEW_TITLE, self.cfg.preview_process, self.cfg.preview_max_fps, self.cfg.preview_max_width
+                )
 
-        guide = PreCaptureGuide(countdown_seconds=PRE_COUNTDOWN_SECONDS)
-        ok = guide.run_on(self.video.cap, window_name)
-        if not ok:
-            self._running = False
-            self._cleanup(window_name)
-            print("[INFO] Pré-gravação cancelada.")
-            return
+        log.info("Pasta: %s", self.out_dir)
+        log.info("Taxa alvo: ~%.1f FPS | Duração máx: %.1fs", self.cfg.save_fps, self.cfg.max_duration_seconds)
+
+        if countdown > 0 or presence:
+            self.state = "waiting"
+            trigger = PresenceDetector(self.cfg.guide_radius_frac) if presence else None
+            if presence:
+                log.info("Aguardando a mão no círculo%s...", f" (até {countdown:.0f}s)" if countdown > 0 else "")
+            else:
+                log.info("Mostrando guia de posicionamento (%.0fs)...", countdown)
+            guide = PreCaptureGuide(countdown_seconds=countdown, radius_frac=self.cfg.guide_radius_frac, trigger=trigger)
+            # stop() também vale durante a contagem/espera pela mão
+            ok = guide.run_on(self.video, display, should_stop=lambda: not self._running)
+            if not ok:
+                self._running = False
+                self.end_reason = "stopped" if guide.stopped else "cancelled"
+                if not guide.stopped:
+                    log.info("Pré-gravação cancelada.")
+                return
+            if presence:
+                m.info["trigger_wait_s"] = guide.waited
 
-        print("[INFO] Iniciando gravação...")
-        start = time.monotonic()
+        log.info("Iniciando gravação...")
+        self.state = "recording"
+        start = self.recording_started_at = time.monotonic()
 
         # 3) loop de gravação (mesma janela, mesma câmera)
+        first_ts: float | None = None
         while self._running:
             # corta por tempo (ex.: 5s)
             if self.cfg.max_duration_seconds > 0 and (time.monotonic() - start) >= self.cfg.max_duration_seconds:
-                print(f"[INFO] Tempo máximo atingido ({self.cfg.max_duration_seconds:.1f}s). Encerrando captura.")
+                log.info("Tempo máximo atingido (%.1fs). Encerrando captura.", self.cfg.max_duration_seconds)
+                self.end_reason = "duration"
                 break
 
-            ok, frame = self.video.read()
-            if not ok or frame is None:
-                print("[WARN] Falha ao ler frame da câmera.")
+            t0 = time.perf_counter()
+            pkt = self.video.read_packet()
+            t1 = time.perf_counter()
+            m.observe("read", t1 - t0)
+            if pkt is None:
+                m.incr("read_failures")
+                log.warning("Falha ao ler frame da câmera.")
+                self.end_reason = "read_failure"
                 break
+            m.incr("frames_read")
+            if pkt.skipped:
+                self.frames_skipped += pkt.skipped
+                m.incr("frames_skipped", pkt.skipped)
 
-            # preview opcional
+            # preview opcional (fora de processo: só copia o frame, no máximo preview_max_fps)
             if self.cfg.preview:
-                cv2.imshow(window_name, frame)
-                if cv2.waitKey(1) & 0xFF == 27:  # ESC
+                if display.wants_frame():
+                    display.show(pkt.decode())
+                event = display.poll()
+                t2 = time.perf_counter()
+                m.observe("preview", t2 - t1)
+                t1 = t2
+                if event:  # ESC / janela fechada
                     self._running = False
+                    self.end_reason = event
+                    pkt.release()
                     break
 
             # salva por tempo (~fps)
-            if self.sampler.should_save():
-                path = self.storage.save(frame)
-                print(f"[SAVE] {path}")
+            if isinstance(self.sampler, ScheduledSampler):
+                # agenda fixa pelo timestamp de captura; o sampler pode segurar o frame (lookahead)
+                if first_ts is None:
+                    first_ts = pkt.timestamp
+                if self.cfg.max_duration_seconds > 0 and pkt.timestamp - first_ts >= self.cfg.max_duration_seconds:
+                    log.info("Tempo máximo atingido (%.1fs). Encerrando captura.", self.cfg.max_duration_seconds)
+                    self.end_reason = "duration"
+                    pkt.release()
+                    break
+                pkt.retain()
+                picks = [s.item for s in self.sampler.offer(pkt.timestamp, pkt)]
+            else:
+                picks = [pkt] if self.sampler.should_save() else []
+                if picks:
+                    pkt.retain()
+            m.observe("sample", time.perf_counter() - t1)
+            for chosen in picks:
+                self._save_packet(chosen)
+                chosen.release()
 
-        self._running = False
-        self._cleanup(window_name)
+            # o write-behind retém o buffer se precisar dele; o loop devolve o seu
+            pkt.release()
+
+        if isinstance(self.sampler, ScheduledSampler):
+            # frame pendente do último slot (só se o alvo cai dentro da duração)
+            end = first_ts + self.cfg.max_duration_seconds if first_ts is not None and self.cfg.max_duration_seconds > 0 else None
+            for s in self.sampler.flush(before=end):
+                self._save_packet(s.item)
+                s.item.release()
+            m.info["sampling"] = self.sampler.report()
+        self.recording_ended_at = time.monotonic()
+        if self.end_reason is None:
+            self.end_reason = "stopped"
+
+    def _save_packet(self, pkt):
+        """Recorte/filtro de qualidade opcionais e gravação de um frame escolhido pelo sampler."""
+        m = self.metrics
+        # passthrough decide pelos bytes da câmera: o preview pode já ter decodificado pkt.image
+        passthrough = self.passthrough_save and pkt.encoded is not None
+        frame = None if passthrough else pkt.image  # decodifica só quando precisa dos pixels
+        t2 = time.perf_counter()
+
+        # recorte da região da mão (só nos frames amostrados)
+        if self.cropper is not None:
+            frame = self.cropper(pkt.decode())
+            t3 = time.perf_counter()
+            m.observe("crop", t3 - t2)
+            t2 = t3
+
+        # filtro de qualidade opcional (borrado / quase duplicado)
+        if self.quality is not None:
+            decision = self.quality.check(frame if frame is not None else pkt.decode())
+            t3 = time.perf_counter()
+            m.observe("quality", t3 - t2)
+            t2 = t3
+            if not decision.accepted:
+                m.incr(f"quality_{decision.reason}")
+                log.debug("Frame ignorado: %s", decision.explain())
+                return
+
+        if passthrough:
+            path = self.storage.save_encoded(pkt.encoded, timestamp=pkt.timestamp, seq=pkt.seq)
+            m.incr("frames_passthrough")
+        else:
+            path = self.storage.save(frame if frame is not None else pkt.decode(), timestamp=pkt.timestamp, seq=pkt.seq)
+        m.observe("save", time.perf_counter() - t2)
+        if path is None:
+            log.debug("Frame entregue à fila (%s); confirmado só após a escrita.", self.storage.backpressure)
+        else:
+            log.debug("SAVE %s", path)
 
     def start(self):
         if self._running:
@@ -100,17 +480,87 @@ class CapturePipeline:
         self._thread = threading.Thread(target=self._loop, daemon=True)
         self._thread.start()
 
-    def stop(self):
+    def stop(self, wait: bool = True):
+        """Pede o fim da sessão (também durante a pré-gravação); wait=False não bloqueia (use self.finished)."""
         self._running = False
-        if self._thread and self._thread.is_alive():
+        if wait and self._thread and self._thread.is_alive():
             self._thread.join(timeout=2.0)
 
-    def _cleanup(self, window_name: str | None):
-        if self.video:
-            self.video.release()
-        if window_name:
+    def wait(self, timeout: float | None = None) -> bool:
+        """Espera a sessão terminar; devolve True se terminou dentro do timeout."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return not self.is_running()
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _cleanup(self, display=None):
+        """
+        Fecha preview, câmera e gravação e só então sinaliza self.finished: quem
+        espera o fim da sessão sabe que a câmera (ou o empréstimo do serviço) já
+        foi devolvida, mesmo se algum passo do encerramento falhar.
+        """
+        try:
+            try:
+                if display is not None:
+                    self.metrics.info["preview"] = display.report()
+                    if self.service is not None and isinstance(display, PreviewProcess):
+                        display.end_session()  # o processo fica com o serviço
+                    else:
+                        display.close()
+            finally:
+                if self.video:
+                    self.video.release()
+            self._finish_session()
+        finally:
+            self.state = "finished"
+            self.finished.set()
+        if self.on_finished is not None:
+            try:
+                self.on_finished(self)
+            except Exception:
+                log.exception("Erro no callback de fim de sessão")
+
+    def _finish_session(self):
+        # espera o write-behind terminar antes de dar a sessão por encerrada
+        self.storage.close()
+        st = self.storage.stats
+        if self.service is not None:
+            self.service.set_counter(self.out_dir, self.cfg.get_letter(), self.storage.counter)
+        if self.frames_skipped:
+            log.info("Frames pulados pela leitura em thread: %d", self.frames_skipped)
+        if self.pool is not None:
+            ps = self.pool.stats
+            self.metrics.info["frame_pool"] = ps.as_dict()
+            self.metrics.incr("pool_exhausted", ps.exhausted)
+            log_fn = log.warning if ps.exhausted else log.info
+            log_fn(
+                "Pool de frames: %d buffers (+%d sob demanda), pico em uso %d, esgotado %d vez(es)",
+                ps.size, ps.grown, ps.peak_in_use, ps.exhausted,
+            )
+        log.info("Frames: enfileirados=%d gravados=%d descartados=%d falhas=%d", st.queued, st.written, st.dropped, st.failed)
+        if self.quality is not None:
+            q = self.quality.report()
+            self.metrics.info["quality"] = q
+            log.info(
+                "Filtro de qualidade: aceitos=%d borrados=%d duplicados=%d (nitidez média %.1f)",
+                q["accepted"], q["rejected_blurry"], q["rejected_duplicate"], q["mean_sharpness"],
+            )
+        self.metrics.info["end_reason"] = self.end_reason
+        if self.recording_started_at is not None and self.recording_ended_at is not None:
+            self.metrics.info["recorded_s"] = self.recording_ended_at - self.recording_started_at
+        if self.cfg.write_metrics:
+            self.metrics.info.update(
+                letter=self.cfg.get_letter(),
+                out_dir=str(self.out_dir),
+                save_fps=self.cfg.save_fps,
+                storage=st.as_dict(),
+            )
+            path = self.out_dir.parent / f"metrics_{self.out_dir.name}_{self.session_id}.json"
             try:
-                cv2.destroyWindow(window_name)
-            except cv2.error:
-                pass
-        print("[INFO] Captura finalizada.")
+                self.metrics_path = self.metrics.write_json(path)
+                log.info("Métricas: %s", path)
+            except OSError as e:
+                log.warning("Não foi possível gravar as métricas: %s", e)
+        log.info("Captura finalizada (%s).", self.end_reason)
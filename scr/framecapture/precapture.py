@@ -1,9 +1,154 @@
 # scr/framecapture/precapture.py
 from __future__ import annotations
-from typing import Tuple
+from typing import Callable, Dict, Optional, Tuple
+import logging
 import math
 import time
 import cv2
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+DEFAULT_RADIUS_FRAC = 0.22  # raio ≈ 22% do menor lado
+
+
+def guide_circle(w: int, h: int, radius_frac: float = DEFAULT_RADIUS_FRAC) -> Tuple[Tuple[int, int], int]:
+    """Centro e raio do círculo do guia para um frame w x h (usado também pelo recorte de ROI)."""
+    return (w // 2, h // 2), max(10, int(min(w, h) * radius_frac))
+
+
+class _Sprite:
+    """
+    Elemento do overlay pré-renderizado para um tamanho de frame, a partir de
+    uma máscara com alfa do tamanho do próprio elemento (não do frame) posicionada
+    em origin = (x, y) do frame; o que cai fora do frame é ignorado.
+    Pixels opacos: cv2.copyTo com máscara, só no retângulo do elemento.
+    Pixels de borda (anti-aliasing): mesclados em aritmética inteira
+    (px * (256 - a) >> 8 + cor * a) apenas nos bytes cobertos.
+    """
+    def __init__(self, mask: np.ndarray, color: Tuple[int, int, int], origin: Tuple[int, int], frame_size: Tuple[int, int]):
+        w, h = frame_size
+        x0, y0 = origin
+        mh, mw = mask.shape
+        sx0, sy0 = max(0, -x0), max(0, -y0)
+        sx1, sy1 = max(sx0, min(mw, w - x0)), max(sy0, min(mh, h - y0))
+        sub = mask[sy0:sy1, sx0:sx1]
+        x0, y0 = x0 + sx0, y0 + sy0
+        chans = np.arange(3)
+        color = np.asarray(color, dtype=np.uint16)
+
+        self.box = (slice(y0, y0 + sub.shape[0]), slice(x0, x0 + sub.shape[1]))
+        self.opaque_mask = (sub == 255).astype(np.uint8)
+        self.color_patch = np.empty(sub.shape + (3,), dtype=np.uint8)
+        self.color_patch[:] = color
+
+        ey, ex = np.nonzero((sub > 0) & (sub < 255))
+        a = sub[ey, ex].astype(np.uint16)
+        idx = (ey + y0) * w + (ex + x0)
+        self.edge_idx = (idx[:, None] * 3 + chans).ravel()
+        self.edge_inv = np.repeat(256 - (a * 256 + 127) // 255, 3)
+        self.edge_premult = ((a[:, None] * color + 127) // 255).astype(np.uint8).ravel()
+
+    @property
+    def empty(self) -> bool:
+        """Nada visível no frame (ex.: texto fora de um frame pequeno)."""
+        return not self.opaque_mask.any() and self.edge_idx.size == 0
+
+    def blend_into(self, frame: np.ndarray):
+        """frame: BGR uint8 contíguo do mesmo tamanho usado na construção."""
+        cv2.copyTo(self.color_patch, self.opaque_mask, frame[self.box])
+        if self.edge_idx.size:
+            flat = frame.reshape(-1)
+            px = flat[self.edge_idx].astype(np.uint16)
+            px *= self.edge_inv
+            px >>= 8
+            px += self.edge_premult
+            flat[self.edge_idx] = px
+
+
+class PresenceDetector:
+    """
+    Detecta a mão dentro do círculo do guia: movimento (diferença entre frames
+    consecutivos) ou ocupação por tom de pele (faixa YCrCb), medidos numa versão
+    reduzida (analysis_size x analysis_size) só do quadrado do círculo.
+    update() devolve True quando a presença se mantém por hold_seconds.
+    Uma fração <= 0 desliga o respectivo critério.
+    """
+    SKIN_LOW = np.array([0, 133, 77], dtype=np.uint8)     # Y, Cr, Cb
+    SKIN_HIGH = np.array([255, 173, 127], dtype=np.uint8)
+
+    def __init__(
+        self,
+        radius_frac: float = DEFAULT_RADIUS_FRAC,
+        analysis_size: int = 64,
+        motion_threshold: int = 18,      # diferença de cinza (0-255) que conta como movimento
+        min_motion_frac: float = 0.06,   # fração do círculo em movimento
+        min_skin_frac: float = 0.30,     # fração do círculo com tom de pele
+        hold_seconds: float = 0.4,
+    ):
+        self.radius_frac = float(radius_frac)
+        self.size = int(analysis_size)
+        self.motion_threshold = int(motion_threshold)
+        self.min_motion_frac = float(min_motion_frac)
+        self.min_skin_frac = float(min_skin_frac)
+        self.hold_seconds = float(hold_seconds)
+        mask = np.zeros((self.size, self.size), dtype=np.uint8)
+        cv2.circle(mask, (self.size // 2, self.size // 2), self.size // 2, 255, -1)
+        self._mask = mask
+        self._mask_area = float(cv2.countNonZero(mask))
+        self._small = np.empty((self.size, self.size, 3), dtype=np.uint8)
+        self._gray = np.empty((self.size, self.size), dtype=np.uint8)
+        self._prev: Optional[np.ndarray] = None
+        self._boxes: Dict[Tuple[int, int], Tuple[slice, slice]] = {}
+        self.reset()
+
+    def reset(self):
+        self._prev = None
+        self._since: Optional[float] = None
+        self.motion = 0.0
+        self.skin = 0.0
+        self.reason = ""
+
+    def _box(self, w: int, h: int) -> Tuple[slice, slice]:
+        box = self._boxes.get((w, h))
+        if box is None:
+            (cx, cy), r = guide_circle(w, h, self.radius_frac)
+            box = self._boxes[(w, h)] = (slice(max(0, cy - r), cy + r), slice(max(0, cx - r), cx + r))
+        return box
+
+    def measure(self, frame: np.ndarray) -> Tuple[float, float]:
+        """(fração em movimento, fração com tom de pele) dentro do círculo."""
+        h, w = frame.shape[:2]
+        roi = frame[self._box(w, h)]
+        cv2.resize(roi, (self.size, self.size), dst=self._small, interpolation=cv2.INTER_NEAREST)
+        cv2.cvtColor(self._small, cv2.COLOR_BGR2GRAY, dst=self._gray)
+        motion = 0.0
+        if self._prev is None:
+            self._prev = self._gray.copy()
+        else:
+            diff = cv2.absdiff(self._gray, self._prev)
+            np.copyto(self._prev, self._gray)
+            moving = cv2.threshold(diff, self.motion_threshold, 255, cv2.THRESH_BINARY)[1]
+            motion = cv2.countNonZero(cv2.bitwise_and(moving, self._mask)) / self._mask_area
+        skin = 0.0
+        if self.min_skin_frac > 0:
+            ycrcb = cv2.cvtColor(self._small, cv2.COLOR_BGR2YCrCb)
+            skin_mask = cv2.inRange(ycrcb, self.SKIN_LOW, self.SKIN_HIGH)
+            skin = cv2.countNonZero(cv2.bitwise_and(skin_mask, self._mask)) / self._mask_area
+        return motion, skin
+
+    def update(self, frame: np.ndarray, now: Optional[float] = None) -> bool:
+        now = time.monotonic() if now is None else now
+        self.motion, self.skin = self.measure(frame)
+        moving = self.min_motion_frac > 0 and self.motion >= self.min_motion_frac
+        skin = self.min_skin_frac > 0 and self.skin >= self.min_skin_frac
+        if not (moving or skin):
+            self._since = None
+            return False
+        if self._since is None:
+            self._since = now
+        self.reason = "motion" if moving else "skin"
+        return now - self._since >= self.hold_seconds
 
 
 class PreCaptureGuide:
@@ -12,7 +157,14 @@ class PreCaptureGuide:
     - círculo central de posicionamento
     - contagem regressiva (3..2..1)
     Retorna True se completar a contagem, False se o usuário cancelar (ESC) ou falhar captura.
-    NÃO cria e NÃO destrói a janela; isso é responsabilidade do chamador (pipeline).
+    NÃO cria e NÃO fecha o preview; isso é responsabilidade do chamador (pipeline).
+
+    Com trigger (PresenceDetector), em vez da contagem fixa espera a mão aparecer
+    no círculo e libera a gravação assim que a presença se mantém; countdown_seconds
+    passa a ser o tempo máximo de espera (0 = sem limite) e o estouro conta como falha.
+
+    should_stop (opcional, em run_on) é consultado a cada frame: quando devolve True
+    a pré-gravação termina com False e self.stopped = True (ex.: "Parar" no app).
     """
 
     def __init__(
@@ -21,8 +173,9 @@ class PreCaptureGuide:
         circle_color: Tuple[int, int, int] = (0, 255, 0),
         text_color: Tuple[int, int, int] = (255, 255, 255),
         circle_thickness: int = 3,
-        radius_frac: float = 0.22,   # raio ≈ 22% do menor lado
+        radius_frac: float = DEFAULT_RADIUS_FRAC,
         title: str = "Posicione a mao no circulo (ESC cancela)",
+        trigger: Optional[PresenceDetector] = None,
     ):
         self.countdown_seconds = float(countdown_seconds)
         self.circle_color = circle_color
@@ -30,49 +183,199 @@ class PreCaptureGuide:
         self.circle_thickness = int(circle_thickness)
         self.radius_frac = float(radius_frac)
         self.title = title
+        self.trigger = trigger
+        self.waited = 0.0    # segundos até liberar a gravação
+        self.skipped = 0
+        self.stopped = False  # True = interrompido por should_stop
+        self._packet = None  # pacote do frame em exibição (devolvido ao pool depois do show)
+        self._sprites: Dict[Tuple[int, int, str], Tuple[_Sprite, ...]] = {}
 
-    def run_on(self, cap: cv2.VideoCapture, window_name: str) -> bool:
-        start = time.monotonic()
-        end_t = start + self.countdown_seconds
+    def run_on(self, cap, display, should_stop: Optional[Callable[[], bool]] = None) -> bool:
+        """
+        cap: cv2.VideoCapture ou uma fonte de video.py; com read_packet() (ex.:
+        ThreadedVideoSource) usa sempre o frame mais recente e soma em self.skipped
+        os frames que ficaram para trás.
+        display: preview de preview.py (PreviewProcess/InlinePreview); None = sem
+        exibição (só no modo gatilho).
+        should_stop: consultado a cada frame; True encerra a pré-gravação (False).
+        """
+        self.skipped = 0
+        self.stopped = False
+        if self.trigger is not None:
+            return self._run_trigger(cap, display, should_stop)
+        end_t: Optional[float] = None
 
         while True:
-            now = time.monotonic()
-            remaining = end_t - now
-
-            ok, frame = cap.read()
-            if not ok or frame is None:
-                print("[WARN] Falha ao ler frame na pré-gravação.")
+            if self._stop_requested(should_stop):
                 return False
+            frame = self._read(cap)
+            if frame is None:
+                log.warning("Falha ao ler frame na pré-gravação.")
+                return False
+            if end_t is None:
+                # sprites de todos os números antes de a contagem começar (nada é montado no loop)
+                self.prepare(frame.shape[1], frame.shape[0])
+                end_t = time.monotonic() + self.countdown_seconds
+            remaining = end_t - time.monotonic()
 
-            h, w = frame.shape[:2]
-            center = (w // 2, h // 2)
-            radius = max(10, int(min(w, h) * self.radius_frac))
-
-            # círculo central
-            cv2.circle(frame, center, radius, self.circle_color, self.circle_thickness, lineType=cv2.LINE_AA)
-
-            # título/instrução
-            self._put_center_text(frame, self.title, (w // 2, int(0.10 * h)), scale=0.8, thickness=2)
-
-            # contagem 3..2..1
             secs = max(0, int(math.ceil(remaining)))
+            self.draw(frame, secs)
+            display.show(frame)
+            self._release_packet()
             if secs <= 0:
-                self._put_center_text(frame, "GO!", (w // 2, int(0.60 * h)), scale=2.2, thickness=4)
-                cv2.imshow(window_name, frame)
-                cv2.waitKey(250)  # feedback rápido
+                display.hold(0.25)  # feedback rápido
                 return True
-            else:
-                self._put_center_text(frame, f"{secs}", (w // 2, int(0.60 * h)), scale=2.2, thickness=4)
 
-            cv2.imshow(window_name, frame)
-            key = cv2.waitKey(1) & 0xFF
-            if key == 27:  # ESC
+            if display.poll():  # ESC / janela fechada
                 return False
 
+    def _run_trigger(self, cap, display, should_stop: Optional[Callable[[], bool]] = None) -> bool:
+        trigger = self.trigger
+        trigger.reset()
+        start = time.monotonic()
+        timeout = self.countdown_seconds
+        prepared = display is None
+        while True:
+            if self._stop_requested(should_stop):
+                return False
+            frame = self._read(cap)
+            if frame is None:
+                log.warning("Falha ao ler frame na pré-gravação.")
+                return False
+            if not prepared:
+                self.prepare(frame.shape[1], frame.shape[0])
+                prepared = True
+            now = time.monotonic()
+            fired = trigger.update(frame, now)
+            if display is not None:
+                self.draw_waiting(frame, fired)
+                display.show(frame)
+            self._release_packet()
+            if fired:
+                self.waited = now - start
+                log.info("Mão detectada (%s) após %.1fs.", trigger.reason, self.waited)
+                return True
+            if timeout > 0 and now - start >= timeout:
+                log.info("Nenhuma mão detectada em %.0fs.", timeout)
+                return False
+            if display is not None and display.poll():  # ESC / janela fechada
+                return False
+
+    def draw_waiting(self, frame, ready: bool):
+        """Overlay do modo gatilho: círculo + título e "PRONTO?" / "GO!"."""
+        if frame.dtype != np.uint8 or frame.ndim != 3 or frame.shape[2] != 3 or not frame.flags.c_contiguous:
+            return
+        h, w = frame.shape[:2]
+        for sprite in self._sprites_for(w, h, "") + self._sprites_for(w, h, "GO!" if ready else "PRONTO?"):
+            sprite.blend_into(frame)
+
+    def draw(self, frame, secs: int):
+        """
+        Desenha círculo, título e contagem (secs <= 0 mostra "GO!") sobre o frame.
+        Círculo + título e cada dígito são renderizados uma única vez por tamanho
+        de frame (prepare(); máscara com alfa do tamanho do elemento) e depois só
+        mesclados nos pixels que cobrem.
+        """
+        if frame.dtype != np.uint8 or frame.ndim != 3 or frame.shape[2] != 3 or not frame.flags.c_contiguous:
+            self.draw_direct(frame, secs)
+            return
+        h, w = frame.shape[:2]
+        for sprite in self._sprites_for(w, h, "") + self._sprites_for(w, h, "GO!" if secs <= 0 else f"{secs}"):
+            sprite.blend_into(frame)
+
+    def prepare(self, w: int, h: int, trigger: Optional[bool] = None):
+        """
+        Pré-renderiza, para frames w x h, a camada estática e todos os textos que
+        a contagem (ou o modo gatilho) vai mostrar, para o loop ao vivo só mesclar.
+        run_on() chama antes de a contagem começar; trigger None = self.trigger.
+        """
+        if trigger is None:
+            trigger = self.trigger is not None
+        texts = ["", "GO!"]
+        if trigger:
+            texts.append("PRONTO?")
+        else:
+            texts.extend(str(s) for s in range(1, int(math.ceil(self.countdown_seconds)) + 1))
+        for text in texts:
+            self._sprites_for(w, h, text)
+
+    def _sprites_for(self, w: int, h: int, text: str) -> Tuple[_Sprite, ...]:
+        """text vazio = camada estática (círculo + título); senão, o texto da contagem."""
+        key = (w, h, text)
+        sprites = self._sprites.get(key)
+        if sprites is not None:
+            return sprites
+        if text:
+            sprites = (self._text_sprite(w, h, text, (w // 2, int(0.60 * h)), scale=2.2, thickness=4),)
+        else:
+            center, radius = guide_circle(w, h, self.radius_frac)
+            pad = self.circle_thickness + 2
+            side = 2 * (radius + pad) + 1
+            circle = np.zeros((side, side), dtype=np.uint8)
+            cv2.circle(circle, (radius + pad, radius + pad), radius, 255, self.circle_thickness, lineType=cv2.LINE_AA)
+            origin = (center[0] - radius - pad, center[1] - radius - pad)
+            sprites = (
+                _Sprite(circle, self.circle_color, origin, (w, h)),
+                self._text_sprite(w, h, self.title, (w // 2, int(0.10 * h)), scale=0.8, thickness=2),
+            )
+        sprites = tuple(sp for sp in sprites if not sp.empty)
+        self._sprites[key] = sprites
+        return sprites
+
+    def _text_sprite(self, w: int, h: int, text: str, center_xy: Tuple[int, int], scale: float, thickness: int) -> _Sprite:
+        """Texto centrado como em _put_center_text, rasterizado numa máscara do tamanho do texto."""
+        font = cv2.FONT_HERSHEY_SIMPLEX
+        (tw, th), baseline = cv2.getTextSize(text, font, scale, thickness)
+        pad = thickness + 2
+        mask = np.zeros((th + baseline + 2 * pad, tw + 2 * pad), dtype=np.uint8)
+        cv2.putText(mask, text, (pad, pad + th), font, scale, 255, thickness, lineType=cv2.LINE_AA)
+        x = int(center_xy[0] - tw / 2)
+        y = int(center_xy[1] + th / 2)
+        return _Sprite(mask, self.text_color, (x - pad, y - th - pad), (w, h))
+
+    def draw_direct(self, frame, secs: int):
+        """Versão sem cache (desenha tudo a cada frame); referência para o benchmark."""
+        h, w = frame.shape[:2]
+        center, radius = guide_circle(w, h, self.radius_frac)
+
+        # círculo central
+        cv2.circle(frame, center, radius, self.circle_color, self.circle_thickness, lineType=cv2.LINE_AA)
+
+        # título/instrução
+        self._put_center_text(frame, self.title, (w // 2, int(0.10 * h)), scale=0.8, thickness=2)
+
+        # contagem 3..2..1
+        text = "GO!" if secs <= 0 else f"{secs}"
+        self._put_center_text(frame, text, (w // 2, int(0.60 * h)), scale=2.2, thickness=4)
+
     # ---- util ----
-    def _put_center_text(self, frame, text: str, center_xy: Tuple[int, int], scale: float = 1.0, thickness: int = 2):
+    def _stop_requested(self, should_stop: Optional[Callable[[], bool]]) -> bool:
+        if should_stop is not None and should_stop():
+            self.stopped = True
+            log.info("Pré-gravação interrompida.")
+            return True
+        return False
+
+    def _read(self, cap):
+        read_packet = getattr(cap, "read_packet", None)
+        if read_packet is None:
+            ok, frame = cap.read()
+            return frame if ok else None
+        pkt = read_packet()
+        if pkt is None:
+            return None
+        self.skipped += pkt.skipped
+        self._packet = pkt
+        return pkt.decode()
+
+    def _release_packet(self):
+        if self._packet is not None:
+            self._packet.release()
+            self._packet = None
+
+    def _put_center_text(self, frame, text: str, center_xy: Tuple[int, int], scale: float = 1.0, thickness: int = 2, color=None):
         font = cv2.FONT_HERSHEY_SIMPLEX
         (tw, th), _ = cv2.getTextSize(text, font, scale, thickness)
         x = int(center_xy[0] - tw / 2)
         y = int(center_xy[1] + th / 2)
-        cv2.putText(frame, text, (x, y), font, scale, self.text_color, thickness, lineType=cv2.LINE_AA)
+        cv2.putText(frame, text, (x, y), font, scale, self.text_color if color is None else color, thickness, lineType=cv2.LINE_AA)
@@ -0,0 +1,344 @@
+# scr/framecapture/preview.py
+"""
+Preview fora da thread de captura.
+
+PreviewProcess roda a janela do OpenCV (imshow/waitKey) num processo separado:
+a captura só copia o frame para um buffer duplo em memória compartilhada
+(SharedFrameBuffer) e nunca espera a renderização. O processo de preview lê o
+frame mais recente, reduz para exibição, limita a própria taxa (max_fps) e
+devolve eventos (ESC, janela fechada, erro) por um Pipe.
+
+InlinePreview mantém o comportamento antigo (imshow na própria thread) com a
+mesma interface: wants_frame(), show(frame), poll() -> evento | None, hold(s),
+report() e close().
+"""
+from __future__ import annotations
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+import logging
+import multiprocessing as mp
+import time
+import cv2
+import numpy as np
+
+log = logging.getLogger(__name__)
+
+EVENT_ESC = "esc"        # ESC na janela
+EVENT_CLOSED = "closed"  # janela fechada pelo usuário
+EVENT_ERROR = "error"    # preview indisponível (ex.: OpenCV sem suporte a GUI)
+STOP_EVENTS = (EVENT_ESC, EVENT_CLOSED)
+
+
+class SharedFrameBuffer:
+    """
+    Dois slots de frame em memória compartilhada + cabeçalho por slot
+    [seq, altura, largura, canais]. Quem escreve alterna os slots e marca o
+    slot com seq ímpar durante a cópia e par ao terminar (seqlock); quem lê
+    pega o slot completo mais novo e descarta a leitura se o seq mudou no meio.
+    Só há um escritor; ninguém bloqueia.
+    """
+    HEADER = 2 * 4 * 8  # 2 slots x 4 int64
+
+    def __init__(self, shm: shared_memory.SharedMemory, owner: bool):
+        self.shm = shm
+        self.owner = owner
+        self.slot_bytes = (shm.size - self.HEADER) // 2
+        self.header = np.ndarray((2, 4), dtype=np.int64, buffer=shm.buf)
+        self.data = np.ndarray((2, self.slot_bytes), dtype=np.uint8, buffer=shm.buf, offset=self.HEADER)
+        self._count = 0
+
+    @classmethod
+    def create(cls, slot_bytes: int) -> "SharedFrameBuffer":
+        shm = shared_memory.SharedMemory(create=True, size=cls.HEADER + 2 * int(slot_bytes))
+        buf = cls(shm, owner=True)
+        buf.header[:] = 0
+        return buf
+
+    @classmethod
+    def attach(cls, name: str) -> "SharedFrameBuffer":
+        # o processo de preview (multiprocessing) usa o mesmo resource_tracker de quem criou;
+        # só o dono faz unlink
+        try:
+            shm = shared_memory.SharedMemory(name=name, track=False)  # Python >= 3.13
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=name)
+        return cls(shm, owner=False)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def fits(self, frame: np.ndarray) -> bool:
+        return frame.nbytes <= self.slot_bytes
+
+    def write(self, frame: np.ndarray) -> int:
+        """Copia o frame (uint8, H x W [x C]) para o slot livre; devolve o número do frame."""
+        self._count += 1
+        n = self._count
+        slot = n % 2
+        h, w = frame.shape[:2]
+        c = frame.shape[2] if frame.ndim == 3 else 1
+        hdr = self.header[slot]
+        hdr[0] = 2 * n - 1                     # escrevendo
+        hdr[1:] = (h, w, c)
+        np.copyto(self.data[slot, :frame.nbytes].reshape(frame.shape), frame)
+        hdr[0] = 2 * n                         # completo
+        return n
+
+    def read(self, after: int = 0) -> Optional[Tuple[int, np.ndarray]]:
+        """(número, cópia) do frame completo mais novo com número > after; None se não houver."""
+        seqs = self.header[:, 0].copy()
+        for slot in np.argsort(-seqs):
+            s = int(seqs[slot])
+            if s % 2 or s // 2 <= after:
+                continue
+            h, w, c = (int(v) for v in self.header[slot, 1:])
+            shape = (h, w, c) if c > 1 else (h, w)
+            frame = self.data[slot, :h * w * c].reshape(shape).copy()
+            if int(self.header[slot, 0]) == s:
+                return s // 2, frame
+            return None  # sobrescrito durante a cópia: fica para a próxima
+        return None
+
+    def close(self):
+        self.header = self.data = None
+        self.shm.close()
+        if self.owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _fit(frame: np.ndarray, max_width: int) -> np.ndarray:
+    h, w = frame.shape[:2]
+    if max_width <= 0 or w <= max_width:
+        return frame
+    return cv2.resize(frame, (max_width, max(1, round(h * max_width / w))), interpolation=cv2.INTER_AREA)
+
+
+def _preview_main(conn, title: str, max_fps: float, max_width: int):
+    """Processo de preview: exibe o frame mais novo a no máximo max_fps."""
+    period = 1.0 / max_fps if max_fps > 0 else 0.0
+    buf: Optional[SharedFrameBuffer] = None
+    last = 0
+    shown = False
+    window = True
+    try:
+        cv2.namedWindow(title, cv2.WINDOW_NORMAL)
+        while True:
+            t0 = time.monotonic()
+            while conn.poll():
+                msg = conn.recv()
+                if msg[0] == "attach":
+                    if buf is not None:
+                        buf.close()
+                    buf, last = None, 0
+                    try:
+                        buf = SharedFrameBuffer.attach(msg[1])
+                    except FileNotFoundError:
+                        pass  # dono já trocou de buffer (resize): vem outro attach
+                elif msg[0] == "hide":
+                    # fim da sessão: some com a janela, o processo fica para a próxima
+                    if window:
+                        cv2.destroyWindow(title)
+                        window = shown = False
+                elif msg[0] == "close":
+                    return
+            if buf is not None:
+                got = buf.read(last)
+                if got is not None:
+                    last, frame = got
+                    if not window:
+                        cv2.namedWindow(title, cv2.WINDOW_NORMAL)
+                        window = True
+                    cv2.imshow(title, _fit(frame, max_width))
+                    shown = True
+            wait_ms = max(1, int((period - (time.monotonic() - t0)) * 1000))
+            key = cv2.waitKey(wait_ms) & 0xFF
+            if key == 27:
+                conn.send((EVENT_ESC,))
+            elif shown and cv2.getWindowProperty(title, cv2.WND_PROP_VISIBLE) < 1:
+                conn.send((EVENT_CLOSED,))
+                shown = False
+    except (EOFError, BrokenPipeError, KeyboardInterrupt):
+        pass  # processo principal foi embora
+    except cv2.error as e:
+        try:
+            conn.send((EVENT_ERROR, str(e).strip()))
+        except (BrokenPipeError, OSError):
+            pass
+    finally:
+        if buf is not None:
+            buf.close()
+        try:
+            cv2.destroyAllWindows()
+        except cv2.error:
+            pass
+
+
+class PreviewProcess:
+    """
+    Janela de preview em outro processo (spawn). show() só copia o frame para
+    a memória compartilhada, e no máximo max_fps vezes por segundo (os demais
+    frames são ignorados sem custo); a redução para max_width acontece no
+    processo de preview. poll() devolve "esc"/"closed" quando o usuário pede
+    para parar; se o preview falhar, a captura segue sem ele.
+
+    Entre sessões o processo pode ser reaproveitado (ver CaptureService.preview):
+    end_session() fecha só a janela e begin_session() zera contadores e eventos
+    pendentes; close() encerra o processo.
+    """
+    def __init__(self, title: str, max_fps: float = 15.0, max_width: int = 960):
+        self.title = title
+        self.max_fps = float(max_fps)
+        self.max_width = int(max_width)
+        self.frames_shown = 0     # frames copiados para o preview
+        self.frames_skipped = 0   # ignorados pelo limite de fps
+        self.failed = False
+        self.sessions = 0         # sessões atendidas por este processo
+        self._buf: Optional[SharedFrameBuffer] = None
+        self._next_t = 0.0
+        ctx = mp.get_context("spawn")  # fork de um processo com threads/Tk não é seguro
+        self._conn, child = ctx.Pipe()
+        self._proc = ctx.Process(
+            target=_preview_main, args=(child, title, self.max_fps, self.max_width), name="Preview", daemon=True
+        )
+        self._proc.start()
+        child.close()
+
+    @property
+    def alive(self) -> bool:
+        return not self.failed and self._proc.is_alive()
+
+    def begin_session(self):
+        """Nova sessão no mesmo processo: zera contadores e descarta ESC/fechar antigos."""
+        self.frames_shown = self.frames_skipped = 0
+        self._next_t = 0.0
+        self.sessions += 1
+        while self.poll():
+            pass
+
+    def end_session(self):
+        """Fecha a janela e mantém o processo (e o cv2 já importado) para a próxima sessão."""
+        try:
+            self._conn.send(("hide",))
+        except (BrokenPipeError, OSError):
+            self._fail("processo de preview encerrado")
+
+    def wants_frame(self) -> bool:
+        """False enquanto o limite de fps não libera outro frame (evita decodificar/montar à toa)."""
+        if self.failed:
+            return False
+        if time.monotonic() < self._next_t:
+            self.frames_skipped += 1
+            return False
+        return True
+
+    def show(self, frame: np.ndarray) -> bool:
+        """Publica o frame se o limite de fps permitir; True se publicou."""
+        if self.failed or frame is None:
+            return False
+        now = time.monotonic()
+        if now < self._next_t:
+            self.frames_skipped += 1
+            return False
+        self._next_t = now + (1.0 / self.max_fps if self.max_fps > 0 else 0.0)
+        if self._buf is None or not self._buf.fits(frame):
+            old = self._buf
+            self._buf = SharedFrameBuffer.create(frame.nbytes)
+            try:
+                self._conn.send(("attach", self._buf.name))
+            except (BrokenPipeError, OSError):
+                self._fail("processo de preview encerrado")
+                return False
+            if old is not None:
+                old.close()
+        self._buf.write(np.ascontiguousarray(frame))
+        self.frames_shown += 1
+        return True
+
+    def poll(self) -> Optional[str]:
+        """Evento de parada pendente ("esc"/"closed") ou None; nunca bloqueia."""
+        if self.failed:
+            return None
+        try:
+            while self._conn.poll():
+                msg = self._conn.recv()
+                if msg[0] == EVENT_ERROR:
+                    self._fail(msg[1] if len(msg) > 1 else "")
+                    return None
+                if msg[0] in STOP_EVENTS:
+                    return msg[0]
+        except (EOFError, OSError):
+            self._fail("processo de preview encerrado")
+        return None
+
+    def hold(self, seconds: float):
+        time.sleep(seconds)
+
+    def report(self) -> dict:
+        return {
+            "process": True, "frames_shown": self.frames_shown, "frames_skipped": self.frames_skipped,
+            "failed": self.failed, "sessions": self.sessions,
+        }
+
+    def _fail(self, reason: str):
+        if not self.failed:
+            self.failed = True
+            log.warning("Preview indisponível (%s); captura segue sem janela.", reason)
+
+    def close(self):
+        try:
+            self._conn.send(("close",))
+        except (BrokenPipeError, OSError):
+            pass
+        self._proc.join(timeout=1.0)
+        if self._proc.is_alive():
+            self._proc.terminate()
+            self._proc.join(timeout=1.0)
+        self._conn.close()
+        if self._buf is not None:
+            self._buf.close()
+            self._buf = None
+
+
+class InlinePreview:
+    """Janela do OpenCV na própria thread (imshow + waitKey(1) a cada show())."""
+    def __init__(self, title: str):
+        self.title = title
+        self.frames_shown = 0
+        self._key = -1
+        cv2.namedWindow(title, cv2.WINDOW_NORMAL)
+
+    def wants_frame(self) -> bool:
+        return True
+
+    def show(self, frame: np.ndarray) -> bool:
+        cv2.imshow(self.title, frame)
+        self._key = cv2.waitKey(1) & 0xFF
+        self.frames_shown += 1
+        return True
+
+    def poll(self) -> Optional[str]:
+        key, self._key = self._key, -1
+        return EVENT_ESC if key == 27 else None
+
+    def hold(self, seconds: float):
+        cv2.waitKey(max(1, int(seconds * 1000)))
+
+    def report(self) -> dict:
+        return {"process": False, "frames_shown": self.frames_shown}
+
+    def close(self):
+        try:
+            cv2.destroyWindow(self.title)
+        except cv2.error:
+            pass
+
+
+def open_preview(title: str, out_of_process: bool = False, max_fps: float = 15.0, max_width: int = 960):
+    """PreviewProcess (out_of_process=True, opcional) ou InlinePreview (padrão)."""
+    if out_of_process:
+        return PreviewProcess(title, max_fps, max_width)
+    return InlinePreview(title)
@@ -0,0 +1,109 @@
+# scr/framecapture/quality.py
+from __future__ import annotations
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Optional
+import cv2
+import numpy as np
+
+ANALYSIS_WIDTH = 256   # largura da versão reduzida usada para medir nitidez
+HASH_SIZE = 8          # dHash 8x8 -> 64 bits
+
+
+@dataclass
+class QualityDecision:
+    accepted: bool
+    reason: str                       # "ok" | "blurry" | "duplicate"
+    sharpness: float
+    distance: Optional[int] = None    # menor distância de Hamming para os últimos salvos
+
+    def explain(self) -> str:
+        if self.reason == "blurry":
+            return f"borrado (nitidez {self.sharpness:.1f})"
+        if self.reason == "duplicate":
+            return f"quase idêntico a um frame recente (distância {self.distance})"
+        return "ok"
+
+
+def sharpness_score(gray_small: np.ndarray) -> float:
+    """Variância do Laplaciano: quanto maior, mais bordas nítidas."""
+    _, std = cv2.meanStdDev(cv2.Laplacian(gray_small, cv2.CV_32F))
+    return float(std[0, 0] ** 2)
+
+
+def dhash(gray_small: np.ndarray) -> np.uint64:
+    """Hash perceptual por diferença horizontal (64 bits)."""
+    tiny = cv2.resize(gray_small, (HASH_SIZE + 1, HASH_SIZE), interpolation=cv2.INTER_AREA)
+    bits = tiny[:, 1:] > tiny[:, :-1]
+    return np.packbits(bits.ravel()).view(">u8")[0].astype(np.uint64)
+
+
+def hamming(hashes: np.ndarray, h: np.uint64) -> np.ndarray:
+    """Distâncias de Hamming entre h e cada hash do array (vetorizado)."""
+    x = np.bitwise_xor(hashes, h)
+    return np.unpackbits(x.view(np.uint8).reshape(-1, 8), axis=1).sum(axis=1)
+
+
+class QualityGate:
+    """
+    Filtro opcional entre o sampler (ScheduledSampler/TimeSampler) e FrameStorage.save():
+    descarta frames borrados (nitidez < min_sharpness) e quase duplicados
+    (dHash a até max_hash_distance bits de um dos últimos `history` frames aceitos).
+    Tudo é calculado numa versão reduzida em tons de cinza.
+    min_sharpness <= 0 ou max_hash_distance < 0 desligam o respectivo teste.
+    """
+    def __init__(self, min_sharpness: float = 0.0, max_hash_distance: int = -1, history: int = 8):
+        self.min_sharpness = float(min_sharpness)
+        self.max_hash_distance = int(max_hash_distance)
+        self._recent: deque[np.uint64] = deque(maxlen=max(1, int(history)))
+        self.counts: Dict[str, int] = {"ok": 0, "blurry": 0, "duplicate": 0}
+        self.skipped: deque[str] = deque(maxlen=50)  # últimas explicações de descarte
+        self._sharpness_sum = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.min_sharpness > 0 or self.max_hash_distance >= 0
+
+    def _gray_small(self, frame: np.ndarray) -> np.ndarray:
+        h, w = frame.shape[:2]
+        if w > ANALYSIS_WIDTH:
+            frame = cv2.resize(frame, (ANALYSIS_WIDTH, max(1, h * ANALYSIS_WIDTH // w)), interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+
+    def check(self, frame: np.ndarray) -> QualityDecision:
+        """Avalia o frame; se aceito, seu hash entra no histórico."""
+        gray = self._gray_small(frame)
+        score = sharpness_score(gray)
+        self._sharpness_sum += score
+
+        if self.min_sharpness > 0 and score < self.min_sharpness:
+            decision = QualityDecision(False, "blurry", score)
+        else:
+            decision = QualityDecision(True, "ok", score)
+            if self.max_hash_distance >= 0:
+                h = dhash(gray)
+                if self._recent:
+                    dist = int(hamming(np.fromiter(self._recent, dtype=np.uint64), h).min())
+                    decision.distance = dist
+                    if dist <= self.max_hash_distance:
+                        decision = QualityDecision(False, "duplicate", score, dist)
+                if decision.accepted:
+                    self._recent.append(h)
+
+        self.counts[decision.reason] += 1
+        if not decision.accepted:
+            self.skipped.append(decision.explain())
+        return decision
+
+    def report(self) -> Dict:
+        total = sum(self.counts.values())
+        return {
+            "evaluated": total,
+            "accepted": self.counts["ok"],
+            "rejected_blurry": self.counts["blurry"],
+            "rejected_duplicate": self.counts["duplicate"],
+            "mean_sharpness": self._sharpness_sum / total if total else 0.0,
+            "min_sharpness": self.min_sharpness,
+            "max_hash_distance": self.max_hash_distance,
+            "last_skips": list(self.skipped),
+        }
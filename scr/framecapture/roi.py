@@ -0,0 +1,70 @@
+# scr/framecapture/roi.py
+from __future__ import annotations
+from typing import Dict, Optional, Tuple
+import cv2
+import numpy as np
+
+from .precapture import DEFAULT_RADIUS_FRAC, guide_circle
+
+
+class RoiCropper:
+    """
+    Recorta a região da mão definida pelo PreCaptureGuide: o quadrado que
+    contém o círculo do guia, ampliado por pad_frac (0.25 = 25% de margem), e
+    redimensiona para output_size (largura, altura).
+
+    O recorte é uma view do frame (sem cópia) e o resize escreve num anel de
+    `buffers` arrays pré-alocados. Um buffer só é reutilizado depois de
+    `buffers` chamadas; com gravação assíncrona o chamador precisa pedir
+    buffers suficientes para cobrir a fila (ver CapturePipeline).
+    Sem output_size o resultado é a própria view recortada; se o frame veio de
+    um FramePool, quem guarda a view retém o buffer de origem (FramePool.retain
+    aceita views).
+    """
+    def __init__(
+        self,
+        output_size: Optional[Tuple[int, int]] = (224, 224),
+        radius_frac: float = DEFAULT_RADIUS_FRAC,
+        pad_frac: float = 0.0,
+        buffers: int = 1,
+        interpolation: int = cv2.INTER_AREA,
+    ):
+        self.output_size = tuple(output_size) if output_size else None
+        self.radius_frac = float(radius_frac)
+        self.pad_frac = max(0.0, float(pad_frac))
+        self.interpolation = interpolation
+        self._n_buffers = max(1, int(buffers))
+        self._buffers: list[np.ndarray] = []
+        self._next = 0
+        self._boxes: Dict[Tuple[int, int], Tuple[int, int, int, int]] = {}
+
+    def box(self, w: int, h: int) -> Tuple[int, int, int, int]:
+        """(x0, y0, x1, y1) do recorte para um frame w x h (cacheado por tamanho)."""
+        key = (w, h)
+        b = self._boxes.get(key)
+        if b is None:
+            (cx, cy), r = guide_circle(w, h, self.radius_frac)
+            side = min(int(round(2 * r * (1.0 + self.pad_frac))), w, h)
+            x0 = min(max(0, cx - side // 2), w - side)
+            y0 = min(max(0, cy - side // 2), h - side)
+            b = self._boxes[key] = (x0, y0, x0 + side, y0 + side)
+        return b
+
+    def _buffer(self, shape: Tuple[int, ...], dtype) -> np.ndarray:
+        if not self._buffers or self._buffers[0].shape != shape or self._buffers[0].dtype != dtype:
+            self._buffers = [np.empty(shape, dtype=dtype) for _ in range(self._n_buffers)]
+            self._next = 0
+        buf = self._buffers[self._next]
+        self._next = (self._next + 1) % self._n_buffers
+        return buf
+
+    def __call__(self, frame: np.ndarray) -> np.ndarray:
+        h, w = frame.shape[:2]
+        x0, y0, x1, y1 = self.box(w, h)
+        crop = frame[y0:y1, x0:x1]
+        if self.output_size is None:
+            return crop
+        out_w, out_h = self.output_size
+        dst = self._buffer((out_h, out_w) + frame.shape[2:], frame.dtype)
+        cv2.resize(crop, (out_w, out_h), dst=dst, interpolation=self.interpolation)
+        return dst
@@ -0,0 +1,235 @@
+# scr/framecapture/service.py
+"""
+Serviço de captura de longa duração: mantém a câmera aberta (e a leitura em
+thread rodando) entre sessões consecutivas, para que cada "Iniciar Captura"
+não pague de novo a abertura do dispositivo e o ajuste de exposição/balanço
+de branco. Também guarda o contador de frames de cada pasta entre sessões.
+
+    service = CaptureService(idle_timeout=120)
+    pipeline = CapturePipeline(cfg, service=service)   # pega a câmera emprestada
+    ...
+    service.close()                                    # ao fechar o app
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+import logging
+import threading
+import time
+
+from .bufferpool import FramePool
+from .config import CaptureConfig
+from .preview import PreviewProcess
+from .video import FramePacket, FrameSource, ThreadedVideoSource, VideoSource
+
+log = logging.getLogger(__name__)
+
+
+def open_camera(cfg: CaptureConfig) -> VideoSource:
+    """Abre cfg.camera_index pedindo o formato configurado ao driver."""
+    return VideoSource(
+        cfg.camera_index,
+        fourcc=cfg.camera_fourcc,
+        width=cfg.camera_width,
+        height=cfg.camera_height,
+        fps=cfg.camera_fps,
+        buffer_size=cfg.camera_buffer_size,
+        passthrough=cfg.passthrough,
+    )
+
+
+def device_key(cfg: CaptureConfig) -> Tuple:
+    """Campos da configuração que exigem reabrir a câmera quando mudam."""
+    return (
+        cfg.camera_index, cfg.camera_fourcc, cfg.camera_width, cfg.camera_height,
+        cfg.camera_fps, cfg.camera_buffer_size, cfg.passthrough, cfg.capture_buffer_size,
+    )
+
+
+@dataclass
+class ServiceStats:
+    opens: int = 0           # aberturas do dispositivo
+    reuses: int = 0          # sessões que pegaram a câmera já aberta
+    idle_closes: int = 0     # fechamentos por inatividade
+    open_seconds: float = 0.0  # tempo total gasto abrindo a câmera
+
+
+class CameraLease(FrameSource):
+    """
+    Empréstimo da câmera do serviço para uma sessão. Lê da thread de leitura
+    compartilhada; release() devolve a câmera ao serviço em vez de fechá-la.
+    """
+    def __init__(self, service: "CaptureService", source: ThreadedVideoSource, warm: bool, open_seconds: float):
+        super().__init__(source.clock)
+        self.service = service
+        self.source = source
+        self.warm = warm                  # True = câmera já estava aberta
+        self.open_seconds = open_seconds  # 0.0 quando warm
+        self.negotiated = dict(getattr(source.source, "negotiated", {}))
+        self._released = False
+
+    def read_packet(self, timeout: float = 1.0) -> Optional[FramePacket]:
+        return self.source.read_packet(timeout)
+
+    def read(self):
+        return self.source.read()
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self.service._give_back(self)
+
+
+class CaptureService:
+    """
+    Dono da câmera entre sessões. lease(cfg) devolve a câmera aberta se o
+    dispositivo/formato pedido for o mesmo da sessão anterior; senão fecha a
+    atual e abre a nova. Sem sessão ativa por idle_timeout segundos a câmera é
+    liberada (<= 0 = libera ao fim de cada sessão; None = nunca).
+
+    preview() empresta também o processo de preview (a janela fecha no fim de
+    cada sessão, mas o interpretador filho com o cv2 carregado continua); ele é
+    encerrado junto com a câmera (ociosidade ou close()).
+
+    Enquanto aberta, a thread de leitura continua consumindo frames (o driver
+    não acumula frames velhos e a exposição segue ajustada), o que custa a
+    decodificação de cada frame também entre sessões.
+
+    opener(cfg) -> FrameSource abre o dispositivo (padrão: open_camera).
+    """
+    def __init__(
+        self,
+        idle_timeout: Optional[float] = 120.0,
+        opener: Callable[[CaptureConfig], FrameSource] = open_camera,
+    ):
+        self.idle_timeout = idle_timeout
+        self.opener = opener
+        self.stats = ServiceStats()
+        self.pool: Optional[FramePool] = None
+        self._source: Optional[ThreadedVideoSource] = None
+        self._key: Optional[Tuple] = None
+        self._lease: Optional[CameraLease] = None
+        self._timer: Optional[threading.Timer] = None
+        self._preview: Optional[PreviewProcess] = None
+        self._counters: Dict[Tuple[Path, str], int] = {}
+        self._lock = threading.Lock()
+
+    # ---------- câmera ----------
+    @property
+    def is_open(self) -> bool:
+        return self._source is not None
+
+    def frame_pool(self, size: int, max_size: Optional[int] = None) -> FramePool:
+        """Pool compartilhado pelas sessões (os buffers vivem tanto quanto a câmera)."""
+        with self._lock:
+            if self.pool is None:
+                self.pool = FramePool(size, max_size=max_size)
+            return self.pool
+
+    def lease(self, cfg: CaptureConfig, pool: Optional[FramePool] = None) -> CameraLease:
+        """
+        Empresta a câmera de cfg para uma sessão (abre/troca o dispositivo se
+        preciso). Levanta RuntimeError se a câmera não abrir ou já estiver emprestada.
+        """
+        with self._lock:
+            if self._lease is not None:
+                raise RuntimeError("Câmera já está em uso por outra sessão")
+            self._cancel_timer()
+            key = device_key(cfg)
+            if self._source is not None and (key != self._key or self._source.eof):
+                log.info("Trocando de câmera: fechando a anterior.")
+                self._close_source()
+            warm = self._source is not None
+            open_seconds = 0.0
+            if warm:
+                self.stats.reuses += 1
+                # frames lidos enquanto a câmera esperava não contam como pulados na sessão
+                self._source.reset_skipped()
+            else:
+                t0 = time.perf_counter()
+                inner = self.opener(cfg)
+                self._source = ThreadedVideoSource(inner, buffer_size=cfg.capture_buffer_size)
+                self._key = key
+                open_seconds = time.perf_counter() - t0
+                self.stats.opens += 1
+                self.stats.open_seconds += open_seconds
+                log.info("Câmera %s aberta em %.2fs.", cfg.camera_index, open_seconds)
+            self._source.source.pool = pool
+            self._lease = CameraLease(self, self._source, warm, open_seconds)
+            return self._lease
+
+    def preview(self, title: str, max_fps: float, max_width: int) -> PreviewProcess:
+        """Processo de preview da sessão; reaproveita o anterior se ainda estiver vivo e igual."""
+        with self._lock:
+            p = self._preview
+            if p is None or not p.alive or (p.title, p.max_fps, p.max_width) != (title, float(max_fps), int(max_width)):
+                if p is not None:
+                    p.close()
+                p = self._preview = PreviewProcess(title, max_fps, max_width)
+            p.begin_session()
+            return p
+
+    def _close_preview(self):
+        preview, self._preview = self._preview, None
+        if preview is not None:
+            preview.close()
+
+    def _give_back(self, lease: CameraLease):
+        with self._lock:
+            if lease is not self._lease:
+                return
+            self._lease = None
+            if self._source is None:
+                return
+            if self._source.eof:
+                log.warning("Câmera parou de entregar frames; será reaberta na próxima sessão.")
+                self._close_source()
+            elif self.idle_timeout is not None and self.idle_timeout <= 0:
+                self._close_source()
+            elif self.idle_timeout is not None:
+                self._timer = threading.Timer(self.idle_timeout, self._idle_close)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _idle_close(self):
+        with self._lock:
+            if self._lease is not None or self._source is None:
+                return
+            log.info("Câmera ociosa por %gs; liberando.", self.idle_timeout)
+            self.stats.idle_closes += 1
+            self._close_source()
+            self._close_preview()
+
+    def _cancel_timer(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+
+    def _close_source(self):
+        source, self._source, self._key = self._source, None, None
+        if source is not None:
+            source.release()
+
+    def release_camera(self):
+        """Fecha a câmera agora se não houver sessão usando (ex.: outra câmera foi escolhida)."""
+        with self._lock:
+            if self._lease is None:
+                self._cancel_timer()
+                self._close_source()
+
+    def close(self):
+        """Fecha a câmera mesmo com sessão ativa (fim do app)."""
+        with self._lock:
+            self._cancel_timer()
+            self._lease = None
+            self._close_source()
+            self._close_preview()
+
+    # ---------- contadores ----------
+    def counter(self, out_dir: Path, letter: str) -> int:
+        """Último número de frame usado em out_dir/letter por sessões anteriores."""
+        return self._counters.get((Path(out_dir), letter), 0)
+
+    def set_counter(self, out_dir: Path, letter: str, value: int):
+        self._counters[(Path(out_dir), letter)] = int(value)
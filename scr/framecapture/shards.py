@@ -0,0 +1,305 @@
+# scr/framecapture/shards.py
+"""
+Armazenamento em shards: em vez de um arquivo por frame, os frames já
+codificados (JPG/PNG) são anexados a arquivos grandes append-only.
+
+Layout de um shard (root/shard_000001.fcs + root/shard_000001.idx):
+  .fcs: MAGIC + registros [cabeçalho REC_HEADER | bytes da imagem]
+  .idx: entradas fixas INDEX_ENTRY (frame_id, letra, timestamp, offset, tamanho)
+
+A escrita é sempre: registro no .fcs -> entrada no .idx. Como o índice pode
+ser reconstruído a partir dos dados, um shard interrompido no meio de uma
+escrita é recuperado por recover_shard() (trunca o registro incompleto).
+Um diretório de shards deve ter um único escritor por vez.
+"""
+from __future__ import annotations
+import argparse
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, Optional
+import cv2
+import numpy as np
+
+from .storage import FrameStorage
+
+MAGIC = b"FCSHARD1"
+REC_MAGIC = b"FREC"
+REC_HEADER = struct.Struct("<4sQ1sdII")      # magic, frame_id, letra, timestamp, tamanho, crc32
+INDEX_ENTRY = struct.Struct("<Q1sdQI")       # frame_id, letra, timestamp, offset dos dados, tamanho
+INDEX_DTYPE = np.dtype([
+    ("frame_id", "<u8"),
+    ("letter", "S1"),
+    ("timestamp", "<f8"),
+    ("offset", "<u8"),
+    ("length", "<u4"),
+])
+assert INDEX_DTYPE.itemsize == INDEX_ENTRY.size
+
+DEFAULT_MAX_SHARD_BYTES = 256 * 1024 * 1024
+
+
+def _shard_paths(root: Path) -> List[Path]:
+    return sorted(root.glob("shard_*.fcs"))
+
+
+def _index_path(data_path: Path) -> Path:
+    return data_path.with_suffix(".idx")
+
+
+def recover_shard(data_path: Path) -> int:
+    """
+    Deixa o par .fcs/.idx consistente após uma queda: descarta entradas de
+    índice que apontam além do fim dos dados, reindexa registros completos
+    (crc válido) que ficaram sem entrada e trunca o resto.
+    Retorna o número de frames válidos no shard.
+    """
+    idx_path = _index_path(data_path)
+    with open(data_path, "r+b") as data:
+        size = os.fstat(data.fileno()).st_size
+        if size < len(MAGIC):
+            data.seek(0)
+            data.write(MAGIC)
+            data.truncate(len(MAGIC))
+            size = len(MAGIC)
+
+        entries: list[bytes] = []
+        pos = len(MAGIC)
+        if idx_path.exists():
+            raw = idx_path.read_bytes()
+            for i in range(len(raw) // INDEX_ENTRY.size):
+                chunk = raw[i * INDEX_ENTRY.size:(i + 1) * INDEX_ENTRY.size]
+                _, _, _, offset, length = INDEX_ENTRY.unpack(chunk)
+                if offset + length > size:
+                    break
+                entries.append(chunk)
+                pos = max(pos, offset + length)
+
+        # registros completos que não chegaram ao índice
+        while pos + REC_HEADER.size <= size:
+            data.seek(pos)
+            magic, frame_id, letter, ts, length, crc = REC_HEADER.unpack(data.read(REC_HEADER.size))
+            payload_at = pos + REC_HEADER.size
+            if magic != REC_MAGIC or payload_at + length > size:
+                break
+            if zlib.crc32(data.read(length)) != crc:
+                break
+            entries.append(INDEX_ENTRY.pack(frame_id, letter, ts, payload_at, length))
+            pos = payload_at + length
+
+        data.truncate(pos)
+    with open(idx_path, "wb") as idx:
+        idx.write(b"".join(entries))
+    return len(entries)
+
+
+class ShardWriter:
+    """Anexa frames codificados aos shards de root, abrindo um novo a cada max_bytes."""
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_MAX_SHARD_BYTES):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+        self._data = None
+        self._idx = None
+        self._shard_no = 0
+        self._next_id = 1
+
+        shards = _shard_paths(self.root)
+        if shards:
+            recover_shard(shards[-1])
+            for path in shards:
+                if _index_path(path).exists():
+                    ids = np.fromfile(_index_path(path), dtype=INDEX_DTYPE)["frame_id"]
+                    if len(ids):
+                        self._next_id = max(self._next_id, int(ids.max()) + 1)
+            self._shard_no = int(shards[-1].stem.split("_")[1])
+            self._open(shards[-1])
+        else:
+            self._roll()
+
+    @property
+    def current_path(self) -> Path:
+        return self.root / f"shard_{self._shard_no:06d}.fcs"
+
+    def _open(self, path: Path):
+        self._data = open(path, "ab")
+        self._idx = open(_index_path(path), "ab")
+        if self._data.tell() == 0:
+            self._data.write(MAGIC)
+
+    def _roll(self):
+        self._close_files()
+        self._shard_no += 1
+        self._open(self.current_path)
+
+    def _close_files(self):
+        for f in (self._data, self._idx):
+            if f is not None:
+                f.flush()
+                os.fsync(f.fileno())
+                f.close()
+        self._data = self._idx = None
+
+    def reserve_id(self) -> int:
+        """Reserva o próximo frame_id (permite numerar antes de codificar)."""
+        with self._lock:
+            frame_id = self._next_id
+            self._next_id += 1
+            return frame_id
+
+    def append(self, data: bytes, letter: str, timestamp: Optional[float] = None, frame_id: Optional[int] = None) -> int:
+        if frame_id is None:
+            frame_id = self.reserve_id()
+        ts = time.time() if timestamp is None else float(timestamp)
+        letter_b = (letter or "?")[:1].encode("ascii", "replace")
+        header = REC_HEADER.pack(REC_MAGIC, frame_id, letter_b, ts, len(data), zlib.crc32(data))
+        with self._lock:
+            if self._data.tell() + len(header) + len(data) > self.max_bytes and self._data.tell() > len(MAGIC):
+                self._roll()
+            offset = self._data.tell() + len(header)
+            self._data.write(header)
+            self._data.write(data)
+            self._data.flush()
+            # índice só depois dos dados: um .idx nunca aponta para bytes inexistentes
+            self._idx.write(INDEX_ENTRY.pack(frame_id, letter_b, ts, offset, len(data)))
+            self._idx.flush()
+        return frame_id
+
+    def close(self):
+        with self._lock:
+            self._close_files()
+
+
+class ShardReader:
+    """Acesso aleatório (mmap) aos frames de um shard."""
+
+    def __init__(self, data_path: Path):
+        self.path = Path(data_path)
+        self.index = np.fromfile(_index_path(self.path), dtype=INDEX_DTYPE)
+        self._file = open(self.path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"Arquivo não é um shard: {self.path}")
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __getitem__(self, i: int) -> memoryview:
+        """Bytes codificados do i-ésimo frame (view sem cópia; libere antes de close())."""
+        e = self.index[i]
+        start = int(e["offset"])
+        return memoryview(self._mm)[start:start + int(e["length"])]
+
+    def decode(self, i: int, flags: int = cv2.IMREAD_COLOR):
+        return cv2.imdecode(np.frombuffer(self[i], dtype=np.uint8), flags)
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+@dataclass
+class ShardRef:
+    """Destino de um frame salvo em shard (o equivalente ao Path de FrameStorage)."""
+    root: Path
+    frame_id: int
+    letter: str
+    timestamp: float
+
+    def __str__(self) -> str:
+        return f"{self.root}#{self.letter}/{self.frame_id}"
+
+
+class ShardStorage(FrameStorage):
+    """
+    Mesma interface de FrameStorage (inclusive write-behind), mas grava os frames
+    codificados em shards sob root em vez de um arquivo por frame.
+    """
+    def __init__(self, root: Path, letter: str, image_ext: str = "jpg", max_shard_bytes: int = DEFAULT_MAX_SHARD_BYTES, **kwargs):
+        super().__init__(Path(root), image_ext, **kwargs)
+        self.letter = letter
+        self.writer = ShardWriter(self.base_dir, max_shard_bytes)
+
+    def _next_target(self, name: str | None = None) -> ShardRef:
+        self.counter += 1
+        return ShardRef(self.base_dir, self.writer.reserve_id(), self.letter, time.time())
+
+    def _write_encoded(self, target: ShardRef, buf):
+        self.writer.append(buf.tobytes(), target.letter, target.timestamp, target.frame_id)
+        return buf
+
+    def close(self):
+        super().close()
+        self.writer.close()
+
+
+def iter_shards(root: Path) -> Iterator[ShardReader]:
+    for path in _shard_paths(Path(root)):
+        yield ShardReader(path)
+
+
+def convert_folder_layout(src_root: Path, dst_root: Path, max_shard_bytes: int = DEFAULT_MAX_SHARD_BYTES) -> int:
+    """
+    Copia as pastas A..Z de src_root para shards em dst_root sem recodificar
+    (os bytes do arquivo vão direto para o shard). Retorna quantos frames foram copiados.
+    """
+    src_root = Path(src_root)
+    writer = ShardWriter(Path(dst_root), max_shard_bytes)
+    total = 0
+    try:
+        for letter_dir in sorted(p for p in src_root.iterdir() if p.is_dir() and len(p.name) == 1 and p.name.isalpha()):
+            with os.scandir(letter_dir) as it:
+                entries = sorted((e for e in it if e.is_file() and e.name.lower().endswith((".jpg", ".jpeg", ".png"))), key=lambda e: e.name)
+            for e in entries:
+                with open(e.path, "rb") as f:
+                    writer.append(f.read(), letter_dir.name.upper(), e.stat().st_mtime)
+                total += 1
+    finally:
+        writer.close()
+    return total
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m framecapture.shards", description="Ferramentas de shards de frames.")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    conv = sub.add_parser("convert", help="converte pastas A..Z em shards")
+    conv.add_argument("src", type=Path)
+    conv.add_argument("dst", type=Path)
+    conv.add_argument("--max-shard-mb", type=int, default=DEFAULT_MAX_SHARD_BYTES // (1024 * 1024))
+    info = sub.add_parser("info", help="resumo dos shards de um diretório")
+    info.add_argument("root", type=Path)
+    rec = sub.add_parser("recover", help="repara o último shard após uma queda")
+    rec.add_argument("root", type=Path)
+    args = ap.parse_args(argv)
+
+    if args.cmd == "convert":
+        n = convert_folder_layout(args.src, args.dst, args.max_shard_mb * 1024 * 1024)
+        print(f"[INFO] {n} frames convertidos para {args.dst}")
+    elif args.cmd == "info":
+        for reader in iter_shards(args.root):
+            with reader:
+                letters, counts = np.unique(reader.index["letter"], return_counts=True)
+                per_letter = " ".join(f"{l.decode()}={c}" for l, c in zip(letters, counts))
+                print(f"{reader.path.name}: {len(reader)} frames | {per_letter}")
+    elif args.cmd == "recover":
+        shards = _shard_paths(args.root)
+        if shards:
+            print(f"[INFO] {shards[-1].name}: {recover_shard(shards[-1])} frames válidos")
+
+
+if __name__ == "__main__":
+    main()
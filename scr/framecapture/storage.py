@@ -1,21 +1,265 @@
+from dataclasses import dataclass, asdict
 from datetime import datetime
 from pathlib import Path
+import hashlib
+import logging
+import queue
+import threading
+import time
 import cv2
 
+from .bufferpool import FramePool
+from .manifest import FrameManifest, ManifestRecord
+from .metrics import SessionMetrics
+
+log = logging.getLogger(__name__)
+
+# políticas quando a fila do write-behind está cheia
+BACKPRESSURE_POLICIES = ("block", "drop-oldest", "drop-newest")
+
+_STOP = object()  # sentinela para encerrar os workers
+
+# marcadores SOFn do JPEG (exceto DHT/JPG/DAC, que compartilham a faixa)
+_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def jpeg_dims(data) -> tuple[int, int, int]:
+    """(largura, altura, canais) lidos do cabeçalho SOF, sem decodificar; zeros se não achar."""
+    b = memoryview(data).cast("B") if not isinstance(data, bytes) else data
+    i, n = 2, len(b)
+    while i + 9 < n:
+        if b[i] != 0xFF:
+            i += 1
+            continue
+        marker = b[i + 1]
+        if marker == 0xFF or 0xD0 <= marker <= 0xD9 or marker == 0x01:
+            i += 2 if marker != 0xFF else 1
+            continue
+        if marker in _SOF_MARKERS:
+            return (b[i + 7] << 8) | b[i + 8], (b[i + 5] << 8) | b[i + 6], b[i + 9]
+        i += 2 + ((b[i + 2] << 8) | b[i + 3])
+    return 0, 0, 0
+
+
+@dataclass
+class StorageStats:
+    """Contadores da sessão (servem para dimensionar fila/workers)."""
+    queued: int = 0    # frames aceitos na fila (modo write-behind)
+    written: int = 0   # frames gravados com sucesso
+    dropped: int = 0   # frames descartados por backpressure
+    failed: int = 0    # falhas de encode/escrita
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
 class FrameStorage:
-    def __init__(self, base_dir: Path, image_ext: str = "jpg", filename_prefix: str = "frame"):
+    """
+    Grava cada frame como um arquivo em base_dir.
+    Com workers > 0 opera em modo write-behind: save() só enfileira o frame e
+    N threads fazem o encode + escrita. close() espera a fila esvaziar.
+    Com metrics, o tempo de cada escrita vai para o estágio "write" e os
+    contadores são espelhados como frames_queued/written/dropped/failed.
+    Com manifest, cada frame gravado vira uma linha de base_dir/manifest.sqlite
+    (sessão, timestamp e seq da captura, dimensões, bytes, sha1; ver manifest.py).
+    Com pool, frames emprestados de um FramePool ficam retidos enquanto esperam
+    na fila e voltam ao pool depois de gravados (ou descartados).
+    """
+    def __init__(
+        self,
+        base_dir: Path,
+        image_ext: str = "jpg",
+        filename_prefix: str = "frame",
+        workers: int = 0,
+        queue_size: int = 32,
+        backpressure: str = "block",
+        metrics: SessionMetrics | None = None,
+        manifest: bool = False,
+        session_id: str = "",
+        pool: FramePool | None = None,
+    ):
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"Política de backpressure inválida: {backpressure!r} (use {', '.join(BACKPRESSURE_POLICIES)})")
         self.base_dir = base_dir
         self.image_ext = image_ext.strip(".").lower()
         self.prefix = filename_prefix or "frame"
         self.base_dir.mkdir(parents=True, exist_ok=True)
         self.counter = 0
+        self.backpressure = backpressure
+        self.stats = StorageStats()
+        self.metrics = metrics
+        self.session_id = session_id
+        self.pool = pool
+        self.manifest = FrameManifest(self.base_dir) if manifest else None
 
-    def save(self, frame) -> Path:
-        self.counter += 1
+        self._lock = threading.Lock()
+        self._queue: queue.Queue | None = None
+        self._workers: list[threading.Thread] = []
+        self._closed = False
+        if workers > 0:
+            self._queue = queue.Queue(maxsize=max(1, int(queue_size)))
+            for i in range(int(workers)):
+                t = threading.Thread(target=self._worker, name=f"FrameStorage-{i}", daemon=True)
+                t.start()
+                self._workers.append(t)
+
+    @property
+    def asynchronous(self) -> bool:
+        return self._queue is not None
+
+    def make_name(self, counter: int) -> str:
+        """Nome padrão (sem extensão): {prefixo}_{timestamp}_{contador}."""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
-        filename = f"{self.prefix}_{timestamp}_{self.counter:06d}.{self.image_ext}"
-        path = self.base_dir / filename
-        ok = cv2.imwrite(str(path), frame)
+        return f"{self.prefix}_{timestamp}_{counter:06d}"
+
+    def _next_target(self, name: str | None = None) -> Path:
+        self.counter += 1
+        return self.base_dir / f"{name or self.make_name(self.counter)}.{self.image_ext}"
+
+    def _encode(self, target, frame):
+        ok, buf = cv2.imencode(f".{self.image_ext}", frame)
         if not ok:
-            raise RuntimeError(f"Falha ao salvar imagem: {path}")
-        return path
+            raise RuntimeError(f"Falha ao codificar imagem: {target}")
+        return buf
+
+    def _write_encoded(self, path: Path, buf):
+        """Grava bytes já codificados (uint8) e os devolve (para o manifesto)."""
+        with open(path, "wb") as f:
+            f.write(buf.data)
+        return buf
+
+    def _write(self, path: Path, frame):
+        return self._write_encoded(path, self._encode(path, frame))
+
+    def _timed_write(self, target, payload, meta):
+        encoded = meta[3]
+        t0 = time.perf_counter()
+        buf = self._write_encoded(target, payload) if encoded else self._write(target, payload)
+        if self.metrics is not None:
+            self.metrics.observe("write", time.perf_counter() - t0)
+        if self.manifest is not None and buf is not None:
+            if encoded:
+                w, h, c = jpeg_dims(buf)
+            else:
+                h, w = payload.shape[:2]
+                c = payload.shape[2] if payload.ndim == 3 else 1
+            self.manifest.add(ManifestRecord(
+                self.session_id, Path(str(target)).name, meta[0], meta[1], meta[2],
+                w, h, c, int(buf.size), hashlib.sha1(buf.data).hexdigest(),
+            ))
+
+    def _bump(self, field: str):
+        with self._lock:
+            setattr(self.stats, field, getattr(self.stats, field) + 1)
+        if self.metrics is not None:
+            self.metrics.incr(f"frames_{field}")
+
+    def save(self, frame, name: str | None = None, timestamp: float | None = None, seq: int | None = None) -> Path | None:
+        """
+        Salva (ou enfileira) o frame e devolve o caminho de destino.
+        name substitui o nome padrão do arquivo (sem extensão).
+        timestamp/seq: instante (monotônico) e número de sequência da captura,
+        registrados no manifesto; padrão = agora / contador da sessão.
+        Com write-behind e política drop-oldest/drop-newest devolve sempre None:
+        o frame ainda pode ser descartado da fila, então só stats.written e o
+        manifesto (preenchidos depois da escrita) dizem o que foi gravado.
+        """
+        return self._submit(frame, name, timestamp, seq, encoded=False)
+
+    def save_encoded(self, data, name: str | None = None, timestamp: float | None = None, seq: int | None = None) -> Path | None:
+        """
+        Como save(), mas recebe o frame já codificado (bytes JPEG em um array
+        uint8, ex.: FramePacket.encoded) e grava sem decodificar/recodificar.
+        O formato dos bytes precisa corresponder a image_ext.
+        """
+        return self._submit(data, name, timestamp, seq, encoded=True)
+
+    def _submit(self, payload, name, timestamp, seq, encoded: bool) -> Path | None:
+        if self._closed:
+            raise RuntimeError("FrameStorage já foi fechado")
+        target = self._next_target(name)
+        meta = (
+            time.monotonic() if timestamp is None else timestamp,
+            time.time(),
+            self.counter if seq is None else seq,
+            encoded,
+        )
+        if self._queue is None:
+            self._timed_write(target, payload, meta)
+            self._bump("written")
+            return target
+        if self.pool is not None:
+            self.pool.retain(payload)
+        job = (target, payload, meta)
+        if not self._enqueue(job):
+            self._release(job)
+            return None
+        # block: a fila nunca descarta, o caminho é definitivo; drop-*: só o worker confirma
+        return target if self.backpressure == "block" else None
+
+    def _release(self, job):
+        if self.pool is not None and job is not _STOP:
+            self.pool.release(job[1])
+
+    def _enqueue(self, job) -> bool:
+        if self.backpressure == "block":
+            self._queue.put(job)
+        elif self.backpressure == "drop-newest":
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                self._bump("dropped")
+                return False
+        else:  # drop-oldest
+            while True:
+                try:
+                    self._queue.put_nowait(job)
+                    break
+                except queue.Full:
+                    try:
+                        self._release(self._queue.get_nowait())
+                    except queue.Empty:
+                        continue
+                    self._queue.task_done()
+                    self._bump("dropped")
+        self._bump("queued")
+        return True
+
+    def _worker(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is _STOP:
+                    return
+                target, frame, meta = job
+                try:
+                    self._timed_write(target, frame, meta)
+                except Exception as e:
+                    self._bump("failed")
+                    log.error("%s", e)
+                else:
+                    self._bump("written")
+                finally:
+                    self._release(job)
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Bloqueia até todos os frames enfileirados serem gravados."""
+        if self._queue is not None:
+            self._queue.join()
+
+    def close(self):
+        """Esvazia a fila e encerra os workers. Pode ser chamado mais de uma vez."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._queue is not None:
+            self.flush()
+            for _ in self._workers:
+                self._queue.put(_STOP)
+            for t in self._workers:
+                t.join()
+            self._workers.clear()
+        if self.manifest is not None:
+            self.manifest.close()
@@ -1,36 +1,120 @@
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional, Tuple
+import logging
+import os
+import string
+import threading
 import tkinter as tk
 from tkinter import ttk, messagebox
 
 # Pillow para abrir JPG/PNG/etc.
 from PIL import Image, ImageTk
 
+log = logging.getLogger(__name__)
+
+EXTENSIONS = ("jpg", "jpeg", "png", "gif")  # ordem de preferência se houver mais de um
+
 
 class TutorialViewer:
     """
     Mostra uma imagem de tutorial baseada na letra escolhida (A..Z).
     Procura arquivos {LETRA}.jpg|jpeg|png|gif em assets/tutorials (por padrão).
+
+    As imagens já reduzidas ficam num cache LRU (chave: letra, mtime do arquivo
+    e tamanho alvo), preenchido em segundo plano por prefetch(). Só o
+    PhotoImage é criado na thread do Tk, a partir dos pixels do cache.
     """
-    def __init__(self, master: tk.Tk, base_dir: Optional[Path] = None, max_size=(900, 700)):
+    def __init__(self, master: tk.Tk, base_dir: Optional[Path] = None, max_size=(900, 700), cache_size: int = 26):
         self.master = master
         self.base_dir = base_dir or Path(__file__).resolve().parent / "assets" / "tutorials"
         self.base_dir.mkdir(parents=True, exist_ok=True)  # garante a pasta
-        self.max_size = max_size
+        self.max_size = tuple(max_size)
+        self.cache_size = max(1, int(cache_size))
 
         self._win: Optional[tk.Toplevel] = None
         self._img_tk: Optional[ImageTk.PhotoImage] = None
         self._current_letter: Optional[str] = None
 
+        self._paths: Optional[Dict[str, Path]] = None
+        self._cache: "OrderedDict[Tuple[str, int, Tuple[int, int]], Image.Image]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._prefetch_thread: Optional[threading.Thread] = None
+
+    def _scan(self) -> Dict[str, Path]:
+        """Uma única listagem da pasta -> {letra: arquivo}."""
+        rank = {ext: i for i, ext in enumerate(EXTENSIONS)}
+        found: Dict[str, Tuple[int, Path]] = {}
+        try:
+            entries = list(os.scandir(self.base_dir))
+        except OSError:
+            entries = []
+        for entry in entries:
+            stem, _, ext = entry.name.rpartition(".")
+            ext = ext.lower()
+            if len(stem) != 1 or ext not in rank or not entry.is_file():
+                continue
+            letter = stem.upper()
+            if letter not in found or rank[ext] < found[letter][0]:
+                found[letter] = (rank[ext], Path(entry.path))
+        paths = {letter: p for letter, (_, p) in found.items()}
+        with self._lock:
+            self._paths = paths
+        return paths
+
     def _find_image_path(self, letter: str) -> Optional[Path]:
         letter = (letter or "").strip().upper()
-        for ext in ("jpg", "jpeg", "png", "gif"):
-            candidate = self.base_dir / f"{letter}.{ext}"
-            if candidate.exists():
-                return candidate
-        return None
+        paths = self._paths if self._paths is not None else self._scan()
+        path = paths.get(letter)
+        if path is None or not path.exists():
+            # arquivo novo/removido desde a última listagem
+            path = self._scan().get(letter)
+        return path
+
+    def _load(self, letter: str, path: Path) -> Image.Image:
+        """Imagem reduzida para max_size, do cache ou decodificada agora."""
+        key = (letter, path.stat().st_mtime_ns, self.max_size)
+        with self._lock:
+            im = self._cache.get(key)
+            if im is not None:
+                self._cache.move_to_end(key)
+                return im
+
+        with Image.open(path) as src:
+            src.draft("RGB", self.max_size)  # JPEG: decodifica já reduzido quando possível
+            im = src.convert("RGBA" if "A" in src.getbands() or "transparency" in src.info else "RGB")
+        im.thumbnail(self.max_size, Image.LANCZOS)
+
+        with self._lock:
+            for old in [k for k in self._cache if k[0] == letter and k != key]:
+                del self._cache[old]  # versão antiga do arquivo
+            self._cache[key] = im
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return im
+
+    def prefetch(self, letters: str = string.ascii_uppercase):
+        """Carrega os tutoriais em segundo plano (não bloqueia o Tk)."""
+        if self._prefetch_thread is not None and self._prefetch_thread.is_alive():
+            return
+
+        def run():
+            paths = self._scan()
+            for letter in letters:
+                path = paths.get(letter)
+                if path is None:
+                    continue
+                try:
+                    self._load(letter, path)
+                except Exception as e:  # imagem corrompida etc.: show() reporta depois
+                    log.debug("Prefetch do tutorial %s falhou: %s", letter, e)
+
+        self._prefetch_thread = threading.Thread(target=run, name="tutorial-prefetch", daemon=True)
+        self._prefetch_thread.start()
 
     def show(self, letter: str):
+        letter = (letter or "").strip().upper()
         path = self._find_image_path(letter)
         if path is None:
             messagebox.showerror(
@@ -40,6 +124,12 @@ class TutorialViewer:
             )
             return
 
+        try:
+            im = self._load(letter, path)
+        except Exception as e:
+            messagebox.showerror("Tutorial inválido", f"Não consegui abrir {path}:\n{e}")
+            return
+
         # Se já existe uma janela aberta, fecha para recarregar
         if self._win is not None and tk.Toplevel.winfo_exists(self._win):
             self._win.destroy()
@@ -50,9 +140,6 @@ class TutorialViewer:
         self._win.attributes("-topmost", True)
         self._win.resizable(True, True)
 
-        # Carrega e ajusta para caber na janela (mantendo proporção)
-        im = Image.open(path)
-        im.thumbnail(self.max_size, Image.LANCZOS)
         self._img_tk = ImageTk.PhotoImage(im)
 
         lbl = ttk.Label(self._win, image=self._img_tk)
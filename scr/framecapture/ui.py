@@ -1,35 +1,74 @@
 # scr/framecapture/ui.py
 from pathlib import Path
 from typing import Optional
+import queue
+import threading
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
 
 from .config import CaptureConfig
 from .pipeline import CapturePipeline
+from .service import CaptureService
 from .video import enumerate_cameras
 from .tutorial import TutorialViewer  # requer Pillow>=10
 
 SAVE_FPS = 5.0                 # salva ~5 frames por segundo (tempo-baseado)
 MAX_RECORD_SECONDS = 5.0       # cada sessão dura no máximo 5s
 PRE_COUNTDOWN_SECONDS = 5.0    # contagem antes da gravação (na mesma janela)
+STORAGE_WORKERS = 2            # threads de gravação (write-behind) fora do loop de captura
+PRESENCE_TIMEOUT_SECONDS = 30.0  # modo gatilho: espera máxima pela mão
+CAMERA_IDLE_TIMEOUT_SECONDS = 120.0  # câmera fica aberta entre sessões até ficar ociosa por este tempo
+
+STATE_TEXT = {
+    "opening": "Abrindo câmera...",
+    "stopping": "Encerrando sessão...",
+    "waiting": "Aguardando posicionamento...",
+    "recording": "Gravando em",
+}
+SESSION_END_TEXT = {
+    "duration": "tempo máximo atingido",
+    "esc": "ESC",
+    "closed": "janela do preview fechada",
+    "stopped": "interrompido",
+    "read_failure": "falha de leitura da câmera",
+    "cancelled": "pré-gravação cancelada",
+    "camera_error": "câmera indisponível",
+    "error": "erro na captura (veja o log)",
+}
 
 
 class CaptureApp(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("PyFrameCollector — Capture GUI")
-        self.geometry("680x390")
+        self.geometry("680x450")
         self.resizable(False, False)
 
         self.parent_dir: Optional[Path] = None
-        self.cameras = enumerate_cameras(max_devices=10)
+        self.cameras: list[dict] = []
         self.pipeline: Optional[CapturePipeline] = None
+        # mantém a câmera aberta e o contador de cada pasta entre sessões
+        self.service = CaptureService(idle_timeout=CAMERA_IDLE_TIMEOUT_SECONDS)
         self.tutorial = TutorialViewer(self)
 
-        # handler para cancelar o timer do auto-stop
-        self._auto_stop_after_id: Optional[str] = None
+        self._metrics_after_id: Optional[str] = None
+        self._capture_target = ""
+        self._stopping = False
+        self._closing = False
 
         self._build_ui()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        # enumera as câmeras em segundo plano; a janela abre imediatamente
+        self._camera_results: queue.Queue = queue.Queue()
+        threading.Thread(
+            target=lambda: self._camera_results.put(enumerate_cameras(max_devices=10)),
+            name="CameraEnumeration",
+            daemon=True,
+        ).start()
+        self.after(100, self._poll_cameras)
+        # decodifica/reduz os tutoriais antes do primeiro clique
+        self.tutorial.prefetch()
 
     # ---------- UI ----------
     def _build_ui(self):
@@ -62,21 +101,26 @@ class CaptureApp(tk.Tk):
         frm_cap.pack(fill="x", **pad)
 
         ttk.Label(frm_cap, text="Câmera:").grid(row=0, column=0, sticky="w", padx=8, pady=6)
-        cam_options = []
-        for d in self.cameras:
-            name = d.get("name") or f"Camera #{d['index']}"
-            res = f"{d['width']}x{d['height']}"
-            cam_options.append(f"[{d['index']}] {name} — {res}")
-        if not cam_options:
-            cam_options = ["(Nenhuma câmera encontrada)"]
-
-        self.cmb_camera = ttk.Combobox(frm_cap, values=cam_options, width=48, state="readonly")
+        self.cmb_camera = ttk.Combobox(frm_cap, values=["(Procurando câmeras...)"], width=48, state="readonly")
         self.cmb_camera.current(0)
         self.cmb_camera.grid(row=0, column=1, padx=8, pady=6, sticky="w")
+        self.cmb_camera.bind("<<ComboboxSelected>>", self._on_camera_selected)
 
         self.var_preview = tk.BooleanVar(value=True)
         ttk.Checkbutton(frm_cap, text="Mostrar preview", variable=self.var_preview).grid(row=0, column=2, padx=8, pady=6)
 
+        # gatilho: grava assim que a mão aparece no círculo (em vez da contagem fixa)
+        self.var_trigger = tk.BooleanVar(value=False)
+        ttk.Checkbutton(frm_cap, text="Iniciar ao detectar a mão", variable=self.var_trigger).grid(
+            row=1, column=2, padx=8, pady=6
+        )
+
+        # manifesto opcional: cria <letra>/manifest.sqlite ao lado das imagens
+        self.var_manifest = tk.BooleanVar(value=False)
+        ttk.Checkbutton(frm_cap, text="Registrar manifesto (SQLite)", variable=self.var_manifest).grid(
+            row=2, column=2, padx=8, pady=6
+        )
+
         ttk.Label(frm_cap, text=f"Pré-contagem: {int(PRE_COUNTDOWN_SECONDS)}s • Gravação: {int(MAX_RECORD_SECONDS)}s • ~{SAVE_FPS:.0f} FPS").grid(
             row=0, column=3, sticky="w", padx=8, pady=6
         )
@@ -88,19 +132,47 @@ class CaptureApp(tk.Tk):
         # Botão de tutorial (seletor A..Z independente da pasta)
         ttk.Button(frm_ctrl, text="Abrir Tutorial", command=self._open_tutorial_picker).pack(side="left", padx=6)
 
-        self.btn_start = ttk.Button(frm_ctrl, text="Iniciar Captura", command=self._start_capture)
+        # Start só é habilitado quando a enumeração de câmeras terminar
+        self.btn_start = ttk.Button(frm_ctrl, text="Iniciar Captura", command=self._start_capture, state="disabled")
         self.btn_start.pack(side="left", padx=6)
 
         self.btn_stop = ttk.Button(frm_ctrl, text="Parar", command=self._stop_capture, state="disabled")
         self.btn_stop.pack(side="left", padx=6)
 
-        self.lbl_status = ttk.Label(frm_ctrl, text="Pronto.")
+        self.lbl_status = ttk.Label(frm_ctrl, text="Procurando câmeras...")
         self.lbl_status.pack(side="left", padx=12)
 
+        # Barra de status: resumo ao vivo das métricas da sessão
+        self.lbl_metrics = ttk.Label(self, text="", anchor="w", relief="sunken")
+        self.lbl_metrics.pack(side="bottom", fill="x")
+
+    def _poll_cameras(self):
+        try:
+            cameras = self._camera_results.get_nowait()
+        except queue.Empty:
+            self.after(100, self._poll_cameras)
+            return
+        self._set_cameras(cameras)
+
+    def _set_cameras(self, cameras: list[dict]):
+        self.cameras = cameras
+        cam_options = []
+        for d in self.cameras:
+            name = d.get("name") or f"Camera #{d['index']}"
+            res = f"{d['width']}x{d['height']}"
+            cam_options.append(f"[{d['index']}] {name} — {res}")
+        if not cam_options:
+            cam_options = ["(Nenhuma câmera encontrada)"]
+        self.cmb_camera.config(values=cam_options)
+        self.cmb_camera.current(0)
+
         # Desabilita Start se não houver câmera
-        if not self.cameras or "(Nenhuma câmera encontrada)" in self.cmb_camera["values"]:
+        if not self.cameras:
             self.btn_start.config(state="disabled")
             self.lbl_status.config(text="Nenhuma câmera detectada.")
+        else:
+            self.btn_start.config(state="normal")
+            self.lbl_status.config(text="Pronto.")
 
     # ---------- Ações ----------
     def _choose_dir(self):
@@ -131,7 +203,23 @@ class CaptureApp(tk.Tk):
         # ESC fecha o seletor
         win.bind("<Escape>", lambda e: win.destroy())
 
+    def _on_camera_selected(self, _event=None):
+        # outra câmera escolhida: solta a atual já (a nova abre no próximo Iniciar)
+        if self.pipeline is None:
+            self.service.release_camera()
+
+    def _on_close(self):
+        # a sessão ainda pode estar lendo da câmera: fecha o serviço só depois do finished
+        self._closing = True
+        if self.pipeline is not None and not self.pipeline.finished.is_set():
+            self._stop_capture()
+            return  # _session_finished termina o fechamento
+        self.service.close()
+        self.destroy()
+
     def _start_capture(self):
+        if self.pipeline is not None:
+            return  # sessão anterior ainda encerrando
         if not self.parent_dir:
             messagebox.showerror("Erro", "Escolha o diretório de destino.")
             return
@@ -153,40 +241,59 @@ class CaptureApp(tk.Tk):
             save_fps=SAVE_FPS,                  # 5 FPS
             camera_index=cam_index,
             preview=self.var_preview.get(),
-            max_duration_seconds=MAX_RECORD_SECONDS
+            max_duration_seconds=MAX_RECORD_SECONDS,
+            pre_countdown_seconds=PRESENCE_TIMEOUT_SECONDS if self.var_trigger.get() else PRE_COUNTDOWN_SECONDS,
+            trigger_mode="presence" if self.var_trigger.get() else "countdown",
+            storage_workers=STORAGE_WORKERS,
+            threaded_capture=True,
+            frame_pool_size=-1,                 # reutiliza buffers (sem alocação por frame)
+            write_manifest=self.var_manifest.get(),
         )
-        self.pipeline = CapturePipeline(cfg)
+        self.pipeline = CapturePipeline(cfg, service=self.service)
         self.pipeline.start()
 
         # UI: travar/ativar botões e mensagem
         self.btn_start.config(state="disabled")
         self.btn_stop.config(state="normal")
-        self.lbl_status.config(
-            text=f"Pré-contagem ({int(PRE_COUNTDOWN_SECONDS)}s) + gravando em {self.parent_dir / subfolder_letter} (~{SAVE_FPS:.0f} FPS, {int(MAX_RECORD_SECONDS)}s)..."
-        )
-
-        # Agenda parada automática (UI) para depois da pré-contagem + gravação
-        total_ms = int((PRE_COUNTDOWN_SECONDS + MAX_RECORD_SECONDS) * 1000)
-        self._auto_stop_after_id = self.after(total_ms, self._auto_stop_if_running)
+        self._capture_target = f"{self.parent_dir / subfolder_letter} (~{SAVE_FPS:.0f} FPS, {int(MAX_RECORD_SECONDS)}s)"
+        self._refresh_metrics()
 
-    def _auto_stop_if_running(self):
-        self._auto_stop_after_id = None
-        if self.pipeline:
-            self._stop_capture()
+    def _refresh_metrics(self):
+        """Atualiza status/métricas e encerra a UI da sessão quando o pipeline avisa que terminou."""
+        self._metrics_after_id = None
+        if self.pipeline is None:
+            return
+        if self.pipeline.finished.is_set():
+            self._session_finished()
+            return
+        state = "stopping" if self._stopping else self.pipeline.state
+        text = STATE_TEXT.get(state, state)
+        self.lbl_status.config(text=f"{text} {self._capture_target}" if state == "recording" else text)
+        self.lbl_metrics.config(text=self.pipeline.metrics.summary())
+        self._metrics_after_id = self.after(200, self._refresh_metrics)
 
     def _stop_capture(self):
-        # Cancela timer pendente (se houver)
-        if self._auto_stop_after_id is not None:
-            try:
-                self.after_cancel(self._auto_stop_after_id)
-            except Exception:
-                pass
-            self._auto_stop_after_id = None
-
-        if self.pipeline:
-            self.pipeline.stop()
-            self.pipeline = None
-
+        """Pede o fim da sessão; Iniciar só volta quando o pipeline sinalizar finished."""
+        if self.pipeline is None:
+            return
+        self._stopping = True
+        self.pipeline.stop(wait=False)
+        self.btn_stop.config(state="disabled")
+        self.lbl_status.config(text=STATE_TEXT["stopping"])
+        if self._metrics_after_id is None:
+            self._refresh_metrics()
+
+    def _session_finished(self):
+        """Sessão encerrada de fato (câmera devolvida, frames gravados): libera Iniciar."""
+        if self._metrics_after_id is not None:
+            self.after_cancel(self._metrics_after_id)
+            self._metrics_after_id = None
+        reason = SESSION_END_TEXT.get(self.pipeline.end_reason, self.pipeline.end_reason)
+        self.lbl_metrics.config(text=self.pipeline.metrics.summary())
+        self.pipeline = None
+        self._stopping = False
         self.btn_start.config(state="normal")
         self.btn_stop.config(state="disabled")
-        self.lbl_status.config(text="Parado.")
+        self.lbl_status.config(text=f"Parado ({reason}).")
+        if self._closing:
+            self._on_close()
@@ -1,64 +1,621 @@
+from abc import ABC, abstractmethod
+import hashlib
+import json
+import logging
+import os
 import sys
-from typing import List, Dict, Optional
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from typing import Callable, List, Dict, Optional, Tuple
 import cv2
+import numpy as np
 
-# Tenta pegar nomes amigáveis no Windows via DirectShow
-try:
-    from pygrabber.dshow_graph import FilterGraph  # opcional: pip install pygrabber
-    _HAS_PYGRABBER = True
-except Exception:
-    _HAS_PYGRABBER = False
+from .bufferpool import FramePool
+
+log = logging.getLogger(__name__)
+
+def _directshow_names() -> Optional[List[str]]:
+    """
+    Nomes amigáveis das câmeras no Windows via DirectShow (pygrabber, opcional).
+    Importado só quando necessário para não pesar no import do pacote.
+    """
+    if not sys.platform.startswith("win"):
+        return None
+    try:
+        from pygrabber.dshow_graph import FilterGraph  # opcional: pip install pygrabber
+        return FilterGraph().get_input_devices()
+    except Exception:
+        return None
+
+CAMERA_CACHE_PATH = Path.home() / ".cache" / "pyframecollector" / "cameras.json"
 
 def _probe_camera(index: int, width: Optional[int] = None, height: Optional[int] = None) -> Optional[Dict]:
     backend = cv2.CAP_DSHOW if sys.platform.startswith("win") else cv2.CAP_ANY
     cap = cv2.VideoCapture(index, backend)
-    if not cap.isOpened():
-        return None
-    ok, frame = cap.read()
-    if not ok or frame is None:
+    try:
+        if not cap.isOpened():
+            return None
+        ok, frame = cap.read()
+        if not ok or frame is None:
+            return None
+        if width:
+            cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        if height:
+            cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        return {
+            "index": index,
+            "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "name": None,
+        }
+    finally:
+        # inclusive quando a sonda termina depois do timeout de enumerate_cameras
         cap.release()
+
+def _read_text(path: Path) -> str:
+    try:
+        return path.read_text(encoding="utf-8", errors="replace").strip()
+    except OSError:
+        return ""
+
+def _linux_video_nodes(max_devices: int) -> Dict[int, Path]:
+    """Mapeia índice -> /dev/videoN existente (só índices < max_devices)."""
+    nodes = {}
+    for node in Path("/dev").glob("video*"):
+        suffix = node.name[len("video"):]
+        if suffix.isdigit() and int(suffix) < max_devices:
+            nodes[int(suffix)] = node
+    return nodes
+
+def _device_fingerprint(max_devices: int) -> Optional[str]:
+    """
+    Identidade barata do conjunto de câmeras conectadas (sem abrir nenhuma).
+    Linux: nós /dev/video* + informações do sysfs; Windows: nomes do DirectShow.
+    None quando não há como identificar -> o cache não é usado.
+    """
+    parts = [f"max={max_devices}"]
+    if sys.platform.startswith("linux"):
+        for idx, node in sorted(_linux_video_nodes(max_devices).items()):
+            try:
+                st = node.stat()
+            except OSError:
+                continue
+            sysfs = Path("/sys/class/video4linux") / node.name
+            parts.append(
+                f"{idx}:{st.st_rdev}:{int(st.st_ctime)}:{_read_text(sysfs / 'name')}:"
+                f"{os.path.realpath(sysfs / 'device')}"
+            )
+    else:
+        names = _directshow_names()
+        if names is None:
+            return None
+        parts.extend(names)
+    return hashlib.sha1("\n".join(parts).encode("utf-8")).hexdigest()
+
+def _load_camera_cache(path: Path, fingerprint: str) -> Optional[Tuple[List[Dict], List[int]]]:
+    """(câmeras, índices que falharam na última sondagem) ou None se o cache não vale."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
         return None
-    if width:
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
-    if height:
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
-    info = {
-        "index": index,
-        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
-        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
-        "name": None,
-    }
-    cap.release()
-    return info
-
-def enumerate_cameras(max_devices: int = 10) -> List[Dict]:
-    found = []
-    for i in range(max_devices):
-        info = _probe_camera(i)
-        if info is not None:
-            found.append(info)
-    if _HAS_PYGRABBER and found:
+    if data.get("fingerprint") != fingerprint:
+        return None
+    cams, failed = data.get("cameras"), data.get("failed")
+    if not isinstance(cams, list) or not isinstance(failed, list):
+        return None  # inclui caches antigos, sem a lista de falhas
+    return cams, [int(i) for i in failed]
+
+def _save_camera_cache(path: Path, fingerprint: str, cameras: List[Dict], failed: List[int]):
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        data = {"fingerprint": fingerprint, "cameras": cameras, "failed": sorted(failed)}
+        tmp.write_text(json.dumps(data, indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+# sondas que estouraram o timeout e ainda estão presas no driver (índice -> thread)
+_stuck_probes: Dict[int, threading.Thread] = {}
+
+def _probe_parallel(indices: List[int], timeout: float) -> Tuple[List[Dict], List[int]]:
+    """
+    Testa os índices em threads paralelas. Devolve (câmeras encontradas,
+    índices que falharam): sem câmera, ocupados, com erro ou sem resposta até
+    o timeout. Índice com sonda anterior ainda presa não é aberto de novo.
+    """
+    results: Dict[int, Optional[Dict]] = {}
+
+    def probe(i: int):
         try:
-            g = FilterGraph()
-            device_names = g.get_input_devices()
-            for dev in found:
-                idx = dev["index"]
-                if 0 <= idx < len(device_names):
-                    dev["name"] = device_names[idx]
+            results[i] = _probe_camera(i)
         except Exception:
-            pass
+            results[i] = None
+
+    threads: Dict[int, threading.Thread] = {}
+    for i in indices:
+        stuck = _stuck_probes.get(i)
+        if stuck is not None and stuck.is_alive():
+            continue
+        threads[i] = threading.Thread(target=probe, args=(i,), name=f"CameraProbe-{i}", daemon=True)
+        threads[i].start()
+    deadline = time.monotonic() + timeout
+    for i, t in threads.items():
+        t.join(max(0.0, deadline - time.monotonic()))
+        if t.is_alive():
+            _stuck_probes[i] = t
+            log.warning("Câmera %d não respondeu em %.1fs.", i, timeout)
+        else:
+            _stuck_probes.pop(i, None)
+    found = [results[i] for i in sorted(results) if results[i] is not None and not threads[i].is_alive()]
+    ok = {dev["index"] for dev in found}
+    return found, [i for i in indices if i not in ok]
+
+def _name_cameras(found: List[Dict], nodes: Dict[int, Path]):
+    for dev in found:
+        node = nodes.get(dev["index"])
+        if node is not None:
+            dev["name"] = _read_text(Path("/sys/class/video4linux") / node.name / "name") or None
+    device_names = _directshow_names() if found else None
+    if device_names:
+        for dev in found:
+            idx = dev["index"]
+            if 0 <= idx < len(device_names):
+                dev["name"] = device_names[idx]
+
+def enumerate_cameras(
+    max_devices: int = 10,
+    timeout: float = 3.0,
+    use_cache: bool = True,
+    cache_path: Optional[Path] = None,
+) -> List[Dict]:
+    """
+    Lista as câmeras disponíveis. Os índices são testados em paralelo (timeout
+    por dispositivo) e o resultado fica em cache, revalidado pela identidade
+    dos dispositivos conectados. O cache guarda também os índices que falharam
+    (ocupados, lentos ou que não são câmeras); só esses são testados de novo
+    nas próximas chamadas, para uma câmera ocupada uma vez não sumir da lista.
+    """
+    cache_path = cache_path or CAMERA_CACHE_PATH
+    fingerprint = _device_fingerprint(max_devices) if use_cache else None
+    if sys.platform.startswith("linux"):
+        nodes = _linux_video_nodes(max_devices)
+        indices = sorted(nodes)
+    else:
+        nodes = {}
+        indices = list(range(max_devices))
+
+    cached = _load_camera_cache(cache_path, fingerprint) if fingerprint is not None else None
+    if cached is not None:
+        known, failed = cached
+        if not failed:
+            return known
+        retry, failed = _probe_parallel(failed, timeout)
+        _name_cameras(retry, nodes)
+        found = sorted(known + retry, key=lambda dev: dev["index"])
+        if retry:
+            _save_camera_cache(cache_path, fingerprint, found, failed)
+        return found
+
+    found, failed = _probe_parallel(indices, timeout)
+    _name_cameras(found, nodes)
+    if fingerprint is not None and found:
+        _save_camera_cache(cache_path, fingerprint, found, failed)
     return found
 
-class VideoSource:
-    def __init__(self, camera_index: int = 0):
+@dataclass
+class FramePacket:
+    """
+    Frame + metadados de captura. Em modo passthrough a fonte entrega só os bytes
+    JPEG da câmera (encoded) e image fica None até alguém chamar decode().
+    """
+    image: Optional[np.ndarray]
+    timestamp: float   # relógio monotônico logo após a captura
+    seq: int           # número sequencial do frame na fonte (1, 2, ...)
+    skipped: int = 0   # frames capturados e não entregues desde a leitura anterior
+    encoded: Optional[np.ndarray] = None  # bytes MJPEG/JPEG (uint8, 1-D) quando a fonte não decodifica
+    pool: Optional[FramePool] = field(default=None, repr=False)  # dono de image, se veio de um FramePool
+
+    def retain(self):
+        """Mais uma referência ao buffer (quem guarda o frame além da iteração atual)."""
+        if self.pool is not None and self.image is not None:
+            self.pool.retain(self.image)
+
+    def release(self):
+        """Devolve o buffer ao pool (uma vez por acquire/retain)."""
+        if self.pool is not None and self.image is not None:
+            self.pool.release(self.image)
+
+    def decode(self) -> Optional[np.ndarray]:
+        """Imagem BGR (decodifica os bytes na primeira chamada)."""
+        if self.image is None and self.encoded is not None:
+            self.image = cv2.imdecode(self.encoded, cv2.IMREAD_COLOR)
+        return self.image
+
+
+def is_jpeg(buf) -> bool:
+    """Buffer 1-D de bytes começando com o marcador SOI do JPEG."""
+    return buf is not None and buf.dtype == np.uint8 and buf.size > 2 and buf.shape[0] in (1, buf.size) \
+        and int(buf.flat[0]) == 0xFF and int(buf.flat[1]) == 0xD8
+
+
+class FrameSource(ABC):
+    """
+    Interface comum das fontes de vídeo:
+    read() -> (ok, frame), read_packet() -> FramePacket | None, release().
+    Subclasses implementam read(); read_packet(), grab()/retrieve() têm versão
+    padrão em cima dele.
+    Com self.pool (FramePool), read_packet() das fontes que suportam lê num buffer
+    emprestado; o consumidor chama FramePacket.release() ao terminar.
+    """
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._seq = 0
+        self.pool: Optional[FramePool] = None
+
+    @abstractmethod
+    def read(self):
+        """(ok, frame BGR) do próximo frame; (False, None) no fim ou em falha."""
+
+    def read_packet(self) -> Optional[FramePacket]:
+        ok, frame = self.read()
+        if not ok or frame is None:
+            return None
+        self._seq += 1
+        return FramePacket(frame, self.clock(), self._seq)
+
+    def grab(self) -> bool:
+        """Captura o próximo frame sem entregá-lo; retrieve() devolve o frame capturado."""
+        ok, self._grabbed = self.read()
+        return bool(ok) and self._grabbed is not None
+
+    def retrieve(self):
+        frame, self._grabbed = getattr(self, "_grabbed", None), None
+        return frame is not None, frame
+
+    def release(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+
+
+class VideoSource(FrameSource):
+    """
+    Câmera via cv2.VideoCapture. fourcc/width/height/fps/buffer_size (0 ou ""
+    = padrão do driver) são pedidos ao driver na abertura; o que ele aceitou
+    fica em self.negotiated.
+
+    passthrough=True (com fourcc "MJPG") desliga a conversão do OpenCV: read_packet()
+    devolve os bytes JPEG da câmera em FramePacket.encoded, sem decodificar.
+    Se o backend não entregar JPEG o modo é desligado e a fonte volta a decodificar.
+    """
+    def __init__(
+        self,
+        camera_index: int = 0,
+        fourcc: str = "",
+        width: int = 0,
+        height: int = 0,
+        fps: float = 0.0,
+        buffer_size: int = 0,
+        passthrough: bool = False,
+    ):
+        super().__init__()
         backend = cv2.CAP_DSHOW if sys.platform.startswith("win") else cv2.CAP_ANY
         self.cap = cv2.VideoCapture(camera_index, backend)
         if not self.cap.isOpened():
             raise RuntimeError(f"Câmera {camera_index} indisponível")
+        # FOURCC antes da resolução: muitos drivers só oferecem resoluções altas em MJPG
+        if fourcc:
+            self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*fourcc.ljust(4)[:4]))
+        if width and height:
+            self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+            self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        if fps:
+            self.cap.set(cv2.CAP_PROP_FPS, fps)
+        if buffer_size:
+            self.cap.set(cv2.CAP_PROP_BUFFERSIZE, buffer_size)
+        self._frame_shape: Optional[tuple] = None  # conhecida após o primeiro frame (para o pool)
+        self.passthrough = bool(passthrough) and self.cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+        code = int(self.cap.get(cv2.CAP_PROP_FOURCC))
+        self.negotiated = {
+            "fourcc": "".join(chr((code >> 8 * i) & 0xFF) for i in range(4)).strip("\x00"),
+            "width": int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            "height": int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            "fps": float(self.cap.get(cv2.CAP_PROP_FPS)),
+            "buffer_size": int(self.cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+            "passthrough": self.passthrough,
+        }
+        if passthrough and not self.passthrough:
+            log.warning("Câmera %s não aceitou passthrough; frames serão decodificados.", camera_index)
+
+    def _disable_passthrough(self):
+        log.warning("Câmera não entrega JPEG (%s); passthrough desligado.", self.negotiated["fourcc"])
+        self.cap.set(cv2.CAP_PROP_CONVERT_RGB, 1)
+        self.passthrough = self.negotiated["passthrough"] = False
 
     def read(self):
-        return self.cap.read()
+        ok, frame = self.cap.read()
+        if ok and self.passthrough:
+            if not is_jpeg(frame):
+                self._disable_passthrough()
+                return ok, frame
+            frame = cv2.imdecode(frame, cv2.IMREAD_COLOR)
+            ok = frame is not None
+        return ok, frame
+
+    def _read_pooled(self) -> Optional[FramePacket]:
+        pool = self.pool
+        buf = pool.acquire(self._frame_shape) if self._frame_shape is not None else None
+        ok, frame = self.cap.read(image=buf) if buf is not None else self.cap.read()
+        if not ok or frame is None:
+            if buf is not None:
+                pool.release(buf)
+            return None
+        if frame is not buf:
+            # primeiro frame ou resolução diferente: o OpenCV alocou outro array
+            if buf is not None:
+                pool.release(buf)
+            self._frame_shape = frame.shape
+        self._seq += 1
+        return FramePacket(frame, self.clock(), self._seq, pool=pool)
+
+    def read_packet(self) -> Optional[FramePacket]:
+        if not self.passthrough:
+            if self.pool is not None:
+                return self._read_pooled()
+            return super().read_packet()
+        ok, buf = self.cap.read()
+        if not ok or buf is None:
+            return None
+        self._seq += 1
+        if not is_jpeg(buf):
+            self._disable_passthrough()
+            return FramePacket(buf, self.clock(), self._seq)
+        return FramePacket(None, self.clock(), self._seq, encoded=buf.reshape(-1))
+
+    def grab(self) -> bool:
+        return self.cap.grab()
+
+    def retrieve(self):
+        return self.cap.retrieve()
 
     def release(self):
         if self.cap:
             self.cap.release()
+
+
+class SyntheticSource(FrameSource):
+    """
+    Fonte sintética (sem câmera): gradiente fixo + quadrado em movimento.
+    realtime=True respeita o fps com sleep; com realtime=False os frames saem
+    o mais rápido possível e o timestamp é virtual (t0 + n / fps).
+    """
+    def __init__(
+        self,
+        width: int = 640,
+        height: int = 480,
+        fps: float = 30.0,
+        count: Optional[int] = None,
+        realtime: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__(clock)
+        self.width = int(width)
+        self.height = int(height)
+        self.fps = float(fps)
+        self.count = count
+        self.realtime = realtime
+        ramp = np.linspace(0, 255, self.width, dtype=np.uint8)
+        self._base = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        self._base[:] = ramp[None, :, None]
+        self._square = max(8, min(self.width, self.height) // 8)
+        self._t0: Optional[float] = None
+        self._produced = 0
+
+    def _due(self, n: int) -> float:
+        return self._t0 + n / self.fps if self.fps > 0 else self._t0
+
+    def _next_index(self) -> Optional[int]:
+        """Espera (realtime) e devolve o número do próximo frame; None no fim."""
+        if self.count is not None and self._produced >= self.count:
+            return None
+        if self._t0 is None:
+            self._t0 = self.clock()
+        if self.realtime and self.fps > 0:
+            delay = self._due(self._produced) - self.clock()
+            if delay > 0:
+                time.sleep(delay)
+        n = self._produced
+        self._produced += 1
+        return n
+
+    def read(self):
+        n = self._next_index()
+        if n is None:
+            return False, None
+        return True, self._render(n)
+
+    def _render(self, n: int, out: Optional[np.ndarray] = None) -> np.ndarray:
+        if out is None:
+            frame = self._base.copy()
+        else:
+            frame = out
+            np.copyto(frame, self._base)
+        s = self._square
+        x = (n * 4) % max(1, self.width - s)
+        y = (self.height - s) // 2
+        frame[y:y + s, x:x + s] = 255
+        return frame
+
+    def read_packet(self) -> Optional[FramePacket]:
+        n = self._next_index()
+        if n is None:
+            return None
+        pool = self.pool
+        frame = self._render(n, pool.acquire(self._base.shape) if pool is not None else None)
+        self._seq += 1
+        ts = self.clock() if self.realtime else self._due(n)
+        return FramePacket(frame, ts, self._seq, pool=pool)
+
+
+class SyntheticMJPEGSource(SyntheticSource):
+    """
+    Imita uma câmera MJPEG em passthrough: read_packet() entrega só os bytes JPEG
+    (FramePacket.encoded), como VideoSource(passthrough=True). A compressão,
+    que numa câmera real é feita pelo hardware, acontece aqui uma única vez, num
+    ciclo de `ring` frames pré-codificados, fora do tempo de leitura.
+    read() continua entregando o frame decodificado.
+    """
+    def __init__(self, width: int = 640, height: int = 480, fps: float = 30.0, quality: int = 85, ring: int = 30, **kwargs):
+        super().__init__(width, height, fps, **kwargs)
+        self.passthrough = True
+        params = [cv2.IMWRITE_JPEG_QUALITY, int(quality)]
+        self._ring: List[np.ndarray] = [
+            cv2.imencode(".jpg", self._render(n), params)[1].reshape(-1) for n in range(max(1, int(ring)))
+        ]
+
+    def read_packet(self) -> Optional[FramePacket]:
+        n = self._next_index()
+        if n is None:
+            return None
+        self._seq += 1
+        ts = self.clock() if self.realtime else self._due(n)
+        return FramePacket(None, ts, self._seq, encoded=self._ring[n % len(self._ring)])
+
+    def read(self):
+        pkt = self.read_packet()
+        if pkt is None:
+            return False, None
+        return True, pkt.decode()
+
+
+class FileSource(FrameSource):
+    """Lê frames de um arquivo de vídeo; realtime=True respeita o fps do arquivo."""
+    def __init__(self, path, loop: bool = False, realtime: bool = False):
+        super().__init__()
+        self.path = Path(path)
+        self.loop = loop
+        self.realtime = realtime
+        self.cap = cv2.VideoCapture(str(self.path))
+        if not self.cap.isOpened():
+            raise RuntimeError(f"Vídeo indisponível: {self.path}")
+        fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.fps = float(fps) if fps and fps > 0 else 30.0
+        self._next_t: Optional[float] = None
+
+    def read(self):
+        if self.realtime:
+            if self._next_t is None:
+                self._next_t = self.clock()
+            delay = self._next_t - self.clock()
+            if delay > 0:
+                time.sleep(delay)
+            self._next_t += 1.0 / self.fps
+        ok, frame = self.cap.read()
+        if not ok and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.cap.read()
+        return ok, frame
+
+    def release(self):
+        if self.cap:
+            self.cap.release()
+
+
+class ThreadedVideoSource(FrameSource):
+    """
+    Thread dedicada que lê continuamente de outra fonte e mantém só os frames
+    mais recentes (buffer_size). O consumidor sempre recebe o frame mais novo
+    que ainda não viu, sem esperar o buffer do driver esvaziar;
+    FramePacket.skipped informa quantos frames ficaram para trás.
+    """
+    def __init__(self, source: FrameSource, buffer_size: int = 1):
+        super().__init__(source.clock)
+        self.source = source
+        self._buffer: deque[FramePacket] = deque(maxlen=max(1, int(buffer_size)))
+        self._cond = threading.Condition()
+        self._last_seq = 0          # último seq entregue ao consumidor
+        self._eof = False           # fonte parou de entregar frames
+        self._running = True
+        self.skipped_total = 0
+        self._thread = threading.Thread(target=self._grab_loop, name="VideoGrab", daemon=True)
+        self._thread.start()
+
+    def _grab_loop(self):
+        while self._running:
+            pkt = self.source.read_packet()
+            with self._cond:
+                if pkt is None:
+                    self._eof = True
+                    self._cond.notify_all()
+                    return
+                if len(self._buffer) == self._buffer.maxlen:
+                    self._buffer[0].release()  # sai do ring sem ter sido entregue (ou já entregue)
+                self._buffer.append(pkt)
+                self._cond.notify_all()
+
+    def read_packet(self, timeout: float = 1.0) -> Optional[FramePacket]:
+        """Frame mais novo ainda não entregue; None se a fonte acabou ou estourou o timeout."""
+        with self._cond:
+            ready = self._cond.wait_for(
+                lambda: (self._buffer and self._buffer[-1].seq > self._last_seq) or self._eof or not self._running,
+                timeout=timeout,
+            )
+            if not ready or not self._buffer or self._buffer[-1].seq <= self._last_seq:
+                return None
+            latest = self._buffer[-1]
+            skipped = latest.seq - self._last_seq - 1
+            self._last_seq = latest.seq
+            self.skipped_total += skipped
+            latest.retain()  # o consumidor ganha a própria referência ao buffer
+        return replace(latest, skipped=skipped)
+
+    def reset_skipped(self):
+        """
+        Esquece os frames capturados desde a última entrega (ex.: câmera ociosa
+        entre sessões): a próxima leitura entrega o frame mais novo com skipped=0.
+        """
+        with self._cond:
+            if self._buffer:
+                self._last_seq = max(self._last_seq, self._buffer[-1].seq - 1)
+
+    def read(self):
+        pkt = self.read_packet()
+        if pkt is None:
+            return False, None
+        frame = pkt.decode()
+        if pkt.pool is not None and pkt.pool.owns(frame):
+            frame = frame.copy()  # read() não tem release(): não segura o buffer do pool
+            pkt.release()
+        return True, frame
+
+    @property
+    def eof(self) -> bool:
+        """A fonte parou de entregar frames (fim do arquivo ou câmera desconectada)."""
+        return self._eof
+
+    def recent(self) -> List[FramePacket]:
+        """
+        Cópia do ring buffer (mais antigo primeiro). Com pool, as imagens só
+        continuam válidas enquanto os pacotes estiverem no ring.
+        """
+        with self._cond:
+            return list(self._buffer)
+
+    def release(self):
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        with self._cond:
+            while self._buffer:
+                self._buffer.popleft().release()
+        self.source.release()
@@ -1,5 +1,16 @@
-from framecapture.ui import CaptureApp
+import logging
+import multiprocessing
+import sys
 
 if __name__ == "__main__":
+    # executável do PyInstaller: processos filhos (preview, pools) passam por aqui
+    multiprocessing.freeze_support()
+    if len(sys.argv) > 1:
+        # argumentos na linha de comando -> modo headless (sem Tk)
+        from framecapture.cli import main
+        sys.exit(main())
+
+    from framecapture.ui import CaptureApp
+    logging.basicConfig(level=logging.INFO, format="[%(levelname)s] %(message)s")
     app = CaptureApp()
     app.mainloop()
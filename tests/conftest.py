@@ -0,0 +1,6 @@
+# tests/conftest.py
+import sys
+from pathlib import Path
+
+# o pacote vive em scr/ (main.py roda de lá)
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scr"))
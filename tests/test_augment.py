@@ -0,0 +1,29 @@
+# tests/test_augment.py
+"""Aumento de dados: lote x referência imagem a imagem e sorteio determinístico."""
+import numpy as np
+
+from framecapture.augment import AugmentParams, augment_batch, augment_reference, frame_key
+from framecapture.video import SyntheticSource
+
+
+def images(n=4, w=64, h=48):
+    src = SyntheticSource(w, h, realtime=False)
+    return [src.read()[1] for _ in range(n)]
+
+
+def test_batch_matches_reference_for_list_and_array():
+    imgs = images()
+    keys = [frame_key(f"A/frame_{i}.jpg") for i in range(len(imgs))]
+    for c in range(3):
+        ref = np.stack([augment_reference(img, k, c, 7, AugmentParams(), (32, 32)) for img, k in zip(imgs, keys)])
+        assert np.array_equal(augment_batch(imgs, keys, c, 7, AugmentParams(), (32, 32)), ref)
+        assert np.array_equal(augment_batch(np.stack(imgs), keys, c, 7, AugmentParams(), (32, 32)), ref)
+
+
+def test_draws_depend_only_on_seed_key_and_copy():
+    imgs = images()
+    keys = [frame_key(f"A/frame_{i}.jpg") for i in range(len(imgs))]
+    whole = augment_batch(imgs, keys, 1, 3)
+    # o mesmo arquivo num lote diferente dá a mesma variação
+    assert np.array_equal(augment_batch(imgs[2:], keys[2:], 1, 3), whole[2:])
+    assert not np.array_equal(augment_batch(imgs, keys, 2, 3), whole)
@@ -0,0 +1,37 @@
+# tests/test_bench.py
+"""Comparação com o baseline do benchmark (sem rodar os cenários)."""
+from framecapture.bench import compare, median_results, spread
+
+
+def suite(p50, fps=100.0):
+    return {"640x480": {"storage": {"encode": {"p50_ms": p50}}, "pipeline": {"save_rate_fps": fps, "ok": True}}}
+
+
+def result(*runs):
+    results = [suite(*r) for r in runs]
+    return {"results": median_results(results), "spread": spread(results)}
+
+
+def test_median_results_keeps_structure():
+    med = median_results([suite(1.0), suite(3.0), suite(2.0)])
+    assert med["640x480"]["storage"]["encode"]["p50_ms"] == 2.0
+    assert med["640x480"]["pipeline"]["ok"] is True
+
+
+def test_small_timing_changes_are_noise():
+    base = result((0.30,), (0.31,), (0.29,))
+    assert compare(result((0.39,), (0.40,), (0.41,)), base) == []  # +0.1 ms < piso de 0.25 ms
+
+
+def test_regression_must_reproduce_in_every_run():
+    base = result((1.0,), (1.0,), (1.0,))
+    # mediana pior, mas uma execução igual ao baseline: não conta
+    assert compare(result((1.5,), (1.6,), (1.0,)), base) == []
+    regs = compare(result((1.5,), (1.6,), (1.4,)), base)
+    assert [r["metric"] for r in regs] == ["640x480.storage.encode.p50_ms"]
+
+
+def test_throughput_regression():
+    base = result((1.0, 100.0), (1.0, 100.0))
+    regs = compare(result((1.0, 80.0), (1.0, 85.0)), base)
+    assert [r["metric"] for r in regs] == ["640x480.pipeline.save_rate_fps"]
@@ -0,0 +1,66 @@
+# tests/test_bufferpool.py
+"""FramePool: empréstimo, referências, crescimento e esgotamento."""
+import numpy as np
+
+from framecapture.bufferpool import FramePool
+from framecapture.config import CaptureConfig
+from framecapture.pipeline import CapturePipeline
+
+SHAPE = (4, 6, 3)
+
+
+def test_buffers_are_reused_after_release():
+    pool = FramePool(2)
+    a = pool.acquire(SHAPE)
+    assert pool.owns(a) and pool.in_use == 1
+    pool.release(a)
+    assert pool.in_use == 0
+    assert pool.acquire(SHAPE) is a  # LIFO
+
+
+def test_retain_keeps_buffer_until_last_release():
+    pool = FramePool(1)
+    a = pool.acquire(SHAPE)
+    pool.retain(a[1:3])  # view conta no buffer de origem
+    pool.release(a)
+    assert pool.in_use == 1
+    pool.release(a[1:3])
+    assert pool.in_use == 0
+
+
+def test_fixed_pool_exhaustion_returns_loose_array():
+    pool = FramePool(1)
+    a = pool.acquire(SHAPE)
+    b = pool.acquire(SHAPE)
+    assert not pool.owns(b) and b.shape == SHAPE
+    assert pool.stats.exhausted == 1
+    pool.release(b)  # avulso: ignorado
+    pool.release(a)
+    assert pool.in_use == 0
+
+
+def test_pool_grows_until_max_size():
+    pool = FramePool(1, max_size=3)
+    bufs = [pool.acquire(SHAPE) for _ in range(4)]
+    assert [pool.owns(b) for b in bufs] == [True, True, True, False]
+    assert (pool.stats.size, pool.stats.grown, pool.stats.exhausted, pool.stats.peak_in_use) == (3, 2, 1, 3)
+    for b in bufs:
+        pool.release(b)
+    assert pool.in_use == 0
+
+
+def test_reshape_reallocates_initial_size():
+    pool = FramePool(1, max_size=2)
+    bufs = [pool.acquire(SHAPE) for _ in range(2)]
+    for b in bufs:
+        pool.release(b)
+    assert pool.stats.size == 2
+    pool.acquire((2, 2, 3))
+    assert pool.stats.reshaped == 1 and pool.stats.size == 1 and pool.shape == (2, 2, 3)
+    assert pool.dtype == np.uint8
+
+
+def test_auto_size_counts_frames_in_flight_not_the_queue(tmp_path):
+    cfg = CaptureConfig(tmp_path, "A", storage_workers=2, storage_queue_size=32, threaded_capture=True)
+    assert CapturePipeline.auto_pool_size(cfg) == 2 + 2 + 2
+    assert CapturePipeline.auto_pool_limit(cfg) == 2 + 2 + 2 + 32 + 1
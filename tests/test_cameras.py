@@ -0,0 +1,114 @@
+# tests/test_cameras.py
+"""enumerate_cameras: cache pela identidade dos dispositivos e nova sondagem só dos índices que falharam."""
+import json
+import threading
+from pathlib import Path
+
+import pytest
+
+from framecapture import video
+
+
+class FakeProbe:
+    """Substitui _probe_camera: registra os índices abertos; só os de `online` respondem."""
+    def __init__(self, online):
+        self.online = set(online)
+        self.calls = []
+
+    def __call__(self, index, width=None, height=None):
+        self.calls.append(index)
+        if index not in self.online:
+            return None
+        return {"index": index, "width": 640, "height": 480, "name": None}
+
+
+@pytest.fixture
+def devices(monkeypatch):
+    """Três nós de vídeo, identidade fixa e sem nomes do sistema."""
+    state = {"fingerprint": "fp1"}
+    monkeypatch.setattr(video.sys, "platform", "linux")
+    monkeypatch.setattr(video, "_linux_video_nodes", lambda n: {i: Path(f"/dev/video{i}") for i in range(3)})
+    monkeypatch.setattr(video, "_device_fingerprint", lambda n: state["fingerprint"])
+    monkeypatch.setattr(video, "_read_text", lambda path: "")
+    return state
+
+
+def indices(cams):
+    return [c["index"] for c in cams]
+
+
+def test_cache_retries_only_failed_indices(tmp_path, monkeypatch, devices):
+    cache = tmp_path / "cameras.json"
+    probe = FakeProbe(online={0})
+    monkeypatch.setattr(video, "_probe_camera", probe)
+
+    assert indices(video.enumerate_cameras(cache_path=cache)) == [0]
+    assert sorted(probe.calls) == [0, 1, 2]
+    assert json.loads(cache.read_text(encoding="utf-8"))["failed"] == [1, 2]
+
+    # a câmera 1 estava ocupada e agora responde: só 1 e 2 são abertas de novo
+    probe.calls.clear()
+    probe.online.add(1)
+    assert indices(video.enumerate_cameras(cache_path=cache)) == [0, 1]
+    assert sorted(probe.calls) == [1, 2]
+    assert json.loads(cache.read_text(encoding="utf-8"))["failed"] == [2]
+
+    probe.calls.clear()
+    assert indices(video.enumerate_cameras(cache_path=cache)) == [0, 1]
+    assert probe.calls == [2]
+
+
+def test_cache_without_failures_probes_nothing(tmp_path, monkeypatch, devices):
+    cache = tmp_path / "cameras.json"
+    probe = FakeProbe(online={0, 1, 2})
+    monkeypatch.setattr(video, "_probe_camera", probe)
+    video.enumerate_cameras(cache_path=cache)
+    probe.calls.clear()
+    assert indices(video.enumerate_cameras(cache_path=cache)) == [0, 1, 2]
+    assert probe.calls == []
+
+
+def test_new_fingerprint_invalidates_cache(tmp_path, monkeypatch, devices):
+    cache = tmp_path / "cameras.json"
+    probe = FakeProbe(online={0, 1, 2})
+    monkeypatch.setattr(video, "_probe_camera", probe)
+    video.enumerate_cameras(cache_path=cache)
+
+    devices["fingerprint"] = "fp2"   # câmera trocada de porta
+    probe.calls.clear()
+    probe.online = {2}
+    assert indices(video.enumerate_cameras(cache_path=cache)) == [2]
+    assert sorted(probe.calls) == [0, 1, 2]
+
+
+def test_old_cache_format_is_ignored(tmp_path, monkeypatch, devices):
+    cache = tmp_path / "cameras.json"
+    cache.write_text(json.dumps({"fingerprint": "fp1", "cameras": [{"index": 9}]}), encoding="utf-8")
+    probe = FakeProbe(online={1})
+    monkeypatch.setattr(video, "_probe_camera", probe)
+    assert indices(video.enumerate_cameras(cache_path=cache)) == [1]
+
+
+def test_stuck_probe_fails_and_is_not_reopened(tmp_path, monkeypatch, devices):
+    cache = tmp_path / "cameras.json"
+    gate = threading.Event()
+    probe = FakeProbe(online={0, 1, 2})
+
+    def slow_probe(index, width=None, height=None):
+        if index == 2:
+            gate.wait(5)    # driver preso
+        return probe(index)
+
+    monkeypatch.setattr(video, "_probe_camera", slow_probe)
+    try:
+        assert indices(video.enumerate_cameras(timeout=0.2, cache_path=cache)) == [0, 1]
+        assert json.loads(cache.read_text(encoding="utf-8"))["failed"] == [2]
+        # a sonda anterior de 2 continua presa: a nova chamada não abre o índice de novo
+        probe.calls.clear()
+        assert indices(video.enumerate_cameras(timeout=0.2, cache_path=cache)) == [0, 1]
+        assert probe.calls == []
+    finally:
+        gate.set()
+        stuck = video._stuck_probes.pop(2, None)
+        if stuck is not None:
+            stuck.join(5)
@@ -0,0 +1,83 @@
+# tests/test_export.py
+"""export_dataset: pastas A..Z -> memmap, reexecuções incrementais e ArrayDataset."""
+import cv2
+import numpy as np
+import pytest
+
+from framecapture.export import ArrayDataset, export_dataset
+
+SIZE = (16, 12)  # largura, altura
+
+
+def write_image(path, bgr):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    cv2.imwrite(str(path), np.full((48, 64, 3), bgr, dtype=np.uint8))
+
+
+@pytest.fixture
+def src(tmp_path):
+    root = tmp_path / "src"
+    write_image(root / "A" / "frame_1.png", (255, 0, 0))   # azul em BGR
+    write_image(root / "A" / "frame_2.png", (0, 255, 0))
+    write_image(root / "B" / "frame_1.png", (0, 0, 255))
+    write_image(root / "B" / "cam1" / "frame_1.png", (9, 9, 9))
+    return root
+
+
+def export(src, dst, **kw):
+    return export_dataset(src, dst, size=SIZE, jobs=1, **kw)
+
+
+def test_export_layout_and_labels(src, tmp_path):
+    rep = export(src, tmp_path / "ds")
+    assert (rep["total"], rep["added"], rep["processed"], rep["failed"]) == (4, 4, 4, 0)
+
+    ds = ArrayDataset(tmp_path / "ds")
+    assert len(ds) == 4 and ds.images.shape == (4, 12, 16, 3)
+    assert [e["rel"] for e in ds.index] == ["A/frame_1.png", "A/frame_2.png", "B/frame_1.png", "B/cam1/frame_1.png"]
+    assert [ds.letter(i) for i in range(4)] == ["A", "A", "B", "B"]
+    assert [e["camera"] for e in ds.index] == [None, None, None, 1]
+    assert ds.valid.all()
+    assert tuple(ds.images[0, 0, 0]) == (0, 0, 255)         # RGB por padrão
+
+
+def test_second_run_adds_nothing(src, tmp_path):
+    export(src, tmp_path / "ds")
+    before = (tmp_path / "ds" / "images.u8").read_bytes()
+
+    rep = export(src, tmp_path / "ds")
+    assert (rep["total"], rep["added"], rep["updated"], rep["processed"]) == (4, 0, 0, 0)
+    assert (tmp_path / "ds" / "images.u8").read_bytes() == before
+    assert len(ArrayDataset(tmp_path / "ds")) == 4
+
+
+def test_incremental_run_appends_new_and_updates_changed(src, tmp_path):
+    export(src, tmp_path / "ds")
+    write_image(src / "C" / "frame_1.png", (1, 2, 3))
+    write_image(src / "A" / "frame_2.png", (7, 7, 7))        # mesmo nome, conteúdo novo
+    rep = export(src, tmp_path / "ds")
+    assert (rep["total"], rep["added"], rep["updated"]) == (5, 1, 1)
+
+    ds = ArrayDataset(tmp_path / "ds")
+    assert ds.index[4]["rel"] == "C/frame_1.png" and ds.letter(4) == "C"
+    assert tuple(ds.images[1, 0, 0]) == (7, 7, 7)            # atualizado na mesma linha
+
+
+def test_failed_frame_is_retried(src, tmp_path):
+    bad = src / "B" / "frame_2.png"
+    bad.write_bytes(b"not an image")
+    rep = export(src, tmp_path / "ds")
+    assert rep["failed"] == 1
+    ds = ArrayDataset(tmp_path / "ds")
+    assert ds.valid.tolist() == [True, True, True, False, True]
+
+    write_image(bad, (5, 5, 5))
+    rep = export(src, tmp_path / "ds")
+    assert (rep["added"], rep["updated"], rep["failed"]) == (0, 1, 0)
+    assert ArrayDataset(tmp_path / "ds").valid.all()
+
+
+def test_shape_mismatch_is_rejected(src, tmp_path):
+    export(src, tmp_path / "ds")
+    with pytest.raises(ValueError):
+        export(src, tmp_path / "ds", gray=True)
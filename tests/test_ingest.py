@@ -0,0 +1,44 @@
+# tests/test_ingest.py
+"""Ingestão offline de vídeos para as pastas A..Z."""
+import cv2
+import pytest
+
+from framecapture.ingest import ingest
+from framecapture.video import SyntheticSource
+
+
+def write_video(path, frames=20, fps=10.0):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), fps, (64, 48))
+    if not writer.isOpened():
+        pytest.skip("OpenCV sem codificador MJPG")
+    src = SyntheticSource(64, 48, fps=fps, count=frames, realtime=False)
+    for _ in range(frames):
+        writer.write(src.read()[1])
+    writer.release()
+    return path
+
+
+def run(videos, out, **kw):
+    cfg_kwargs = dict(output_parent=out, save_fps=5.0, write_manifest=False)
+    return ingest(videos, cfg_kwargs, letter="D", jobs=1, **kw)
+
+
+def test_same_stem_from_different_folders_does_not_overwrite(tmp_path):
+    out = tmp_path / "out"
+    first = write_video(tmp_path / "phone1" / "IMG_0001.avi")
+    second = write_video(tmp_path / "phone2" / "IMG_0001.avi")
+
+    saved = run([first], out)["frames_saved"]
+    assert saved > 0
+    # outra execução, mesmo nome de arquivo, outro vídeo
+    assert run([second], out)["frames_saved"] == saved
+    assert len(list((out / "D").glob("frame_*.jpg"))) == 2 * saved
+
+
+def test_reingesting_the_same_video_overwrites(tmp_path):
+    out = tmp_path / "out"
+    video = write_video(tmp_path / "clip.avi")
+    saved = run([video], out)["frames_saved"]
+    run([video], out)
+    assert len(list((out / "D").glob("frame_*.jpg"))) == saved
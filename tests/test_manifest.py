@@ -0,0 +1,54 @@
+# tests/test_manifest.py
+"""Manifesto SQLite por pasta: escrita pelo FrameStorage e consultas."""
+import hashlib
+
+import numpy as np
+
+from framecapture import manifest
+from framecapture.config import CaptureConfig
+from framecapture.storage import FrameStorage
+
+
+def fill(folder, session_id, n, workers=0, start=0):
+    storage = FrameStorage(folder, manifest=True, session_id=session_id, workers=workers)
+    for i in range(n):
+        storage.save(np.full((12, 16, 3), i, dtype=np.uint8), name=f"{session_id}_{i}", timestamp=10.0 + i, seq=start + i)
+    storage.close()
+
+
+def test_manifest_is_opt_in(tmp_path):
+    assert CaptureConfig(tmp_path, "A").write_manifest is False
+    storage = FrameStorage(tmp_path / "A")
+    storage.save(np.zeros((4, 4, 3), dtype=np.uint8))
+    storage.close()
+    assert not (tmp_path / "A" / manifest.MANIFEST_NAME).exists()
+    assert manifest.count(tmp_path / "A") == 0
+
+
+def test_session_frames_match_files(tmp_path):
+    folder = tmp_path / "B"
+    fill(folder, "s1", 3, workers=2)
+    records = manifest.session_frames(folder, "s1")
+    assert [r.seq for r in records] == [0, 1, 2]
+    assert [r.captured_at for r in records] == [10.0, 11.0, 12.0]
+    for r in records:
+        data = (folder / r.name).read_bytes()
+        assert (r.bytes, r.sha1) == (len(data), hashlib.sha1(data).hexdigest())
+        assert (r.width, r.height, r.channels) == (16, 12, 3)
+
+
+def test_sessions_and_counts(tmp_path):
+    fill(tmp_path / "A", "s1", 2)
+    fill(tmp_path / "A", "s2", 3)
+    fill(tmp_path / "C" / "cam0", "m1", 4)
+    fill(tmp_path / "C" / "cam1", "m1", 4)
+
+    assert [(sid, n) for sid, n, _, _ in manifest.sessions(tmp_path / "A")] == [("s1", 2), ("s2", 3)]
+    assert manifest.count(tmp_path / "A") == 5
+    assert manifest.counts_per_letter(tmp_path) == {"A": 5, "C": 8}
+
+
+def test_rewriting_a_name_replaces_its_row(tmp_path):
+    fill(tmp_path / "D", "s1", 2)
+    fill(tmp_path / "D", "s1", 2)
+    assert manifest.count(tmp_path / "D") == 2
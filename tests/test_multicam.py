@@ -0,0 +1,126 @@
+# tests/test_multicam.py
+"""Captura multicâmera sobre fontes sintéticas."""
+import json
+
+from framecapture import manifest, multicam
+from framecapture.config import CaptureConfig
+from framecapture.multicam import MultiCapturePipeline
+from framecapture.pipeline import TimeSampler
+from framecapture.video import SyntheticSource
+
+
+def make_cfg(tmp_path, **kw):
+    base = dict(
+        output_parent=tmp_path,
+        output_dir_name="M",
+        save_fps=10.0,
+        max_duration_seconds=0.5,
+        pre_countdown_seconds=0.0,
+        preview=False,
+        max_skew_seconds=0.0,
+    )
+    base.update(kw)
+    return CaptureConfig(**base)
+
+
+def test_cameras_open_with_configured_format(tmp_path, monkeypatch):
+    opened = []
+
+    def fake_open(cfg):
+        opened.append(cfg)
+        src = SyntheticSource(32, 24, fps=30.0, realtime=False)
+        src.negotiated = {"fourcc": cfg.camera_fourcc}
+        return src
+
+    monkeypatch.setattr(multicam, "open_camera", fake_open)
+    cfg = make_cfg(
+        tmp_path, camera_indices=(1, 2), camera_fourcc="MJPG", camera_width=1280,
+        camera_height=720, camera_fps=30.0, passthrough=True,
+    )
+    pipeline = MultiCapturePipeline(cfg)
+    pipeline.start()
+    assert pipeline.wait(10)
+
+    assert [c.camera_index for c in opened] == [1, 2]
+    assert all((c.camera_fourcc, c.camera_width, c.camera_height, c.camera_fps) == ("MJPG", 1280, 720, 30.0) for c in opened)
+    assert not any(c.passthrough for c in opened)  # grab/retrieve precisa de pixels
+
+
+def test_skew_summary_is_written_to_metrics(tmp_path):
+    cfg = make_cfg(tmp_path)
+    sources = [SyntheticSource(32, 24, fps=30.0) for _ in range(2)]
+    pipeline = MultiCapturePipeline(cfg, [0, 1], sources=sources)
+    pipeline.start()
+    assert pipeline.wait(10)
+
+    data = json.loads(pipeline.metrics_path.read_text(encoding="utf-8"))
+    skew = data["info"]["skew"]
+    assert skew["sets"] > 0
+    assert {"mean_ms", "p95_ms", "max_ms"} <= set(skew)
+    saved = data["counters"]["sets_saved"]
+    assert saved > 0
+    assert len(list((tmp_path / "M" / "cam0").glob("frame_*.jpg"))) == saved
+    assert len(list((tmp_path / "M" / "cam1").glob("frame_*.jpg"))) == saved
+
+
+def test_drop_policy_counts_only_written_sets(tmp_path):
+    cfg = make_cfg(tmp_path, storage_workers=1, storage_queue_size=1, storage_backpressure="drop-oldest")
+    sources = [SyntheticSource(32, 24, fps=30.0) for _ in range(2)]
+    pipeline = MultiCapturePipeline(cfg, [0, 1], sources=sources)
+    pipeline.start()
+    assert pipeline.wait(10)
+
+    cam0 = {p.name for p in (tmp_path / "M" / "cam0").glob("frame_*.jpg")}
+    cam1 = {p.name for p in (tmp_path / "M" / "cam1").glob("frame_*.jpg")}
+    assert pipeline.metrics.get("sets_saved") == len(cam0 & cam1) > 0
+
+
+class FailingSource(SyntheticSource):
+    def __init__(self, *a, fail_after=3, **kw):
+        super().__init__(*a, **kw)
+        self.fail_after = fail_after
+        self.released = False
+
+    def grab(self):
+        self.fail_after -= 1
+        if self.fail_after < 0:
+            raise OSError("câmera desconectada")
+        return super().grab()
+
+    def release(self):
+        self.released = True
+
+
+def test_error_during_capture_releases_everything(tmp_path):
+    cfg = make_cfg(tmp_path, max_duration_seconds=5.0, storage_workers=1)
+    sources = [FailingSource(32, 24, fps=30.0, realtime=False) for _ in range(2)]
+    pipeline = MultiCapturePipeline(cfg, [0, 1], sources=sources)
+    pipeline.start()
+    assert pipeline.wait(10)
+
+    assert pipeline.end_reason == "error"
+    assert all(src.released for src in sources)
+    assert pipeline._pool is None
+    assert all(not st._workers for st in pipeline.storages.values())
+
+
+def test_scheduled_sampler_uses_capture_timestamps(tmp_path):
+    cfg = make_cfg(tmp_path, sampler="scheduled", max_duration_seconds=1.0, write_manifest=True)
+    sources = [SyntheticSource(32, 24, fps=30.0) for _ in range(2)]
+    pipeline = MultiCapturePipeline(cfg, [0, 1], sources=sources)
+    pipeline.start()
+    assert pipeline.wait(10)
+
+    assert pipeline.end_reason == "duration"
+    sampling = pipeline.metrics.info["sampling"]
+    assert sampling["picked"] == pipeline.metrics.get("sets_saved") == 10
+    records = manifest.session_frames(tmp_path / "M" / "cam0", pipeline.session_id)
+    stamps = sorted(r.captured_at for r in records)
+    # instante de captura (monotônico), espaçado pela agenda de 10 fps
+    gaps = [b - a for a, b in zip(stamps, stamps[1:])]
+    assert all(abs(g - 0.1) < 0.05 for g in gaps)
+
+
+def test_interval_sampler_is_default(tmp_path):
+    pipeline = MultiCapturePipeline(make_cfg(tmp_path), [0], sources=[SyntheticSource(8, 8)])
+    assert isinstance(pipeline.sampler, TimeSampler)
@@ -0,0 +1,102 @@
+# tests/test_pipeline.py
+"""CapturePipeline sobre fontes sem câmera: gravação, preview e encerramento da sessão."""
+import pytest
+
+from framecapture import pipeline as pipeline_mod
+from framecapture.config import CaptureConfig
+from framecapture.pipeline import CapturePipeline
+from framecapture.service import CaptureService
+from framecapture.video import SyntheticMJPEGSource, SyntheticSource
+
+
+class FakePreview:
+    """Preview sem janela: pede todo frame e guarda o que recebeu."""
+    def __init__(self):
+        self.shown = 0
+        self.closed = False
+        self.events = []
+
+    def wants_frame(self):
+        return True
+
+    def show(self, frame):
+        assert frame is not None
+        self.shown += 1
+        return True
+
+    def poll(self):
+        return self.events.pop(0) if self.events else None
+
+    def hold(self, seconds):
+        pass
+
+    def report(self):
+        return {"shown": self.shown}
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_preview(monkeypatch):
+    preview = FakePreview()
+    monkeypatch.setattr(pipeline_mod, "open_preview", lambda *a, **k: preview)
+    return preview
+
+
+def make_cfg(tmp_path, **kw):
+    base = dict(
+        output_parent=tmp_path,
+        output_dir_name="C",
+        save_fps=5.0,
+        max_duration_seconds=2.0,
+        pre_countdown_seconds=0.0,
+        preview=False,
+        write_metrics=False,
+    )
+    base.update(kw)
+    return CaptureConfig(**base)
+
+
+def test_passthrough_with_preview_keeps_camera_bytes(tmp_path, fake_preview):
+    cfg = make_cfg(tmp_path, preview=True, passthrough=True)
+    src = SyntheticMJPEGSource(64, 48, fps=30.0, realtime=False, ring=4)
+    pipeline = CapturePipeline(cfg, source=src)
+    pipeline.start()
+    assert pipeline.finished.wait(30)
+
+    saved = sorted((tmp_path / "C").glob("frame_*.jpg"))
+    assert len(saved) == 10
+    assert fake_preview.shown > 0 and fake_preview.closed
+    assert pipeline.metrics.get("frames_passthrough") == 10
+    ring = {bytes(buf) for buf in src._ring}
+    assert all(p.read_bytes() in ring for p in saved)
+
+
+@pytest.mark.parametrize("event", ["esc", "closed"])
+def test_preview_event_is_the_end_reason(tmp_path, fake_preview, event):
+    fake_preview.events = [None, None, event]
+    pipeline = CapturePipeline(make_cfg(tmp_path, preview=True), source=SyntheticSource(64, 48, fps=30.0, realtime=False))
+    pipeline.start()
+    assert pipeline.finished.wait(30)
+    assert pipeline.end_reason == event
+    assert fake_preview.shown == 3 and fake_preview.closed
+
+
+def test_error_on_capture_thread_still_finishes_session(tmp_path):
+    # extensão inválida: cv2.imwrite levanta na gravação síncrona
+    service = CaptureService(idle_timeout=None, opener=lambda cfg: SyntheticSource(64, 48, fps=30.0))
+    cfg = make_cfg(tmp_path, image_ext="xyz")
+    pipeline = CapturePipeline(cfg, service=service)
+    ended = []
+    pipeline.on_finished = ended.append
+    try:
+        pipeline.start()
+        assert pipeline.finished.wait(5)
+        assert pipeline.state == "finished"
+        assert pipeline.end_reason == "error"
+        assert ended == [pipeline]
+        # a câmera voltou ao serviço: a próxima sessão consegue o empréstimo
+        service.lease(cfg).release()
+    finally:
+        service.close()
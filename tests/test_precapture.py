@@ -0,0 +1,81 @@
+# tests/test_precapture.py
+"""Overlay do PreCaptureGuide (sprites pré-renderizados x desenho direto) e PresenceDetector."""
+import numpy as np
+import pytest
+
+from framecapture.precapture import PreCaptureGuide, PresenceDetector, guide_circle
+
+SKIN = (90, 130, 200)     # BGR dentro da faixa YCrCb de pele
+BACKGROUND = (60, 60, 60)
+
+
+@pytest.mark.parametrize("size", [(640, 480), (320, 240), (1280, 720)])
+def test_cached_overlay_matches_direct_drawing(size):
+    w, h = size
+    rng = np.random.default_rng(0)
+    base = rng.integers(0, 256, (h, w, 3), dtype=np.uint8)
+    guide = PreCaptureGuide()
+    for secs in (3, 0):
+        cached, direct = base.copy(), base.copy()
+        guide.draw(cached, secs)
+        guide.draw_direct(direct, secs)
+        # só o arredondamento do anti-aliasing difere
+        assert np.abs(cached.astype(int) - direct).max() <= 4
+        assert not np.array_equal(cached, base)
+
+
+def test_prepare_builds_every_countdown_text():
+    guide = PreCaptureGuide(countdown_seconds=3.0)
+    guide.prepare(64, 48)
+    assert {text for (_, _, text) in guide._sprites} == {"", "GO!", "1", "2", "3"}
+
+
+def test_tiny_frame_with_text_outside_does_not_fail():
+    frame = np.zeros((12, 16, 3), dtype=np.uint8)
+    guide = PreCaptureGuide()
+    guide.prepare(16, 12)
+    guide.draw(frame, 5)
+    guide.draw_waiting(frame, ready=True)
+
+
+def frame_with_patch(color, frac=1.0, w=320, h=240, bg=BACKGROUND):
+    """Fundo uniforme com um quadrado `color` cobrindo ~frac da área do círculo do guia."""
+    frame = np.full((h, w, 3), bg, dtype=np.uint8)
+    (cx, cy), r = guide_circle(w, h)
+    half = int(r * np.sqrt(frac * np.pi) / 2)
+    frame[cy - half:cy + half, cx - half:cx + half] = color
+    return frame
+
+
+def test_presence_skin_threshold():
+    det = PresenceDetector(min_motion_frac=0.0, min_skin_frac=0.30, hold_seconds=0.0)
+    assert not det.update(frame_with_patch(SKIN, 0.15), now=0.0)
+    assert 0.10 < det.skin < 0.30
+    assert det.update(frame_with_patch(SKIN, 0.6), now=0.1)
+    assert det.reason == "skin" and det.skin >= 0.30
+    assert not det.update(frame_with_patch(BACKGROUND), now=0.2)
+
+
+def test_presence_motion_threshold():
+    det = PresenceDetector(min_motion_frac=0.06, min_skin_frac=0.0, hold_seconds=0.0)
+    assert not det.update(frame_with_patch(BACKGROUND), now=0.0)   # primeiro frame: sem referência
+    # mudança abaixo de motion_threshold (18 níveis de cinza) não conta
+    assert not det.update(frame_with_patch((70, 70, 70), 0.5), now=0.1)
+    assert det.motion == 0.0
+    assert det.update(frame_with_patch((200, 200, 200), 0.5), now=0.2)
+    assert det.reason == "motion" and det.motion >= 0.06
+    # parado de novo: nada muda entre os frames
+    assert not det.update(frame_with_patch((200, 200, 200), 0.5), now=0.3)
+
+
+def test_presence_must_hold():
+    det = PresenceDetector(min_motion_frac=0.0, min_skin_frac=0.30, hold_seconds=0.4)
+    hand = frame_with_patch(SKIN, 0.6)
+    assert not det.update(hand, now=10.0)
+    assert not det.update(hand, now=10.3)
+    assert det.update(hand, now=10.4)
+    # a presença some: a contagem recomeça
+    assert not det.update(frame_with_patch(BACKGROUND), now=10.5)
+    assert not det.update(hand, now=10.6)
+    det.reset()
+    assert det.motion == det.skin == 0.0 and det.reason == ""
@@ -0,0 +1,99 @@
+# tests/test_preview.py
+"""SharedFrameBuffer (seqlock de dois slots em memória compartilhada) e a captura quando o preview em processo falha."""
+import numpy as np
+import pytest
+
+from framecapture.config import CaptureConfig
+from framecapture.pipeline import CapturePipeline
+from framecapture.preview import SharedFrameBuffer
+from framecapture.video import SyntheticSource
+
+
+@pytest.fixture
+def shared():
+    buf = SharedFrameBuffer.create(48 * 64 * 3)
+    yield buf
+    buf.close()
+
+
+def frame(value, shape=(48, 64, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def test_write_then_read_newest(shared):
+    assert shared.read() is None
+    assert shared.write(frame(1)) == 1
+    assert shared.write(frame(2)) == 2
+    n, img = shared.read()
+    assert n == 2 and img.shape == (48, 64, 3) and (img == 2).all()
+    assert shared.read(after=2) is None        # nada mais novo
+
+
+def test_read_returns_a_copy(shared):
+    shared.write(frame(1))
+    _, img = shared.read()
+    shared.write(frame(2))
+    shared.write(frame(3))                     # reescreve o slot lido antes
+    assert (img == 1).all()
+
+
+def test_grayscale_and_smaller_frames(shared):
+    shared.write(frame(7, (10, 20)))
+    n, img = shared.read()
+    assert img.shape == (10, 20) and (img == 7).all()
+    assert shared.fits(frame(0)) and not shared.fits(frame(0, (49, 64, 3)))
+
+
+def test_slot_being_written_is_skipped(shared):
+    shared.write(frame(1))                     # slot 1, completo
+    shared.write(frame(2))                     # slot 0
+    shared.header[0, 0] = 5                    # seq ímpar: escritor no meio da cópia do frame 3
+    n, img = shared.read()
+    assert n == 1 and (img == 1).all()         # o slot completo mais novo
+
+
+class TearingData:
+    """Envolve SharedFrameBuffer.data: o escritor sobrescreve o slot enquanto o leitor copia."""
+    def __init__(self, buf):
+        self.buf = buf
+        self.data = buf.data
+
+    def __getitem__(self, key):
+        view = self.data[key]
+        self.buf.data = self.data              # um único "rasgo"
+        self.buf.write(frame(9))
+        self.buf.write(frame(9))
+        return view
+
+
+def test_torn_read_is_rejected(shared):
+    shared.write(frame(1))
+    shared.data = TearingData(shared)
+    assert shared.read() is None               # o seq mudou durante a cópia
+    n, img = shared.read()                     # a próxima leitura pega o frame novo inteiro
+    assert n == 3 and (img == 9).all()
+
+
+def test_attach_reads_what_owner_wrote(shared):
+    shared.write(frame(4))
+    reader = SharedFrameBuffer.attach(shared.name)
+    try:
+        n, img = reader.read()
+        assert n == 1 and (img == 4).all()
+    finally:
+        reader.close()                         # não dono: não remove a memória
+    assert shared.read()[0] == 1
+
+
+def test_capture_continues_when_preview_process_fails(tmp_path):
+    """Com OpenCV sem GUI (headless) o processo de preview falha; a sessão termina mesmo assim."""
+    cfg = CaptureConfig(
+        output_parent=tmp_path, output_dir_name="P", save_fps=5.0, max_duration_seconds=1.0,
+        pre_countdown_seconds=0.0, preview=True, preview_process=True, preview_max_fps=100.0,
+        write_metrics=False,
+    )
+    pipeline = CapturePipeline(cfg, source=SyntheticSource(64, 48, fps=30.0))
+    pipeline.start()
+    assert pipeline.finished.wait(30)
+    assert pipeline.end_reason == "duration"
+    assert len(list((tmp_path / "P").glob("frame_*.jpg"))) >= 4
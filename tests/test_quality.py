@@ -0,0 +1,75 @@
+# tests/test_quality.py
+"""QualityGate: descarte de frames borrados e quase duplicados."""
+import cv2
+import numpy as np
+
+from framecapture.quality import QualityGate, dhash, hamming
+
+
+def textured(seed, size=(240, 320)):
+    """Ruído em blocos: muitas bordas (nítido) e hash diferente para cada semente."""
+    rng = np.random.default_rng(seed)
+    small = rng.integers(0, 256, (size[0] // 16, size[1] // 16, 3), dtype=np.uint8)
+    return cv2.resize(small, (size[1], size[0]), interpolation=cv2.INTER_NEAREST)
+
+
+def test_disabled_by_default():
+    assert not QualityGate().enabled
+    assert QualityGate(min_sharpness=10).enabled
+    assert QualityGate(max_hash_distance=0).enabled
+
+
+def test_rejects_blurry_frame():
+    gate = QualityGate(min_sharpness=50.0)
+    sharp = textured(1)
+    blurry = cv2.GaussianBlur(sharp, (0, 0), 12)
+
+    assert gate.check(sharp).accepted
+    decision = gate.check(blurry)
+    assert (decision.accepted, decision.reason) == (False, "blurry")
+    assert decision.sharpness < 50.0
+    assert "borrado" in decision.explain()
+
+
+def test_rejects_near_duplicate():
+    gate = QualityGate(max_hash_distance=4)
+    first = textured(1)
+    assert gate.check(first).accepted
+
+    # o mesmo frame com um pouco de ruído: hash a poucos bits do anterior
+    noisy = cv2.add(first, np.full_like(first, 3))
+    decision = gate.check(noisy)
+    assert (decision.accepted, decision.reason) == (False, "duplicate")
+    assert decision.distance <= 4
+
+    other = gate.check(textured(2))
+    assert other.accepted and other.distance > 4
+
+
+def test_rejected_frames_stay_out_of_history():
+    gate = QualityGate(max_hash_distance=0, history=2)
+    frames = [textured(i) for i in range(3)]
+    for f in frames:
+        assert gate.check(f).accepted
+    # só os 2 últimos aceitos ficam no histórico: o primeiro volta a passar
+    assert not gate.check(frames[2]).accepted
+    assert gate.check(frames[0]).accepted
+
+
+def test_report_counts():
+    gate = QualityGate(min_sharpness=50.0, max_hash_distance=4)
+    sharp = textured(3)
+    gate.check(sharp)
+    gate.check(sharp)
+    gate.check(cv2.GaussianBlur(sharp, (0, 0), 12))
+    rep = gate.report()
+    assert (rep["evaluated"], rep["accepted"], rep["rejected_duplicate"], rep["rejected_blurry"]) == (3, 1, 1, 1)
+    assert len(rep["last_skips"]) == 2
+
+
+def test_hamming_is_vectorized():
+    gray = [cv2.cvtColor(textured(i), cv2.COLOR_BGR2GRAY) for i in range(3)]
+    hashes = np.array([dhash(g) for g in gray], dtype=np.uint64)
+    dist = hamming(hashes, hashes[0])
+    assert dist[0] == 0 and dist.shape == (3,)
+    assert dist[1] == bin(int(hashes[0]) ^ int(hashes[1])).count("1")
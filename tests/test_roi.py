@@ -0,0 +1,49 @@
+# tests/test_roi.py
+"""RoiCropper: caixa do recorte em volta do círculo do guia e tamanho de saída."""
+import numpy as np
+
+from framecapture.precapture import guide_circle
+from framecapture.roi import RoiCropper
+
+
+def test_box_contains_guide_circle():
+    cropper = RoiCropper(radius_frac=0.22)
+    x0, y0, x1, y1 = cropper.box(640, 480)
+    (cx, cy), r = guide_circle(640, 480, 0.22)
+    assert x1 - x0 == y1 - y0 == 2 * r                 # quadrado do círculo, sem margem
+    assert (x0, y0) == (cx - r, cy - r)
+    assert cropper.box(640, 480) is cropper.box(640, 480)  # cacheado por tamanho
+
+
+def test_padding_is_clamped_to_frame():
+    cropper = RoiCropper(radius_frac=0.4, pad_frac=1.0)
+    x0, y0, x1, y1 = cropper.box(640, 480)
+    assert (y0, y1) == (0, 480)                        # lado limitado pela altura
+    assert x1 - x0 == 480 and 0 <= x0 and x1 <= 640
+
+
+def test_output_size_and_content():
+    frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    cropper = RoiCropper(output_size=(96, 64), radius_frac=0.22)
+    x0, y0, x1, y1 = cropper.box(640, 480)
+    frame[y0:y1, x0:x1] = 255                          # só a região da mão é branca
+
+    out = cropper(frame)
+    assert out.shape == (64, 96, 3) and out.dtype == np.uint8
+    assert out.min() == 255
+
+
+def test_without_output_size_returns_view():
+    frame = np.zeros((480, 640), dtype=np.uint8)
+    cropper = RoiCropper(output_size=None)
+    out = cropper(frame)
+    assert out.base is frame
+    x0, y0, x1, y1 = cropper.box(640, 480)
+    assert out.shape == (y1 - y0, x1 - x0)
+
+
+def test_buffer_ring_is_reused_after_n_calls():
+    frame = np.zeros((120, 160, 3), dtype=np.uint8)
+    cropper = RoiCropper(output_size=(32, 32), buffers=2)
+    a, b, c = cropper(frame), cropper(frame), cropper(frame)
+    assert a is not b and a is c
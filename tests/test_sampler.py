@@ -0,0 +1,94 @@
+# tests/test_sampler.py
+"""ScheduledSampler com timestamps sintéticos (sem câmera e sem relógio real)."""
+import numpy as np
+import pytest
+
+from framecapture.bufferpool import FramePool
+from framecapture.pipeline import ScheduledSampler
+from framecapture.video import FramePacket
+
+
+def run(sampler, timestamps, before=None):
+    picks = []
+    for ts in timestamps:
+        picks.extend(sampler.offer(ts, ts))
+    picks.extend(sampler.flush(before=before))
+    return picks
+
+
+@pytest.mark.parametrize("camera_fps", [30.0, 7.0])
+def test_steady_camera_fills_every_slot(camera_fps):
+    sampler = ScheduledSampler(5.0)
+    timestamps = [100.0 + k / camera_fps for k in range(int(5.0 * camera_fps))]
+    picks = run(sampler, timestamps, before=105.0)
+
+    assert [s.slot for s in picks] == list(range(25))
+    assert sampler.missed == 0
+    # o escolhido é o frame mais próximo do alvo: erro <= meio período da câmera
+    assert max(abs(s.error) for s in picks) <= 0.5 / camera_fps + 1e-9
+    rep = sampler.report()
+    assert rep["picked"] == rep["slots"] == 25
+    assert rep["frames"] == len(timestamps)
+
+
+def test_stall_misses_slots_without_burst():
+    sampler = ScheduledSampler(5.0)
+    # 30 fps com uma parada de ~450 ms depois de t = 2.0
+    timestamps = [k / 30.0 for k in range(150) if not 2.0 < k / 30.0 < 2.45]
+    picks = run(sampler, timestamps, before=5.0)
+
+    assert sampler.missed == 1                     # slot 11 (2.2s) ficou sem frame
+    assert [s.slot for s in picks] == [k for k in range(25) if k != 11]
+    assert picks[11].timestamp == pytest.approx(2.0 + 14 / 30.0)  # primeiro frame depois da parada
+    # sem rajada: nenhum par de frames vizinhos na câmera para "recuperar" o atraso
+    gaps = np.diff([s.timestamp for s in picks])
+    assert gaps.min() >= 0.2 / 2
+    assert sampler.report()["missed"] == 1
+
+
+def test_loop_delay_does_not_shift_schedule():
+    # o instante em que offer() é chamado não importa, só o timestamp de captura
+    clock = iter([0.0, 10.0, 20.0])
+    sampler = ScheduledSampler(5.0, clock=lambda: next(clock))
+    assert [s.slot for s in sampler.offer(None, "a")] == [0]
+    assert sampler.offer(0.19, "b") == []          # antes do alvo 0.2: fica pendente
+    assert [s.item for s in sampler.offer(0.21, "c")] == ["c"]  # mais perto de 0.2
+
+
+def test_flush_respects_before():
+    discarded = []
+    sampler = ScheduledSampler(5.0, on_discard=discarded.append)
+    sampler.offer(0.0, "a")
+    sampler.offer(0.95, "late")                    # slot 5 (1.0s), ainda pendente
+    assert sampler.pending.slot == 5
+    assert sampler.flush(before=1.0) == []         # alvo 1.0 não cabe numa sessão de 1s
+    assert discarded == ["late"]
+    assert sampler.pending is None
+
+    sampler = ScheduledSampler(5.0, on_discard=discarded.append)
+    sampler.offer(0.0, "a")
+    sampler.offer(0.95, "late")
+    assert [s.item for s in sampler.flush(before=1.2)] == ["late"]
+
+
+def test_on_discard_returns_pooled_buffers():
+    pool = FramePool(8)
+    sampler = ScheduledSampler(5.0, on_discard=lambda pkt: pkt.release())
+    saved = []
+    for n in range(150):
+        buf = pool.acquire((4, 4, 3))
+        pkt = FramePacket(buf, n / 30.0, n + 1, pool=pool)
+        # como o CapturePipeline: referência para o sampler + a do loop
+        pkt.retain()
+        for s in sampler.offer(pkt.timestamp, pkt):
+            saved.append(s.item.seq)
+            s.item.release()
+        pkt.release()
+        assert pool.in_use <= 2                    # frame atual + pendente
+    for s in sampler.flush(before=5.0):
+        saved.append(s.item.seq)
+        s.item.release()
+
+    assert len(saved) == 25
+    assert pool.in_use == 0
+    assert pool.stats.exhausted == 0
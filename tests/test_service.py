@@ -0,0 +1,86 @@
+# tests/test_service.py
+"""CaptureService: empréstimo e devolução da câmera entre sessões."""
+import time
+
+import pytest
+
+from framecapture.config import CaptureConfig
+from framecapture.service import CaptureService
+from framecapture.video import SyntheticSource
+
+
+@pytest.fixture
+def opened():
+    return []
+
+
+@pytest.fixture
+def service(opened):
+    def opener(cfg):
+        src = SyntheticSource(32, 24, fps=100.0)
+        opened.append(src)
+        return src
+
+    svc = CaptureService(idle_timeout=None, opener=opener)
+    yield svc
+    svc.close()
+
+
+def make_cfg(tmp_path, **kw):
+    return CaptureConfig(output_parent=tmp_path, output_dir_name="A", **kw)
+
+
+def test_lease_reuses_warm_camera(tmp_path, service, opened):
+    cfg = make_cfg(tmp_path)
+    lease = service.lease(cfg)
+    assert not lease.warm and service.is_open
+    assert lease.read_packet() is not None
+    lease.release()
+    assert service.is_open  # idle_timeout=None: continua aberta
+
+    lease = service.lease(cfg)
+    assert lease.warm and lease.open_seconds == 0.0
+    lease.release()
+    assert len(opened) == 1
+    assert (service.stats.opens, service.stats.reuses) == (1, 1)
+
+
+def test_lease_is_exclusive_until_released(tmp_path, service):
+    cfg = make_cfg(tmp_path)
+    lease = service.lease(cfg)
+    with pytest.raises(RuntimeError):
+        service.lease(cfg)
+    lease.release()
+    lease.release()  # devolver duas vezes não solta o empréstimo de outra sessão
+    other = service.lease(cfg)
+    lease.release()
+    with pytest.raises(RuntimeError):
+        service.lease(cfg)
+    other.release()
+
+
+def test_lease_reopens_when_format_changes(tmp_path, service, opened):
+    service.lease(make_cfg(tmp_path)).release()
+    lease = service.lease(make_cfg(tmp_path, camera_width=640, camera_height=480))
+    assert not lease.warm
+    lease.release()
+    assert len(opened) == 2
+
+
+def test_zero_idle_timeout_closes_on_release(tmp_path):
+    svc = CaptureService(idle_timeout=0, opener=lambda cfg: SyntheticSource(32, 24, fps=100.0))
+    svc.lease(make_cfg(tmp_path)).release()
+    assert not svc.is_open
+
+
+def test_warm_lease_does_not_count_idle_frames_as_skipped(tmp_path, service):
+    cfg = make_cfg(tmp_path)
+    lease = service.lease(cfg)
+    assert lease.read_packet() is not None
+    lease.release()
+    time.sleep(0.2)  # ~20 frames capturados com a câmera ociosa
+
+    lease = service.lease(cfg)
+    pkt = lease.read_packet()
+    assert pkt is not None and pkt.skipped == 0
+    lease.release()
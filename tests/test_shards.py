@@ -0,0 +1,96 @@
+# tests/test_shards.py
+"""Shards append-only: leitura, CRC dos registros e recover_shard() após uma queda."""
+import numpy as np
+
+from framecapture.shards import (
+    INDEX_ENTRY, MAGIC, REC_HEADER, ShardReader, ShardStorage, ShardWriter, _index_path, iter_shards, recover_shard,
+)
+
+PAYLOADS = [bytes([i + 1]) * (100 + i) for i in range(3)]
+
+
+def write_shard(root):
+    writer = ShardWriter(root)
+    ids = [writer.append(p, "A", timestamp=float(i)) for i, p in enumerate(PAYLOADS)]
+    path = writer.current_path
+    writer.close()
+    return path, ids
+
+
+def read_all(path):
+    with ShardReader(path) as reader:
+        return [bytes(reader[i]) for i in range(len(reader))]
+
+
+def test_write_and_read_back(tmp_path):
+    path, ids = write_shard(tmp_path)
+    assert ids == [1, 2, 3]
+    assert read_all(path) == PAYLOADS
+
+
+def test_recover_truncated_record(tmp_path):
+    path, _ = write_shard(tmp_path)
+    size = path.stat().st_size
+    with open(path, "r+b") as f:
+        f.truncate(size - 10)        # queda no meio dos bytes do último frame
+
+    assert recover_shard(path) == 2
+    assert read_all(path) == PAYLOADS[:2]
+    assert _index_path(path).stat().st_size == 2 * INDEX_ENTRY.size
+    # o resto do registro incompleto saiu do .fcs
+    assert path.stat().st_size == size - REC_HEADER.size - len(PAYLOADS[2])
+
+
+def test_recover_missing_index(tmp_path):
+    path, _ = write_shard(tmp_path)
+    _index_path(path).unlink()       # o índice é reconstruído a partir dos registros
+
+    assert recover_shard(path) == 3
+    assert read_all(path) == PAYLOADS
+
+
+def test_recover_stops_at_bad_crc(tmp_path):
+    path, _ = write_shard(tmp_path)
+    _index_path(path).unlink()
+    second = len(MAGIC) + REC_HEADER.size + len(PAYLOADS[0]) + REC_HEADER.size
+    with open(path, "r+b") as f:     # um byte trocado nos dados do segundo frame
+        f.seek(second + 5)
+        f.write(b"\xff")
+
+    assert recover_shard(path) == 1
+    assert read_all(path) == PAYLOADS[:1]
+
+
+def test_writer_reopens_after_crash_and_continues_ids(tmp_path):
+    path, _ = write_shard(tmp_path)
+    with open(path, "r+b") as f:
+        f.truncate(path.stat().st_size - 10)
+
+    writer = ShardWriter(tmp_path)   # recupera o último shard ao abrir
+    assert writer.append(b"new", "B") == 3
+    writer.close()
+    assert read_all(path) == PAYLOADS[:2] + [b"new"]
+
+
+def test_writer_rolls_to_a_new_shard(tmp_path):
+    writer = ShardWriter(tmp_path, max_bytes=len(MAGIC) + 2 * (REC_HEADER.size + 110))
+    for p in PAYLOADS * 2:
+        writer.append(p, "A")
+    writer.close()
+    counts = []
+    for reader in iter_shards(tmp_path):
+        with reader:
+            counts.append(len(reader))
+    assert len(counts) > 1 and sum(counts) == 6
+
+
+def test_shard_storage_round_trip(tmp_path):
+    storage = ShardStorage(tmp_path, "C")
+    frame = np.full((24, 32, 3), 200, dtype=np.uint8)
+    ref = storage.save(frame)
+    storage.close()
+    assert (ref.letter, ref.frame_id) == ("C", 1)
+    (reader,) = list(iter_shards(tmp_path))
+    with reader:
+        assert reader.index["letter"].tolist() == [b"C"]
+        assert reader.decode(0).shape == (24, 32, 3)
@@ -0,0 +1,106 @@
+# tests/test_storage.py
+"""FrameStorage: gravação síncrona e write-behind (fila, backpressure, close)."""
+import threading
+
+import numpy as np
+import pytest
+
+from framecapture import manifest
+from framecapture.bufferpool import FramePool
+from framecapture.storage import FrameStorage
+
+
+def frame(value=0):
+    return np.full((24, 32, 3), value, dtype=np.uint8)
+
+
+class BlockedWrites:
+    """Segura a primeira escrita do worker até release() (fila enche de forma determinística)."""
+    def __init__(self, storage):
+        self.started = threading.Event()
+        self.go = threading.Event()
+        self._write = storage._write
+        storage._write = self
+
+    def __call__(self, path, payload):
+        self.started.set()
+        assert self.go.wait(5)
+        return self._write(path, payload)
+
+    def release(self):
+        self.go.set()
+
+
+def test_synchronous_save_writes_immediately(tmp_path):
+    storage = FrameStorage(tmp_path, "png", "img")
+    path = storage.save(frame(), name="first")
+    assert path == tmp_path / "first.png" and path.exists()
+    assert storage.stats.written == 1
+    storage.close()
+
+
+def test_close_flushes_queued_frames(tmp_path):
+    storage = FrameStorage(tmp_path, workers=2, queue_size=64)
+    paths = [storage.save(frame(i)) for i in range(20)]
+    storage.close()
+    assert all(p.exists() for p in paths)
+    assert (storage.stats.queued, storage.stats.written, storage.stats.dropped) == (20, 20, 0)
+    storage.close()  # idempotente
+    with pytest.raises(RuntimeError):
+        storage.save(frame())
+
+
+def test_drop_oldest_keeps_newest_frames_and_returns_buffers(tmp_path):
+    pool = FramePool(8)
+    storage = FrameStorage(
+        tmp_path, workers=1, queue_size=2, backpressure="drop-oldest", pool=pool, manifest=True, session_id="s1"
+    )
+    blocked = BlockedWrites(storage)
+
+    def save(i):
+        buf = pool.acquire((24, 32, 3))
+        buf[:] = i
+        path = storage.save(buf, name=f"f{i}")
+        pool.release(buf)  # o storage retém o que ainda vai gravar
+        return path
+
+    assert save(1) is None             # drop-*: nenhum caminho antes da escrita confirmada
+    assert blocked.started.wait(5)     # worker preso gravando f1
+    for i in range(2, 6):              # fila de 2: f2 e f3 saem para f4 e f5
+        assert save(i) is None
+    blocked.release()
+    storage.close()
+
+    assert sorted(p.stem for p in tmp_path.glob("*.jpg")) == ["f1", "f4", "f5"]
+    # o manifesto só registra o que o worker gravou
+    assert sorted(r.name for r in manifest.session_frames(tmp_path, "s1")) == ["f1.jpg", "f4.jpg", "f5.jpg"]
+    assert (storage.stats.queued, storage.stats.written, storage.stats.dropped) == (5, 3, 2)
+    assert pool.in_use == 0
+
+
+def test_drop_newest_rejects_when_full(tmp_path):
+    storage = FrameStorage(tmp_path, workers=1, queue_size=1, backpressure="drop-newest")
+    blocked = BlockedWrites(storage)
+    for name in "abc":
+        assert storage.save(frame(), name=name) is None
+        if name == "a":
+            assert blocked.started.wait(5)
+    blocked.release()
+    storage.close()
+    assert sorted(p.stem for p in tmp_path.glob("*.jpg")) == ["a", "b"]
+    assert (storage.stats.queued, storage.stats.written, storage.stats.dropped) == (2, 2, 1)
+
+
+def test_close_commits_manifest(tmp_path):
+    storage = FrameStorage(tmp_path, workers=2, manifest=True, session_id="s1")
+    for i in range(5):
+        storage.save(frame(i), timestamp=float(i), seq=i)
+    storage.close()
+    records = manifest.session_frames(tmp_path, "s1")
+    assert len(records) == 5
+    assert {(r.width, r.height, r.channels) for r in records} == {(32, 24, 3)}
+
+
+def test_invalid_backpressure(tmp_path):
+    with pytest.raises(ValueError):
+        FrameStorage(tmp_path, workers=1, backpressure="drop-all")
@@ -0,0 +1,63 @@
+# tests/test_tutorial.py
+"""TutorialViewer: cache LRU das imagens reduzidas e prefetch em segundo plano (sem abrir janelas)."""
+import os
+
+import pytest
+
+Image = pytest.importorskip("PIL.Image")
+
+from framecapture.tutorial import TutorialViewer
+
+
+def make_images(folder, letters, size=(200, 100)):
+    for letter in letters:
+        Image.new("RGB", size, (10, 20, 30)).save(folder / f"{letter}.png")
+
+
+def cached_letters(viewer):
+    return [key[0] for key in viewer._cache]
+
+
+def test_load_reduces_to_max_size(tmp_path):
+    make_images(tmp_path, "A")
+    viewer = TutorialViewer(None, base_dir=tmp_path, max_size=(50, 50))
+    im = viewer._load("A", viewer._find_image_path("A"))
+    assert im.size == (50, 25)
+    assert viewer._load("A", viewer._find_image_path("A")) is im
+
+
+def test_lru_evicts_least_recently_used(tmp_path):
+    make_images(tmp_path, "ABC")
+    viewer = TutorialViewer(None, base_dir=tmp_path, max_size=(50, 50), cache_size=2)
+    for letter in "AB":
+        viewer._load(letter, viewer._find_image_path(letter))
+    viewer._load("A", viewer._find_image_path("A"))   # A volta a ser o mais recente
+    viewer._load("C", viewer._find_image_path("C"))
+    assert cached_letters(viewer) == ["A", "C"]
+
+
+def test_changed_file_replaces_cached_version(tmp_path):
+    make_images(tmp_path, "A")
+    viewer = TutorialViewer(None, base_dir=tmp_path, max_size=(50, 50))
+    path = viewer._find_image_path("A")
+    old = viewer._load("A", path)
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    assert viewer._load("A", path) is not old
+    assert cached_letters(viewer) == ["A"]
+
+
+def test_scan_prefers_jpg(tmp_path):
+    make_images(tmp_path, "A")
+    Image.new("RGB", (10, 10)).save(tmp_path / "A.jpg")
+    viewer = TutorialViewer(None, base_dir=tmp_path)
+    assert viewer._find_image_path("a").name == "A.jpg"
+
+
+def test_prefetch_fills_cache_and_skips_broken_files(tmp_path):
+    make_images(tmp_path, "ABD")
+    (tmp_path / "C.png").write_bytes(b"not an image")
+    viewer = TutorialViewer(None, base_dir=tmp_path, max_size=(50, 50))
+    viewer.prefetch("ABCDE")
+    viewer._prefetch_thread.join(10)
+    assert sorted(cached_letters(viewer)) == ["A", "B", "D"]